@@ -0,0 +1,145 @@
+import argparse
+import hashlib
+import os
+import struct
+
+from common import measure, print_header, print_result, format_size
+from src.hash import SHA256, SHA3_256
+from src.hash.sha256 import _H0, _K
+from src.hash.utils import rotate_right, shift_right
+
+
+class LegacySHA256:
+
+
+    # Previous implementation, kept as a baseline: helper calls per round,
+    # word-by-word unpacking and re-slicing the buffer after every block.
+
+    def __init__(self):
+
+        self._hash = list(_H0)
+        self._message_length = 0
+        self._buffer = bytearray()
+
+    def _process_block(self, block: bytes):
+
+        w = [0] * 64
+        for i in range(16):
+            w[i] = struct.unpack('>I', block[i * 4:(i + 1) * 4])[0]
+
+        for i in range(16, 64):
+            s0 = rotate_right(w[i - 15], 7) ^ rotate_right(w[i - 15], 18) ^ shift_right(w[i - 15], 3)
+            s1 = rotate_right(w[i - 2], 17) ^ rotate_right(w[i - 2], 19) ^ shift_right(w[i - 2], 10)
+            w[i] = (w[i - 16] + s0 + w[i - 7] + s1) & 0xFFFFFFFF
+
+        a, b, c, d, e, f, g, h = self._hash
+
+        for i in range(64):
+            S1 = rotate_right(e, 6) ^ rotate_right(e, 11) ^ rotate_right(e, 25)
+            ch = (e & f) ^ (~e & g)
+            temp1 = (h + S1 + ch + _K[i] + w[i]) & 0xFFFFFFFF
+            S0 = rotate_right(a, 2) ^ rotate_right(a, 13) ^ rotate_right(a, 22)
+            maj = (a & b) ^ (a & c) ^ (b & c)
+            temp2 = (S0 + maj) & 0xFFFFFFFF
+
+            h, g, f, e, d, c, b, a = g, f, e, (d + temp1) & 0xFFFFFFFF, c, b, a, (temp1 + temp2) & 0xFFFFFFFF
+
+        self._hash = [(x + y) & 0xFFFFFFFF for x, y in zip(self._hash, [a, b, c, d, e, f, g, h])]
+
+    def update(self, data: bytes):
+
+        self._message_length += len(data)
+        self._buffer.extend(data)
+
+        while len(self._buffer) >= 64:
+            self._process_block(bytes(self._buffer[:64]))
+            self._buffer = self._buffer[64:]
+
+    def digest(self) -> bytes:
+
+        message = bytes(self._buffer) + b'\x80'
+        message += bytes((56 - len(message)) % 64)
+        message += struct.pack('>Q', self._message_length * 8)
+
+        for i in range(0, len(message), 64):
+            self._process_block(message[i:i + 64])
+
+        return b''.join(struct.pack('>I', h) for h in self._hash)
+
+
+def hash_with(factory, data: bytes, chunk_size: int) -> bytes:
+
+    hasher = factory()
+    for offset in range(0, len(data), chunk_size):
+        hasher.update(data[offset:offset + chunk_size])
+    return hasher.digest()
+
+
+def bench_sha256(sizes, chunk_size: int, repeat: int, skip_legacy: int):
+
+    implementations = [
+        ('hashlib', hashlib.sha256),
+        ('SHA256 (current)', SHA256),
+        ('SHA256 (legacy)', LegacySHA256),
+    ]
+
+    for size in sizes:
+        data = os.urandom(size)
+        expected = hashlib.sha256(data).digest()
+        print_header(f"SHA-256, {format_size(size)}, update() chunks of {format_size(chunk_size)}")
+
+        baseline = None
+        for name, factory in reversed(implementations):
+            if factory is LegacySHA256 and size > skip_legacy:
+                print(f"{name:<28} skipped (larger than {format_size(skip_legacy)})")
+                continue
+
+            if hash_with(factory, data, chunk_size) != expected:
+                raise AssertionError(f"{name} produced a wrong digest")
+
+            seconds = measure(lambda: hash_with(factory, data, chunk_size), repeat)
+            print_result(name, size, seconds, baseline)
+            baseline = baseline or seconds
+
+
+def bench_sha3_256(sizes, chunk_size: int, repeat: int):
+
+    implementations = [
+        ('hashlib', hashlib.sha3_256),
+        ('SHA3_256', SHA3_256),
+    ]
+
+    for size in sizes:
+        data = os.urandom(size)
+        expected = hashlib.sha3_256(data).digest()
+        print_header(f"SHA3-256, {format_size(size)}, update() chunks of {format_size(chunk_size)}")
+
+        baseline = None
+        for name, factory in reversed(implementations):
+            if hash_with(factory, data, chunk_size) != expected:
+                raise AssertionError(f"{name} produced a wrong digest")
+
+            seconds = measure(lambda: hash_with(factory, data, chunk_size), repeat)
+            print_result(name, size, seconds, baseline)
+            baseline = baseline or seconds
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Hash throughput: pure Python implementations vs hashlib')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1024, 64 * 1024, 1024 * 1024],
+                        help='Message sizes in bytes')
+    parser.add_argument('--chunk-size', type=int, default=1024 * 1024,
+                        help='Bytes passed to each update() call')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    parser.add_argument('--skip-legacy', type=int, default=1024 * 1024,
+                        help='Skip the legacy implementation above this size')
+    args = parser.parse_args()
+
+    bench_sha256(args.sizes, args.chunk_size, args.repeat, args.skip_legacy)
+    bench_sha3_256(args.sizes, args.chunk_size, args.repeat)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import io
+import os
+
+from Crypto.Cipher import AES
+
+from common import measure, print_header, print_result, format_size
+from src.modes import create_mode, stream_encrypt, CIPHER_CACHE, GCM, GCMKey
+
+
+def legacy_cbc_encrypt(aes, data: bytes, previous_block: bytes) -> bytes:
+
+    # Previous CBCMode._encrypt_chunk, kept as a baseline: list of slices,
+    # per-byte XOR generator and quadratic bytes concatenation.
+    blocks = [data[i:i + 16] for i in range(0, len(data), 16)]
+
+    ciphertext = b''
+    for block in blocks:
+        xor_block = bytes(a ^ b for a, b in zip(block, previous_block))
+        encrypted_block = aes.encrypt(xor_block)
+        ciphertext += encrypted_block
+        previous_block = encrypted_block
+
+    return ciphertext
+
+
+def encrypt_stream(cipher, chunk: bytes, size: int):
+
+    # Feed `size` bytes through encryptor() the way stream_encrypt does,
+    # reusing one chunk so that large sizes do not need the memory
+    context = cipher.encryptor()
+    for _ in range(size // len(chunk)):
+        context.update(chunk)
+    context.update(chunk[:size % len(chunk)])
+    context.finalize()
+
+
+def encrypt_stream_legacy(key: bytes, iv: bytes, chunk: bytes, size: int):
+
+    aes = AES.new(key, AES.MODE_ECB)
+    for _ in range(size // len(chunk)):
+        legacy_cbc_encrypt(aes, chunk, iv)
+
+
+def bench_cbc_encrypt(sizes, chunk_size: int, repeat: int, skip_pure: int, skip_legacy: int):
+
+    key = os.urandom(16)
+    iv = os.urandom(16)
+    chunk = os.urandom(chunk_size)
+    expected = AES.new(key, AES.MODE_CBC, iv=iv).encrypt(chunk)
+
+    # Correctness check on one chunk before timing anything
+    for backend in ['native', 'pure']:
+        cipher = create_mode('CBC', key, iv, backend=backend)
+        if cipher._encrypt_chunk(chunk, iv)[0] != expected:
+            raise AssertionError(f"CBC ({backend}) produced a wrong ciphertext")
+    if legacy_cbc_encrypt(AES.new(key, AES.MODE_ECB), chunk[:64 * 1024], iv) != expected[:64 * 1024]:
+        raise AssertionError("Legacy CBC produced a wrong ciphertext")
+
+    for size in sizes:
+        print_header(f"CBC encryption, {format_size(size)}, chunks of {format_size(chunk_size)}")
+
+        baseline = None
+        for name, limit, run in [
+            ('CBCMode (legacy)', skip_legacy, lambda: encrypt_stream_legacy(key, iv, chunk, size)),
+            ('CBCMode (pure)', skip_pure,
+             lambda: encrypt_stream(create_mode('CBC', key, iv, backend='pure'), chunk, size)),
+            ('CBCMode (native)', None,
+             lambda: encrypt_stream(create_mode('CBC', key, iv, backend='native'), chunk, size)),
+        ]:
+            if limit is not None and size > limit:
+                print(f"{name:<28} skipped (larger than {format_size(limit)})")
+                continue
+
+            seconds = measure(run, repeat)
+            print_result(name, size, seconds, baseline)
+            baseline = baseline or seconds
+
+
+def legacy_cfb8_decrypt(aes, data: bytes, feedback: bytes) -> bytes:
+
+    # Previous CFBMode._decrypt_chunk: one AES call and two allocations per byte
+    plaintext = b''
+    for i in range(len(data)):
+        plain_byte = aes.encrypt(feedback)[0] ^ data[i]
+        plaintext += bytes([plain_byte])
+        feedback = feedback[1:] + bytes([data[i]])
+
+    return plaintext
+
+
+def bench_cfb(sizes, repeat: int, skip_pure: int, skip_legacy: int):
+
+    key = os.urandom(16)
+    iv = os.urandom(16)
+
+    for size in sizes:
+        data = os.urandom(size)
+
+        for mode, bits in [('CFB8', 8), ('CFB64', 64), ('CFB128', 128)]:
+            ciphertext = AES.new(key, AES.MODE_CFB, iv=iv, segment_size=bits).encrypt(data)
+            print_header(f"{mode}, {format_size(size)}")
+
+            runs = [
+                ('encrypt (pure)', skip_pure, ciphertext,
+                 lambda: create_mode(mode, key, iv, backend='pure').encrypt(data)),
+                ('encrypt (native)', None, ciphertext,
+                 lambda: create_mode(mode, key, iv, backend='native').encrypt(data)),
+                ('decrypt (bulk)', None, data, lambda: create_mode(mode, key, iv).decrypt(ciphertext)),
+            ]
+            if mode == 'CFB8':
+                runs.insert(0, ('decrypt (legacy)', skip_legacy, data,
+                                lambda: legacy_cfb8_decrypt(AES.new(key, AES.MODE_ECB), ciphertext, iv)))
+
+            for name, limit, expected, run in runs:
+                if limit is not None and size > limit:
+                    print(f"{name:<28} skipped (larger than {format_size(limit)})")
+                    continue
+
+                if run() != expected:
+                    raise AssertionError(f"{mode} {name} produced a wrong result")
+
+                print_result(name, size, measure(run, repeat))
+
+
+def legacy_ofb_encrypt(aes, data: bytes, register: bytes) -> bytes:
+
+    # Previous OFBMode._encrypt_chunk: per-byte XOR generator and quadratic
+    # bytes concatenation
+    ciphertext = b''
+    for i in range(0, len(data), 16):
+        register = aes.encrypt(register)
+        chunk = data[i:i + 16]
+        ciphertext += bytes(a ^ b for a, b in zip(chunk, register[:len(chunk)]))
+
+    return ciphertext
+
+
+def bench_ofb(sizes, chunk_size: int, repeat: int, skip_pure: int, skip_legacy: int):
+
+    key = os.urandom(16)
+    iv = os.urandom(16)
+
+    for size in sizes:
+        data = os.urandom(size)
+        expected = AES.new(key, AES.MODE_OFB, iv=iv).encrypt(data)
+        print_header(f"OFB streaming, {format_size(size)}, chunks of {format_size(chunk_size)}")
+
+        def stream(backend, prefetch):
+            output = io.BytesIO()
+            stream_encrypt(create_mode('OFB', key, iv, backend=backend, prefetch=prefetch),
+                           io.BytesIO(data), output, chunk_size)
+            return output.getvalue()
+
+        runs = [
+            ('legacy', skip_legacy, lambda: legacy_ofb_encrypt(AES.new(key, AES.MODE_ECB), data, iv)),
+            ('pure', skip_pure, lambda: stream('pure', False)),
+            ('pure, prefetch', skip_pure, lambda: stream('pure', True)),
+            ('native', None, lambda: stream('native', False)),
+            ('native, prefetch', None, lambda: stream('native', True)),
+        ]
+
+        baseline = None
+        for name, limit, run in runs:
+            if limit is not None and size > limit:
+                print(f"{name:<28} skipped (larger than {format_size(limit)})")
+                continue
+
+            if run() != expected:
+                raise AssertionError(f"OFB ({name}) produced a wrong result")
+
+            seconds = measure(run, repeat)
+            print_result(name, size, seconds, baseline)
+            baseline = baseline or seconds
+
+
+def bench_small_messages(count: int, message_size: int, key_count: int, repeat: int):
+
+    # Per-message overhead of creating a mode object and encrypting a short
+    # message, with the cipher cache warm versus cleared before every message
+    # (which is what every message paid before the cache existed)
+    keys = [os.urandom(16) for _ in range(key_count)]
+    iv = os.urandom(16)
+    messages = [os.urandom(message_size) for _ in range(count)]
+
+    print_header(f"{count} messages of {format_size(message_size)} under {key_count} keys, per message")
+
+    for mode in ['ECB', 'CBC', 'CFB128', 'OFB', 'CTR']:
+        def cached():
+            for i, message in enumerate(messages):
+                create_mode(mode, keys[i % key_count], iv).encrypt(message)
+
+        def uncached():
+            for i, message in enumerate(messages):
+                CIPHER_CACHE.clear()
+                create_mode(mode, keys[i % key_count], iv).encrypt(message)
+
+        cold = measure(uncached, repeat) / count
+        warm = measure(cached, repeat) / count
+        print(f"{mode:<10} uncached {cold * 1e6:8.2f} us   cached {warm * 1e6:8.2f} us  x{cold / warm:.1f}")
+
+
+def bench_gcm_records(count: int, message_size: int, repeat: int):
+
+    # Many short records under one key: a GCM object per record (tables
+    # rebuilt every time), one GCMKey for all records, and PyCryptodome
+    key = os.urandom(16)
+    aad = os.urandom(16)
+    records = [(os.urandom(12), os.urandom(message_size)) for _ in range(count)]
+    gcm_key = GCMKey(key)
+
+    def per_record():
+        for nonce, record in records:
+            GCM(key, nonce).encrypt(record, aad)
+
+    def shared_key():
+        for nonce, record in records:
+            gcm_key.seal(nonce, record, aad)
+
+    def pycryptodome():
+        for nonce, record in records:
+            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+            cipher.update(aad)
+            cipher.encrypt_and_digest(record)
+
+    nonce, record = records[0]
+    if GCM(key, nonce).encrypt(record, aad) != nonce + gcm_key.seal(nonce, record, aad):
+        raise AssertionError("GCMKey.seal produced a wrong result")
+
+    print_header(f"GCM, {count} records of {format_size(message_size)} under one key")
+    for name, run in [('GCM per record', per_record), ('GCMKey.seal', shared_key),
+                      ('PyCryptodome', pycryptodome)]:
+        seconds = measure(run, repeat) / count
+        print(f"{name:<28} {seconds * 1e6:10.2f} us {1 / seconds:12.0f} records/s")
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description='Block cipher mode throughput')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1024 * 1024, 16 * 1024 * 1024, 256 * 1024 * 1024, 1024 * 1024 * 1024],
+                        help='Message sizes in bytes')
+    parser.add_argument('--chunk-size', type=int, default=1024 * 1024,
+                        help='Bytes passed to each update() call')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    parser.add_argument('--skip-pure', type=int, default=16 * 1024 * 1024,
+                        help='Skip the pure backend above this size')
+    parser.add_argument('--skip-legacy', type=int, default=1024 * 1024,
+                        help='Skip the legacy implementation above this size')
+    parser.add_argument('--max-memory-size', type=int, default=16 * 1024 * 1024,
+                        help='CFB and OFB are benchmarked in memory, only up to this size')
+    parser.add_argument('--messages', type=int, default=10000,
+                        help='Number of short messages for the per-message overhead benchmark')
+    parser.add_argument('--message-size', type=int, default=64, help='Size of each short message')
+    parser.add_argument('--keys', type=int, default=4, help='Distinct keys the short messages rotate through')
+    args = parser.parse_args()
+
+    bench_cbc_encrypt(args.sizes, args.chunk_size, args.repeat, args.skip_pure, args.skip_legacy)
+    in_memory = [size for size in args.sizes if size <= args.max_memory_size]
+    bench_cfb(in_memory, args.repeat, args.skip_pure, args.skip_legacy)
+    bench_ofb(in_memory, args.chunk_size, args.repeat, args.skip_pure, args.skip_legacy)
+    bench_small_messages(args.messages, args.message_size, args.keys, args.repeat)
+    bench_gcm_records(args.messages, args.message_size, args.repeat)
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+from typing import Callable
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def measure(func: Callable, repeat: int = 3) -> float:
+
+    # Best of several runs, in seconds
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def print_header(title: str):
+
+    print(f"\n{'=' * 60}")
+    print(title)
+    print('=' * 60)
+
+
+def print_result(name: str, size: int, seconds: float, baseline: float = None):
+
+    throughput = size / seconds / (1024 * 1024) if seconds else float('inf')
+    line = f"{name:<28} {seconds * 1000:10.2f} ms {throughput:10.2f} MiB/s"
+    if baseline:
+        line += f"  x{baseline / seconds:.1f}"
+    print(line)
+
+
+def format_size(size: int) -> str:
+
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if size < 1024 or unit == 'GiB':
+            return f"{size:g} {unit}"
+        size /= 1024
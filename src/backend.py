@@ -0,0 +1,45 @@
+import os
+from typing import Optional
+
+
+# Environment variable consulted when no backend is given explicitly
+BACKEND_ENV_VAR = 'CRYPTOCORE_BACKEND'
+
+# 'native' - C implementations from the standard library (hashlib, hmac)
+# 'pure'   - the educational pure-Python implementations of this package
+# 'auto'   - native where available, pure otherwise
+BACKENDS = ['auto', 'native', 'pure']
+
+
+def get_backend(backend: Optional[str] = None) -> str:
+
+    # Explicit argument first, then the environment, then 'auto'
+    if backend is None:
+        backend = os.environ.get(BACKEND_ENV_VAR) or 'auto'
+
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported backend: {backend}. Valid: {', '.join(BACKENDS)}")
+
+    return backend
+
+
+def select_implementation(implementations: dict, backend: Optional[str] = None, name: str = ''):
+
+    # implementations maps 'native'/'pure' to an implementation, where a
+    # missing or None native entry means the platform lacks it
+    backend = get_backend(backend)
+    native = implementations.get('native')
+
+    if backend == 'pure':
+        return implementations['pure']
+
+    if backend == 'native' and native is None:
+        raise ValueError(f"Native backend is not available for {name or 'this algorithm'}")
+
+    return native if native is not None else implementations['pure']
+
+
+def is_native(implementations: dict, backend: Optional[str] = None) -> bool:
+
+    return select_implementation(implementations, backend) is implementations.get('native')
@@ -2,6 +2,7 @@ import argparse
 import sys
 import os
 from typing import Tuple, Optional, List
+from src.backend import BACKENDS, BACKEND_ENV_VAR, get_backend
 
 
 def parse_args() -> argparse.Namespace:
@@ -23,7 +24,7 @@ def parse_args() -> argparse.Namespace:
     enc_parser.add_argument('--algorithm', required=True,
                             help='Cipher algorithm (only "aes" supported)')
     enc_parser.add_argument('--mode', required=True,
-                            help='Mode: ecb, cbc, cfb, ofb, ctr, gcm, etm')
+                            help='Mode: ecb, cbc, cfb (CFB-8), cfb8, cfb64, cfb128, ofb, ctr, gcm, etm')
 
     # Operation
     enc_group = enc_parser.add_mutually_exclusive_group(required=True)
@@ -36,11 +37,19 @@ def parse_args() -> argparse.Namespace:
     enc_parser.add_argument('--key',
                             help='Key as hexadecimal string')
 
-    # File I/O
-    enc_parser.add_argument('--input', required=True,
-                            help='Input file path')
+    # File I/O: one file, a directory tree or a manifest of files
+    input_group = enc_parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument('--input',
+                             help='Input file path')
+    input_group.add_argument('--input-dir',
+                             help='Process every file below this directory (batch mode)')
+    input_group.add_argument('--manifest',
+                             help='File listing one input path per line, optionally '
+                                  'followed by a tab and the output path (batch mode)')
     enc_parser.add_argument('--output',
                             help='Output file path (optional)')
+    enc_parser.add_argument('--output-dir',
+                            help='Output directory for --input-dir (default: <input-dir>.enc/.dec)')
 
     # IV/Nonce
     enc_parser.add_argument('--iv',
@@ -50,6 +59,20 @@ def parse_args() -> argparse.Namespace:
     enc_parser.add_argument('--aad',
                             help='Associated Authenticated Data as hex string (for GCM/ETM)')
 
+    # Parallel processing
+    enc_parser.add_argument('--jobs', type=int, default=1,
+                            help='Worker processes for CTR/GCM and CBC/CFB decryption (default: 1)')
+    enc_parser.add_argument('--backend', choices=BACKENDS,
+                            help=f'Implementation to use (default: ${BACKEND_ENV_VAR} or auto)')
+
+    # Batch mode
+    enc_parser.add_argument('--workers', type=int, default=1,
+                            help='Files processed concurrently in batch mode (default: 1)')
+    enc_parser.add_argument('--executor', choices=['thread', 'process'], default='thread',
+                            help='Worker type for --workers (default: thread)')
+    enc_parser.add_argument('--report',
+                            help='Write a JSON summary of the batch (failures included) to this file')
+
     # Hash/MAC parser
     hash_parser = subparsers.add_parser('dgst', help='Compute hash or MAC', add_help=False)
     hash_parser.set_defaults(command='dgst')
@@ -70,6 +93,8 @@ def parse_args() -> argparse.Namespace:
                              help='Key for MAC (hex string)')
     hash_parser.add_argument('--verify',
                              help='Verify against existing MAC file')
+    hash_parser.add_argument('--backend', choices=BACKENDS,
+                             help=f'Implementation to use (default: ${BACKEND_ENV_VAR} or auto)')
 
     # Key derivation parser (NEW FOR SPRINT 7)
     derive_parser = subparsers.add_parser('derive', help='Key derivation from password', add_help=False)
@@ -90,6 +115,10 @@ def parse_args() -> argparse.Namespace:
     derive_parser.add_argument('--raw',
                                action='store_true',
                                help='Output raw binary key instead of hex')
+    derive_parser.add_argument('--backend', choices=BACKENDS,
+                               help=f'Implementation to use (default: ${BACKEND_ENV_VAR} or auto)')
+    derive_parser.add_argument('--jobs', type=int, default=1,
+                               help='Worker processes for keys longer than 32 bytes (default: 1)')
 
     # Parse arguments
     args = parser.parse_args()
@@ -121,10 +150,19 @@ def _parse_legacy_args() -> argparse.Namespace:
     group.add_argument('--decrypt', action='store_true')
 
     parser.add_argument('--key')
-    parser.add_argument('--input', required=True)
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument('--input')
+    input_group.add_argument('--input-dir')
+    input_group.add_argument('--manifest')
     parser.add_argument('--output')
+    parser.add_argument('--output-dir')
     parser.add_argument('--iv')
     parser.add_argument('--aad')
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--backend', choices=BACKENDS)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--report')
 
     args = parser.parse_args()
     args.command = 'enc'
@@ -140,7 +178,7 @@ def _validate_encryption_args(args: argparse.Namespace) -> argparse.Namespace:
         errors.append(f"Only 'aes' algorithm supported, got '{args.algorithm}'")
 
     # Mode validation
-    valid_modes = ['ecb', 'cbc', 'cfb', 'ofb', 'ctr', 'gcm', 'etm']
+    valid_modes = ['ecb', 'cbc', 'cfb', 'cfb8', 'cfb64', 'cfb128', 'ofb', 'ctr', 'gcm', 'etm']
     if args.mode.lower() not in valid_modes:
         errors.append(f"Invalid mode '{args.mode}'. Valid: {', '.join(valid_modes)}")
 
@@ -168,7 +206,7 @@ def _validate_encryption_args(args: argparse.Namespace) -> argparse.Namespace:
                       file=sys.stderr)
         except ValueError:
             errors.append(f"Invalid hexadecimal IV/nonce: {args.iv}")
-    elif args.encrypt and args.mode.lower() in ['cbc', 'cfb', 'ofb', 'ctr']:
+    elif args.encrypt and args.mode.lower() in ['cbc', 'cfb', 'cfb8', 'cfb64', 'cfb128', 'ofb', 'ctr']:
         # IV will be auto-generated
         pass
 
@@ -180,24 +218,27 @@ def _validate_encryption_args(args: argparse.Namespace) -> argparse.Namespace:
         except ValueError:
             errors.append(f"Invalid hexadecimal AAD: {args.aad}")
 
-    # File validation
-    if args.input != '-' and not os.path.exists(args.input):
-        errors.append(f"Input file does not exist: {args.input}")
+    # Jobs validation
+    if args.jobs < 1:
+        errors.append(f"Number of jobs must be positive, got {args.jobs}")
 
-    # Auto-generate output filename
-    if not args.output:
-        if args.encrypt:
-            if args.input == '-':
-                args.output = 'encrypted.bin'
-            else:
-                args.output = f"{args.input}.enc"
-        else:
-            if args.input == '-':
-                args.output = 'decrypted.bin'
-            elif args.input.endswith('.enc'):
-                args.output = args.input[:-4] + '.dec'
-            else:
-                args.output = f"{args.input}.dec"
+    _validate_backend(args, errors)
+
+    args.batch = bool(args.input_dir or args.manifest)
+
+    if args.batch:
+        _validate_batch_args(args, errors)
+    else:
+        if args.output_dir:
+            errors.append("--output-dir requires --input-dir")
+
+        # File validation
+        if args.input != '-' and not os.path.exists(args.input):
+            errors.append(f"Input file does not exist: {args.input}")
+
+        # Auto-generate output filename
+        if not args.output:
+            args.output = default_output_path(args.input, args.encrypt)
 
     if errors:
         for error in errors:
@@ -212,6 +253,54 @@ def _validate_encryption_args(args: argparse.Namespace) -> argparse.Namespace:
     return args
 
 
+def default_output_path(input_path: str, encrypting: bool) -> str:
+
+    if encrypting:
+        if input_path == '-':
+            return 'encrypted.bin'
+        return f"{input_path}.enc"
+
+    if input_path == '-':
+        return 'decrypted.bin'
+    elif input_path.endswith('.enc'):
+        return input_path[:-4] + '.dec'
+    return f"{input_path}.dec"
+
+
+def _validate_batch_args(args: argparse.Namespace, errors: List[str]):
+
+    # Every file gets a fresh IV/nonce and its own output path
+    if args.iv:
+        errors.append("--iv cannot be used in batch mode: every file gets its own IV/nonce")
+    if args.output:
+        errors.append("--output cannot be used in batch mode; use --output-dir or the manifest")
+    if args.jobs > 1:
+        errors.append("--jobs splits single files; use --workers in batch mode")
+    if args.workers < 1:
+        errors.append(f"Number of workers must be positive, got {args.workers}")
+
+    if args.manifest:
+        if args.output_dir:
+            errors.append("--output-dir requires --input-dir; manifest lines carry their own outputs")
+        if not os.path.isfile(args.manifest):
+            errors.append(f"Manifest file does not exist: {args.manifest}")
+        return
+
+    if not os.path.isdir(args.input_dir):
+        errors.append(f"Input directory does not exist: {args.input_dir}")
+        return
+
+    if not args.output_dir:
+        suffix = '.enc' if args.encrypt else '.dec'
+        args.output_dir = os.path.normpath(args.input_dir) + suffix
+
+    # Writing into the tree being walked would mix outputs with inputs
+    input_dir = os.path.realpath(args.input_dir)
+    output_dir = os.path.realpath(args.output_dir)
+    if output_dir == input_dir or output_dir.startswith(input_dir + os.sep):
+        errors.append(f"Output directory must be outside the input directory: {args.output_dir}")
+
+
 def _validate_hash_args(args: argparse.Namespace) -> argparse.Namespace:
 
     errors = []
@@ -238,6 +327,8 @@ def _validate_hash_args(args: argparse.Namespace) -> argparse.Namespace:
             except ValueError:
                 errors.append(f"Invalid hexadecimal key: {args.key}")
 
+    _validate_backend(args, errors)
+
     # File validation
     if args.verify and not os.path.exists(args.verify):
         errors.append(f"Verify file does not exist: {args.verify}")
@@ -254,6 +345,15 @@ def _validate_hash_args(args: argparse.Namespace) -> argparse.Namespace:
     return args
 
 
+def _validate_backend(args: argparse.Namespace, errors: List[str]):
+
+    # Resolve --backend / environment variable once, up front
+    try:
+        args.backend = get_backend(args.backend)
+    except ValueError as e:
+        errors.append(f"{e} (from ${BACKEND_ENV_VAR})")
+
+
 def _validate_derive_args(args: argparse.Namespace) -> argparse.Namespace:
 
     errors = []
@@ -271,12 +371,18 @@ def _validate_derive_args(args: argparse.Namespace) -> argparse.Namespace:
               f"Consider using at least 100,000 for security.",
               file=sys.stderr)
 
+    # Jobs validation
+    if args.jobs < 1:
+        errors.append(f"Number of jobs must be positive, got {args.jobs}")
+
     # Length validation
     if args.length <= 0:
         errors.append("Key length must be positive")
     elif args.length > 1024:  # Reasonable upper limit
         errors.append(f"Key length too large ({args.length} > 1024 bytes)")
 
+    _validate_backend(args, errors)
+
     # Salt validation
     salt_bytes = None
     if args.salt:
@@ -1,173 +1,456 @@
 import sys
 import os
+import stat
+import hmac as _native_hmac
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
 
-from src.cli_parser import parse_args
-from src.file_io import (read_file_with_iv, write_file_with_iv,
-                        read_gcm_file, read_etm_file)
-from src.modes import create_mode
+from src.cli_parser import parse_args, default_output_path
+from src.file_io import (read_iv, read_chunks, read_gcm_header, TrailerSplitter,
+                        open_input_file, open_output_file, AtomicOutputFile,
+                        MappedInput, PreallocatedOutput,
+                        walk_directory, read_manifest, write_batch_report)
+from src.modes import create_mode, stream_encrypt, stream_decrypt, DEFAULT_CHUNK_SIZE, SegmentPool
+from src.modes.parallel import SEGMENT_SIZE
 from src.csprng import generate_aes_key, print_key_info, generate_random_bytes
-from src.hash import create_hash
-from src.mac.__init__ import HMACStream, parse_hmac_file
-from src.modes.gcm import GCM, AuthenticationError as GCMAuthError
+from src.hash import create_hash, HASH_BACKENDS
+from src.backend import is_native
+from src.mac.__init__ import HMACStream, CMACStream, parse_hmac_file
+from src.modes.gcm import GCMKey, GCMContext, AuthenticationError as GCMAuthError
 from src.modes.encrypt_then_mac import EncryptThenMAC, AuthenticationError as ETMAuthError
 from src.kdf import pbkdf2_hmac_sha256, derive_key
 
 
 def needs_iv_in_file(mode: str) -> bool:
 
-    return mode.lower() in ['cbc', 'cfb', 'ofb', 'ctr']
+    return mode.lower() in ['cbc', 'cfb', 'cfb8', 'cfb64', 'cfb128', 'ofb', 'ctr']
 
 
-def run_encryption(args):
+def supports_parallel(mode: str, decrypting: bool = False) -> bool:
 
-    try:
-        # Handle key
-        if args.key_bytes:
-            key_bytes = args.key_bytes
-            print_key_info(key_bytes, source="provided")
-        else:
-            # Generate key for encryption
-            if not args.encrypt:
-                print("Error: Key required for decryption", file=sys.stderr)
-                sys.exit(1)
+    # Counter-based modes can be split into independent segments; CBC and
+    # CFB only when decrypting, where every block depends on ciphertext alone
+    mode = mode.lower()
+    return mode in ['ctr', 'gcm'] or (decrypting and (mode == 'cbc' or mode.startswith('cfb')))
 
-            key_bytes = generate_aes_key()
-            print_key_info(key_bytes, source="generated")
-            print("[INFO] Please save this key for decryption!", file=sys.stderr)
 
-        # Handle IV/Nonce
-        iv_bytes = args.iv_bytes
+def _create_pool(args):
 
-        # Read input data based on mode
-        if args.mode.lower() == 'gcm':
-            if args.decrypt:
-                # For GCM decryption, read special format
-                nonce, input_data, tag = read_gcm_file(args.input)
-                input_data = nonce + input_data + tag
-                iv_bytes = nonce
-            else:
-                # For GCM encryption, read plain file
-                _, input_data = read_file_with_iv(args.input, has_iv=False)
+    if args.jobs <= 1:
+        return None
 
-        elif args.mode.lower() == 'etm':
-            if args.decrypt:
-                # For ETM decryption, read with IV and tag
-                iv_bytes, ciphertext, tag = read_etm_file(args.input, has_iv=True)
-                input_data = (iv_bytes or b"") + ciphertext + tag
-            else:
-                _, input_data = read_file_with_iv(args.input, has_iv=False)
+    if not supports_parallel(args.mode, args.decrypt):
+        operation = 'encryption' if args.encrypt else 'decryption'
+        print(f"[WARNING] --jobs is ignored for {args.mode.upper()} {operation}", file=sys.stderr)
+        return None
 
-        elif args.decrypt and not iv_bytes and needs_iv_in_file(args.mode):
-            # For other modes with IV, read from file
-            iv_bytes, input_data = read_file_with_iv(args.input, has_iv=True)
-        else:
-            _, input_data = read_file_with_iv(args.input, has_iv=False)
+    return SegmentPool(args.jobs)
 
-        # Execute based on mode
-        if args.mode.lower() == 'gcm':
-            _run_gcm(args, key_bytes, iv_bytes, input_data)
 
-        elif args.mode.lower() == 'etm':
-            _run_etm(args, key_bytes, iv_bytes, input_data)
+def _chunk_size(pool) -> int:
 
-        else:
-            _run_standard_mode(args, key_bytes, iv_bytes, input_data)
+    # Read enough per chunk to give every worker a full segment
+    if pool is None:
+        return DEFAULT_CHUNK_SIZE
+    return pool.jobs * SEGMENT_SIZE
 
-    except (ValueError, GCMAuthError, ETMAuthError) as e:
+
+def run_encryption(args):
+
+    if args.batch:
+        run_batch_encryption(args)
+        return
+
+    try:
+        key_bytes = _resolve_key(args)
+
+        # Standard modes and GCM are streamed chunk by chunk, so the input
+        # is never loaded into memory as a whole
+        with _closing_pool(_create_pool(args)) as pool:
+            iv_bytes = _process_file(args, key_bytes, args.iv_bytes, args.input, args.output, pool)
+
+        _report_file(args, iv_bytes)
+
+    # Partial outputs have already been removed where they were written
+    # (_in_place_output); atomic outputs leave an existing file untouched
+    except (GCMAuthError, ETMAuthError, ValueError, OSError) as e:
         print(f"[ERROR] {e}", file=sys.stderr)
-        _cleanup_failed_file(args.output)
         sys.exit(1)
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}", file=sys.stderr)
-        _cleanup_failed_file(args.output)
         sys.exit(1)
 
 
-def _run_gcm(args, key_bytes, nonce_bytes, input_data):
+def _resolve_key(args) -> bytes:
 
-    gcm = GCM(key_bytes, nonce_bytes)
+    if args.key_bytes:
+        print_key_info(args.key_bytes, source="provided")
+        return args.key_bytes
 
-    if args.encrypt:
-        ciphertext = gcm.encrypt(input_data, args.aad_bytes)
-        write_file_with_iv(args.output, None, ciphertext)
+    # Generate key for encryption
+    if not args.encrypt:
+        print("Error: Key required for decryption", file=sys.stderr)
+        sys.exit(1)
+
+    key_bytes = generate_aes_key()
+    print_key_info(key_bytes, source="generated")
+    print("[INFO] Please save this key for decryption!", file=sys.stderr)
+    return key_bytes
+
+
+def _process_file(args, key_bytes, iv_bytes, input_path, output_path, pool=None, gcm_key=None):
+
+    # Encrypts or decrypts one file in the selected mode. Returns the IV/nonce
+    # written in front of the ciphertext, or None when there is none.
+    mode = args.mode.lower()
+
+    if mode == 'gcm':
+        return _run_gcm(args, key_bytes, iv_bytes, input_path, output_path, pool, gcm_key)
+    if mode == 'etm':
+        return _run_etm(args, key_bytes, iv_bytes, input_path, output_path)
+    return _run_standard_mode(args, key_bytes, iv_bytes, input_path, output_path, pool)
+
+
+def _report_file(args, iv_bytes):
+
+    mode = args.mode.lower()
 
-        print(f"[INFO] Generated nonce (hex): {gcm.nonce.hex()}")
-        print(f"[INFO] Nonce written to beginning of output file")
+    if args.encrypt:
+        if mode == 'gcm':
+            print(f"[INFO] Generated nonce (hex): {iv_bytes.hex()}")
+            print(f"[INFO] Nonce written to beginning of output file")
+        elif iv_bytes is not None:
+            print(f"[INFO] Generated IV (hex): {iv_bytes.hex()}")
+            if mode != 'etm':
+                print(f"[INFO] IV written to beginning of output file")
         print(f"Successfully encrypted {args.input} -> {args.output}")
+        return
+
+    if mode == 'gcm':
+        print(f"[SUCCESS] GCM decryption completed successfully")
+    elif mode == 'etm':
+        print(f"[SUCCESS] Encrypt-then-MAC decryption completed successfully")
+    print(f"Successfully decrypted {args.input} -> {args.output}")
+
+
+def _run_gcm(args, key_bytes, nonce_bytes, input_path, output_path, pool=None, gcm_key=None):
+
+    chunk_size = _chunk_size(pool)
+
+    # Hash-key tables depend only on the key; batches pass one shared GCMKey
+    if gcm_key is None:
+        gcm_key = GCMKey(key_bytes, pool)
+
+    with open_input_file(input_path) as source:
+        if args.encrypt:
+            nonce = nonce_bytes or generate_random_bytes(12)
+            context = GCMContext(gcm_key, nonce, decrypting=False)
+            context.update_aad(args.aad_bytes)
+
+            with _in_place_output(open_output_file(output_path), output_path) as destination:
+                destination.write(nonce)
+                while chunk := source.read(chunk_size):
+                    destination.write(context.update(chunk))
+                destination.write(context.finalize())
+
+            return nonce
+
+        # For GCM decryption, the nonce is read from the file
+        nonce, ciphertext_length = read_gcm_header(source)
+        context = GCMContext(gcm_key, nonce, decrypting=True)
+        context.update_aad(args.aad_bytes)
+
+        # Plaintext is written to a temporary file that replaces the
+        # output only after the tag has been verified
+        with AtomicOutputFile(output_path) as destination:
+            if ciphertext_length is None:
+                # Pipes: read to EOF, the last 16 bytes turn out to be the tag
+                chunks = TrailerSplitter(source, 16, chunk_size)
+                for chunk in chunks:
+                    destination.write(context.update(chunk))
+                tag = chunks.trailer
+            else:
+                for chunk in read_chunks(source, ciphertext_length, chunk_size):
+                    destination.write(context.update(chunk))
+                tag = source.read(16)
 
-    else:
-        try:
-            plaintext = gcm.decrypt(input_data, args.aad_bytes)
-            write_file_with_iv(args.output, None, plaintext)
-            print(f"[SUCCESS] GCM decryption completed successfully")
-            print(f"Successfully decrypted {args.input} -> {args.output}")
+            try:
+                context.verify(tag)
+            except GCMAuthError:
+                raise GCMAuthError("GCM authentication failed: AAD mismatch or ciphertext tampered")
 
-        except GCMAuthError:
-            print(f"[ERROR] GCM authentication failed: AAD mismatch or ciphertext tampered",
-                  file=sys.stderr)
-            _cleanup_failed_file(args.output)
-            sys.exit(1)
+            destination.commit()
+
+        return None
 
 
-def _run_etm(args, key_bytes, iv_bytes, input_data):
+def _run_etm(args, key_bytes, iv_bytes, input_path, output_path):
+
+    # File format: IV || ciphertext || HMAC-SHA256(ciphertext || AAD).
+    # The input is memory-mapped and the output preallocated, and both are
+    # processed chunk by chunk, so memory use does not depend on file size.
+    chunk_size = DEFAULT_CHUNK_SIZE
 
     # Determine base mode (default to CBC)
     base_mode = 'cbc'
-    if args.mode.lower() == 'etm':
-        # Could parse from args if extended
-        pass
 
-    etm = EncryptThenMAC(base_mode, key_bytes, iv_bytes)
+    # Pipes and other inputs of unknown size cannot be mapped
+    if not stat.S_ISREG(os.stat(input_path).st_mode):
+        return _run_etm_sequential(args, key_bytes, iv_bytes, input_path, output_path, base_mode)
 
     if args.encrypt:
-        ciphertext = etm.encrypt(input_data, args.aad_bytes)
-        write_file_with_iv(args.output, None, ciphertext)
+        etm = EncryptThenMAC(base_mode, key_bytes, iv_bytes)
+        mac = HMACStream.from_hmac(etm.hmac)
+        encryptor = etm.cipher.encryptor()
 
-        if iv := etm.get_iv():
-            print(f"[INFO] Generated IV (hex): {iv.hex()}")
+        with MappedInput(input_path) as source:
+            body = source.body
+            padded_length = (len(body) // 16 + 1) * 16
 
-        print(f"Successfully encrypted {args.input} -> {args.output}")
+            with _in_place_output(PreallocatedOutput(output_path, 16 + padded_length + 32), output_path) as destination:
+                destination.write(etm.cipher.iv)
 
-    else:
-        try:
-            plaintext = etm.decrypt(input_data, args.aad_bytes)
-            write_file_with_iv(args.output, None, plaintext)
-            print(f"[SUCCESS] Encrypt-then-MAC decryption completed successfully")
-            print(f"Successfully decrypted {args.input} -> {args.output}")
+                for offset in range(0, len(body), chunk_size):
+                    ciphertext = encryptor.update(body[offset:offset + chunk_size])
+                    destination.write(ciphertext)
+                    mac.update(ciphertext)
 
-        except ETMAuthError:
-            print(f"[ERROR] Encrypt-then-MAC authentication failed",
-                  file=sys.stderr)
-            _cleanup_failed_file(args.output)
-            sys.exit(1)
+                ciphertext = encryptor.finalize()
+                destination.write(ciphertext)
+                mac.update(ciphertext)
+                mac.update(args.aad_bytes)
+                destination.write(mac.finalize())
 
+        return etm.cipher.iv
 
-def _run_standard_mode(args, key_bytes, iv_bytes, input_data):
+    with MappedInput(input_path, 16, 32) as source:
+        body = source.body
+        etm = EncryptThenMAC(base_mode, key_bytes, bytes(source.header))
 
-    cipher = create_mode(args.mode, key_bytes, iv_bytes)
+        # The MAC is checked over the whole file before anything is decrypted
+        mac = HMACStream.from_hmac(etm.hmac)
+        for offset in range(0, len(body), chunk_size):
+            mac.update(body[offset:offset + chunk_size])
+        mac.update(args.aad_bytes)
 
-    if args.encrypt:
-        output_data = cipher.encrypt(input_data)
+        if not _native_hmac.compare_digest(mac.finalize(), source.trailer):
+            raise ETMAuthError("Encrypt-then-MAC authentication failed")
+
+        decryptor = etm.cipher.decryptor()
+        with _in_place_output(PreallocatedOutput(output_path, len(body)), output_path) as destination:
+            for offset in range(0, len(body), chunk_size):
+                destination.write(decryptor.update(body[offset:offset + chunk_size]))
+            destination.write(decryptor.finalize())
+
+    return None
+
+
+def _run_etm_sequential(args, key_bytes, iv_bytes, input_path, output_path, base_mode):
+
+    # Same format as _run_etm, read front to back. When decrypting the MAC can
+    # only be checked at EOF, so the plaintext goes to an AtomicOutputFile that
+    # replaces the output only after the MAC has been verified.
+    chunk_size = DEFAULT_CHUNK_SIZE
+
+    with open_input_file(input_path) as source:
+        if args.encrypt:
+            etm = EncryptThenMAC(base_mode, key_bytes, iv_bytes)
+            mac = HMACStream.from_hmac(etm.hmac)
+            encryptor = etm.cipher.encryptor()
+
+            with _in_place_output(open_output_file(output_path), output_path) as destination:
+                destination.write(etm.cipher.iv)
+
+                while chunk := source.read(chunk_size):
+                    ciphertext = encryptor.update(chunk)
+                    destination.write(ciphertext)
+                    mac.update(ciphertext)
+
+                ciphertext = encryptor.finalize()
+                destination.write(ciphertext)
+                mac.update(ciphertext)
+                mac.update(args.aad_bytes)
+                destination.write(mac.finalize())
+
+            return etm.cipher.iv
+
+        etm = EncryptThenMAC(base_mode, key_bytes, read_iv(source))
+        mac = HMACStream.from_hmac(etm.hmac)
+        decryptor = etm.cipher.decryptor()
+
+        # The last 32 bytes read before EOF are the MAC
+        chunks = TrailerSplitter(source, 32, chunk_size)
+        with AtomicOutputFile(output_path) as destination:
+            for chunk in chunks:
+                mac.update(chunk)
+                destination.write(decryptor.update(chunk))
+            mac.update(args.aad_bytes)
 
-        if needs_iv_in_file(args.mode):
-            write_file_with_iv(args.output, cipher.iv, output_data)
-            print(f"[INFO] Generated IV (hex): {cipher.get_iv_hex()}")
-            print(f"[INFO] IV written to beginning of output file")
+            if not _native_hmac.compare_digest(mac.finalize(), chunks.trailer):
+                raise ETMAuthError("Encrypt-then-MAC authentication failed")
+
+            destination.write(decryptor.finalize())
+            destination.commit()
+
+    return None
+
+
+def _run_standard_mode(args, key_bytes, iv_bytes, input_path, output_path, pool=None):
+
+    chunk_size = _chunk_size(pool)
+
+    with open_input_file(input_path) as source:
+        if args.decrypt and not iv_bytes and needs_iv_in_file(args.mode):
+            # For modes with IV, read it from the beginning of the file
+            iv_bytes = read_iv(source)
+
+        # OFB keystream is generated on a background thread while the file
+        # is read; for inputs of a single chunk the thread would only add cost
+        prefetch = os.fstat(source.fileno()).st_size > chunk_size
+        cipher = create_mode(args.mode, key_bytes, iv_bytes, pool=pool,
+                             backend=args.backend, prefetch=prefetch)
+
+        with _in_place_output(open_output_file(output_path), output_path) as destination:
+            if args.decrypt:
+                stream_decrypt(cipher, source, destination, chunk_size)
+                return None
+
+            if needs_iv_in_file(args.mode):
+                destination.write(cipher.iv)
+
+            stream_encrypt(cipher, source, destination, chunk_size)
+
+    return cipher.iv if needs_iv_in_file(args.mode) else None
+
+
+def run_batch_encryption(args):
+
+    # Many files in one process: --input-dir/--output-dir or --manifest.
+    # Every file gets its own IV/nonce; failures are collected and reported
+    # at the end instead of stopping the batch.
+    try:
+        if args.input_dir:
+            entries = walk_directory(args.input_dir, args.output_dir)
         else:
-            write_file_with_iv(args.output, None, output_data)
+            entries = [(input_path, output_path or default_output_path(input_path, args.encrypt))
+                       for input_path, output_path in read_manifest(args.manifest)]
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        sys.exit(1)
 
-        operation = "encrypted"
+    key_bytes = _resolve_key(args)
+    errors = process_many(args, key_bytes, entries, args.workers, args.executor)
+
+    failures = [{'input': input_path, 'output': output_path, 'error': error}
+                for (input_path, output_path), error in zip(entries, errors) if error is not None]
+    operation = 'encrypted' if args.encrypt else 'decrypted'
+
+    for failure in failures:
+        print(f"[ERROR] {failure['input']}: {failure['error']}", file=sys.stderr)
+    print(f"[INFO] Batch {operation}: {len(entries) - len(failures)} of {len(entries)} files, "
+          f"{len(failures)} failed")
+
+    if args.report:
+        write_batch_report(args.report, {
+            'operation': operation,
+            'mode': args.mode.lower(),
+            'total': len(entries),
+            'succeeded': len(entries) - len(failures),
+            'failed': len(failures),
+            'failures': failures,
+        })
+        print(f"[INFO] Report written to {args.report}")
+
+    if failures:
+        sys.exit(1)
 
-    else:
-        output_data = cipher.decrypt(input_data)
-        write_file_with_iv(args.output, None, output_data)
-        operation = "decrypted"
 
-    print(f"Successfully {operation} {args.input} -> {args.output}")
+def _batch_state(args, key_bytes):
+
+    # Per-key state shared by all files of a batch. AES key schedules are
+    # already shared through the cipher cache; GCM hash-key tables are not.
+    gcm_key = GCMKey(key_bytes) if args.mode.lower() == 'gcm' else None
+    return args, key_bytes, gcm_key
+
+
+def _process_entry(state, entry):
+
+    # Returns None on success or the error message; a failed file never
+    # stops the batch
+    args, key_bytes, gcm_key = state
+    input_path, output_path = entry
+
+    try:
+        _process_file(args, key_bytes, None, input_path, output_path, gcm_key=gcm_key)
+        return None
+    except (GCMAuthError, ETMAuthError) as e:
+        return str(e)
+    except Exception as e:
+        # OSError from the file helpers names the path and the cause
+        return str(e) or type(e).__name__
+
+
+def _init_worker(args, key_bytes):
+
+    global _worker_state
+    _worker_state = _batch_state(args, key_bytes)
+
+
+def _process_entry_in_worker(entry):
+
+    return _process_entry(_worker_state, entry)
+
+
+def process_many(args, key_bytes, entries, workers: int = 1, executor: str = 'thread'):
+
+    # One result per (input, output) entry, in order: None or an error message.
+    # Per-key state is built once (once per worker process for executor='process').
+    if workers <= 0:
+        raise ValueError(f"Number of workers must be positive, got {workers}")
+    if executor not in ['thread', 'process']:
+        raise ValueError(f"Unsupported executor '{executor}'. Valid: thread, process")
+
+    if workers == 1 or len(entries) <= 1:
+        state = _batch_state(args, key_bytes)
+        return [_process_entry(state, entry) for entry in entries]
+
+    if executor == 'process':
+        chunksize = max(1, len(entries) // (workers * 16))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(args, key_bytes)) as pool:
+            return list(pool.map(_process_entry_in_worker, entries, chunksize=chunksize))
+
+    # Mode objects are created per file; the shared state is read-only
+    state = _batch_state(args, key_bytes)
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(lambda entry: _process_entry(state, entry), entries))
+
+
+@contextmanager
+def _closing_pool(pool):
+
+    try:
+        yield pool
+    finally:
+        if pool is not None:
+            pool.close()
+
+
+@contextmanager
+def _in_place_output(output, filepath: str):
+
+    # Outputs written in place (not through AtomicOutputFile) are removed when
+    # processing fails, so no partial file is left behind. Only files opened
+    # here are ever removed: a failure before that keeps an existing target.
+    try:
+        with output as destination:
+            yield destination
+    except BaseException:
+        _cleanup_failed_file(filepath)
+        raise
 
 
 def _cleanup_failed_file(filepath: str):
@@ -223,14 +506,14 @@ def run_hash(args):
 
 def _compute_hash_direct(args, data: bytes) -> str:
 
-    hash_obj = create_hash(args.algorithm)
+    hash_obj = create_hash(args.algorithm, args.backend)
     hash_obj.update(data)
     return hash_obj.hexdigest()
 
 
 def _compute_hash_streaming(args, filepath: str) -> str:
 
-    hash_obj = create_hash(args.algorithm)
+    hash_obj = create_hash(args.algorithm, args.backend)
 
     with open(filepath, 'rb') as f:
         while chunk := f.read(8192):
@@ -243,7 +526,7 @@ def _compute_mac_direct(args, data: bytes) -> str:
 
     if args.hmac:
         from .mac import HMAC
-        hmac = HMAC(args.key_bytes, args.algorithm)
+        hmac = HMAC(args.key_bytes, args.algorithm, args.backend)
         return hmac.compute_hex(data)
     else:
         from .mac import AESCMAC
@@ -254,7 +537,7 @@ def _compute_mac_direct(args, data: bytes) -> str:
 def _compute_mac_streaming(args, filepath: str) -> str:
 
     if args.hmac:
-        hmac_stream = HMACStream(args.key_bytes, args.algorithm)
+        hmac_stream = HMACStream(args.key_bytes, args.algorithm, args.backend)
 
         with open(filepath, 'rb') as f:
             while chunk := f.read(8192):
@@ -262,13 +545,13 @@ def _compute_mac_streaming(args, filepath: str) -> str:
 
         return hmac_stream.finalize_hex()
     else:
-        # CMAC needs entire data
+        cmac_stream = CMACStream(args.key_bytes)
+
         with open(filepath, 'rb') as f:
-            data = f.read()
+            while chunk := f.read(8192):
+                cmac_stream.update(chunk)
 
-        from .mac import AESCMAC
-        cmac = AESCMAC(args.key_bytes)
-        return cmac.compute_hex(data)
+        return cmac_stream.finalize_hex()
 
 
 def _verify_mac(args, input_name: str, computed_value: str):
@@ -309,13 +592,19 @@ def run_derive(args):
 
         print(f"[INFO] Deriving {args.length}-byte key with {args.iterations} iterations...")
 
+        # hashlib derives all blocks in one call, only the pure backend splits them
+        if args.jobs > 1 and is_native(HASH_BACKENDS['sha256'], args.backend):
+            print("[WARNING] --jobs is ignored with the native backend", file=sys.stderr)
+
         # Perform key derivation
         if args.algorithm.lower() == 'pbkdf2':
             derived_key = pbkdf2_hmac_sha256(
                 password=args.password,
                 salt=salt_bytes,
                 iterations=args.iterations,
-                dklen=args.length
+                dklen=args.length,
+                backend=args.backend,
+                workers=args.jobs
             )
         else:
             print(f"Error: Unsupported KDF algorithm: {args.algorithm}", file=sys.stderr)
@@ -362,8 +651,8 @@ def run_derive(args):
         if args.length >= 32:
             print("\n[INFO] Example key hierarchy usage:")
             print("  Master key (first 32 bytes): " + derived_key[:32].hex())
-            print("  Encryption key: " + derive_key(derived_key[:32], "encryption", 32).hex()[:16] + "...")
-            print("  Authentication key: " + derive_key(derived_key[:32], "authentication", 32).hex()[:16] + "...")
+            print("  Encryption key: " + derive_key(derived_key[:32], "encryption", 32, args.backend).hex()[:16] + "...")
+            print("  Authentication key: " + derive_key(derived_key[:32], "authentication", 32, args.backend).hex()[:16] + "...")
 
     except ValueError as e:
         print(f"[ERROR] Invalid parameters: {e}", file=sys.stderr)
@@ -1,6 +1,10 @@
 import sys
 import os
-from typing import Tuple, Optional
+import json
+import mmap
+import stat
+import tempfile
+from typing import Tuple, Optional, BinaryIO, Iterator, List
 
 
 def read_file_with_iv(filepath: str, has_iv: bool = False) -> Tuple[Optional[bytes], bytes]:
@@ -21,62 +25,304 @@ def read_file_with_iv(filepath: str, has_iv: bool = False) -> Tuple[Optional[byt
         sys.exit(1)
 
 
-def read_gcm_file(filepath: str) -> Tuple[bytes, bytes, bytes]:
+def read_iv(f: BinaryIO, iv_size: int = 16) -> bytes:
 
-    try:
-        with open(filepath, 'rb') as f:
-            nonce = f.read(12)
-            if len(nonce) != 12:
-                raise ValueError("File too short for GCM nonce")
+    iv = f.read(iv_size)
+    if len(iv) != iv_size:
+        raise ValueError("File too short to contain IV")
+    return iv
 
-            # Read the rest
-            remaining = f.read()
-            if len(remaining) < 16:
-                raise ValueError("File too short for GCM tag")
 
-            tag = remaining[-16:]
-            ciphertext = remaining[:-16]
+# The helpers below let OSError propagate (its message names the path):
+# the CLI reports it and exits, batch mode records it for the failing file
 
-        return nonce, ciphertext, tag
-    except IOError as e:
-        print(f"Error reading GCM file {filepath}: {e}", file=sys.stderr)
-        sys.exit(1)
+def open_input_file(filepath: str) -> BinaryIO:
 
+    return open(filepath, 'rb')
 
-def read_etm_file(filepath: str, has_iv: bool = True) -> Tuple[Optional[bytes], bytes, bytes]:
 
+def open_output_file(filepath: str) -> BinaryIO:
+
+    os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+    return open(filepath, 'wb')
+
+
+def read_chunks(f: BinaryIO, length: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+
+    # Read exactly `length` bytes from the current position, chunk by chunk
+    while length > 0:
+        chunk = f.read(min(chunk_size, length))
+        if not chunk:
+            raise ValueError("Unexpected end of file")
+        length -= len(chunk)
+        yield chunk
+
+
+def read_gcm_header(f: BinaryIO) -> Tuple[bytes, Optional[int]]:
+
+    # Returns the nonce and the length of the ciphertext that follows it;
+    # the last 16 bytes of the file are the tag. The length is None when the
+    # input is not a regular file (pipe, /dev/stdin) and its size is unknown.
+    nonce = f.read(12)
+    if len(nonce) != 12:
+        raise ValueError("File too short for GCM nonce")
+
+    status = os.fstat(f.fileno())
+    if not stat.S_ISREG(status.st_mode):
+        return nonce, None
+
+    ciphertext_length = status.st_size - 12 - 16
+    if ciphertext_length < 0:
+        raise ValueError("File too short for GCM tag")
+
+    return nonce, ciphertext_length
+
+
+class TrailerSplitter:
+
+
+    # Reads until EOF, yielding everything except the last trailer_size bytes,
+    # which are kept in `trailer` once iteration is over. Used when the input
+    # size is not known up front; at most one chunk plus the trailer is held.
+
+    def __init__(self, f: BinaryIO, trailer_size: int, chunk_size: int = 64 * 1024):
+        self._file = f
+        self._trailer_size = trailer_size
+        self._chunk_size = chunk_size
+        self.trailer = None
+
+    def __iter__(self) -> Iterator[bytes]:
+
+        pending = b''
+        while chunk := self._file.read(self._chunk_size):
+            pending += chunk
+            if len(pending) > self._trailer_size:
+                yield pending[:-self._trailer_size]
+                pending = pending[-self._trailer_size:]
+
+        if len(pending) < self._trailer_size:
+            raise ValueError(f"File too short for {self._trailer_size}-byte tag")
+        self.trailer = pending
+
+
+def _current_umask() -> int:
+
+    # Read without changing it where the kernel exposes it (Linux); otherwise
+    # the usual set-and-restore, which is only briefly visible to other threads
     try:
-        with open(filepath, 'rb') as f:
-            if has_iv:
-                iv = f.read(16)
-                if len(iv) != 16:
-                    raise ValueError("File too short for IV")
-                remaining = f.read()
-            else:
-                iv = None
-                remaining = f.read()
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
 
-            if len(remaining) < 32:
-                raise ValueError("File too short for HMAC tag")
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
 
-            tag = remaining[-32:]
-            ciphertext = remaining[:-32]
 
-        return iv, ciphertext, tag
-    except IOError as e:
-        print(f"Error reading ETM file {filepath}: {e}", file=sys.stderr)
-        sys.exit(1)
+class AtomicOutputFile:
+
+
+    # Writes go to a temporary file next to the target. The target only
+    # appears (atomically, via rename) after commit(); otherwise the
+    # temporary file is removed when the context exits.
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._committed = False
+
+        directory = os.path.dirname(filepath) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(filepath)}.", suffix=".tmp")
+
+        self._file = os.fdopen(fd, 'wb')
+
+    def write(self, data: bytes) -> int:
+
+        return self._file.write(data)
+
+    def commit(self):
+
+        self._file.flush()
+        # mkstemp creates the file as 0600; give it the mode a plain open()
+        # would have produced (or the mode of the file being replaced)
+        self._apply_mode()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._temp_path, self.filepath)
+        self._committed = True
+
+    def _apply_mode(self):
+
+        try:
+            mode = stat.S_IMODE(os.stat(self.filepath).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_current_umask()
+
+        if hasattr(os, 'fchmod'):
+            os.fchmod(self._file.fileno(), mode)
+        else:
+            os.chmod(self._temp_path, mode)
+
+    def discard(self):
+
+        if not self._file.closed:
+            self._file.close()
+        if not self._committed and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def __enter__(self) -> 'AtomicOutputFile':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.discard()
+
+
+class MappedInput:
+
+
+    # Read-only memory map of an input file. header, body and trailer
+    # (e.g. IV / ciphertext / tag) are zero-copy memoryviews into the
+    # mapping, so even a very large file only costs address space.
+
+    def __init__(self, filepath: str, header_size: int = 0, trailer_size: int = 0):
+        self._file = open(filepath, 'rb')
 
+        size = os.fstat(self._file.fileno()).st_size
+        if size < header_size + trailer_size:
+            self._file.close()
+            raise ValueError(f"File too short: {size} bytes, need at least {header_size + trailer_size}")
 
-def write_file_with_iv(filepath: str, iv: Optional[bytes], data: bytes) -> None:
+        # Empty files cannot be mapped
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._map) if self._map is not None else memoryview(b'')
 
+        self.header = self._view[:header_size]
+        self.body = self._view[header_size:size - trailer_size]
+        self.trailer = self._view[size - trailer_size:]
+
+    def close(self):
+
+        for view in (self.header, self.body, self.trailer, self._view):
+            view.release()
+
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A caller still holds a slice of the mapping; it is
+                # unmapped once that slice is released
+                pass
+        self._file.close()
+
+    def __enter__(self) -> 'MappedInput':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PreallocatedOutput:
+
+
+    # Output file whose size is reserved up front (posix_fallocate, or
+    # ftruncate where that is unavailable) and which is written in place
+    # through a memory map. close() trims the file to the highest offset
+    # written, so an upper bound is enough when the exact size is unknown
+    # (e.g. plaintext before the padding is removed).
+
+    def __init__(self, filepath: str, size: int):
+        self.filepath = filepath
+        self.size = size
+        self.length = 0
+        self._position = 0
+
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        self._file = open(filepath, 'w+b')
+        try:
+            self._reserve(size)
+        except OSError:
+            self._file.close()
+            raise
+
+        self._map = mmap.mmap(self._file.fileno(), size) if size else None
+
+    def _reserve(self, size: int):
+
+        fd = self._file.fileno()
+        if size and hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError:
+                # Not supported by every filesystem, fall back to a sparse file
+                pass
+        os.ftruncate(fd, size)
+
+    def write_at(self, offset: int, data: bytes) -> int:
+
+        end = offset + len(data)
+        if offset < 0 or end > self.size:
+            raise ValueError(f"Write of {len(data)} bytes at {offset} exceeds preallocated size {self.size}")
+
+        if data:
+            self._map[offset:end] = data
+        self.length = max(self.length, end)
+        return len(data)
+
+    def write(self, data: bytes) -> int:
+
+        # Sequential writes, so that it can stand in for a file object
+        written = self.write_at(self._position, data)
+        self._position += written
+        return written
+
+    def close(self):
+
+        if self._file.closed:
+            return
+
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+        os.ftruncate(self._file.fileno(), self.length)
+        self._file.close()
+
+    def __enter__(self) -> 'PreallocatedOutput':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_gcm_file(filepath: str) -> Tuple[bytes, bytes, bytes]:
+
+    # Each part is copied out of the mapping exactly once
+    with MappedInput(filepath, 12, 16) as source:
+        return bytes(source.header), bytes(source.body), bytes(source.trailer)
+
+
+def read_etm_file(filepath: str, has_iv: bool = True) -> Tuple[Optional[bytes], bytes, bytes]:
+
+    with MappedInput(filepath, 16 if has_iv else 0, 32) as source:
+        iv = bytes(source.header) if has_iv else None
+        return iv, bytes(source.body), bytes(source.trailer)
+
+
+def write_file_with_iv(filepath: str, iv: Optional[bytes], *parts: bytes) -> None:
+
+    # The parts are written one after another, never joined in memory
     try:
         os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
 
         with open(filepath, 'wb') as f:
             if iv:
                 f.write(iv)
-            f.write(data)
+            for part in parts:
+                f.write(part)
     except IOError as e:
         print(f"Error writing file {filepath}: {e}", file=sys.stderr)
         sys.exit(1)
@@ -84,9 +330,62 @@ def write_file_with_iv(filepath: str, iv: Optional[bytes], data: bytes) -> None:
 
 def write_gcm_file(filepath: str, nonce: bytes, ciphertext: bytes, tag: bytes) -> None:
 
-    write_file_with_iv(filepath, nonce, ciphertext + tag)
+    write_file_with_iv(filepath, nonce, ciphertext, tag)
 
 
 def write_etm_file(filepath: str, iv: Optional[bytes], ciphertext: bytes, tag: bytes) -> None:
 
-    write_file_with_iv(filepath, iv, ciphertext + tag)
\ No newline at end of file
+    write_file_with_iv(filepath, iv, ciphertext, tag)
+
+
+def walk_directory(input_dir: str, output_dir: str) -> List[Tuple[str, str]]:
+
+    # Every regular file below input_dir, paired with the same relative path
+    # below output_dir. Sorted, so batches are processed in a stable order.
+    entries = []
+
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            input_path = os.path.join(root, name)
+            if not os.path.isfile(input_path):
+                continue
+            relative = os.path.relpath(input_path, input_dir)
+            entries.append((input_path, os.path.join(output_dir, relative)))
+
+    return entries
+
+
+def read_manifest(filepath: str) -> List[Tuple[str, Optional[str]]]:
+
+    # One file per line: the input path, optionally followed by a tab and the
+    # output path. Blank lines and lines starting with '#' are skipped;
+    # relative paths are resolved against the manifest's directory.
+    base = os.path.dirname(os.path.abspath(filepath))
+    entries = []
+
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+
+            fields = line.split('\t')
+            if len(fields) > 2 or not fields[0]:
+                raise ValueError(f"{filepath}:{number}: expected 'input' or 'input<TAB>output'")
+
+            paths = [os.path.join(base, path) if path else None for path in fields]
+            entries.append((paths[0], paths[1] if len(paths) == 2 else None))
+
+    return entries
+
+
+def write_batch_report(filepath: str, report: dict) -> None:
+
+    try:
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except IOError as e:
+        print(f"Error writing file {filepath}: {e}", file=sys.stderr)
+        sys.exit(1)
\ No newline at end of file
@@ -1,34 +1,62 @@
+import hashlib
+from typing import Optional
+from src.backend import select_implementation
 from .sha256 import SHA256
 from .sha3_256 import SHA3_256
 
 
-def create_hash(algorithm: str):
+def _native_hash(name: str):
+
+    # hashlib constructor, or None if this Python build lacks the algorithm
+    try:
+        hashlib.new(name)
+    except ValueError:
+        return None
+    return getattr(hashlib, name)
+
+
+# Available implementations per algorithm and backend
+HASH_BACKENDS = {
+    'sha256': {'pure': SHA256, 'native': _native_hash('sha256')},
+    'sha3_256': {'pure': SHA3_256, 'native': _native_hash('sha3_256')},
+}
+
+
+def _normalize_algorithm(algorithm: str) -> str:
 
     algorithm = algorithm.lower().replace('-', '').replace('_', '')
 
     if algorithm == 'sha256':
-        return SHA256()
-    elif algorithm in ['sha3256', 'sha3_256', 'sha3']:
-        return SHA3_256()
+        return 'sha256'
+    elif algorithm in ['sha3256', 'sha3']:
+        return 'sha3_256'
     else:
         raise ValueError(f"Unsupported hash algorithm: {algorithm}")
 
 
-def hash_data(data: bytes, algorithm: str = 'sha256') -> bytes:
+def create_hash(algorithm: str, backend: Optional[str] = None):
+
+    # Both backends expose update()/digest()/hexdigest()
+    name = _normalize_algorithm(algorithm)
+    return select_implementation(HASH_BACKENDS[name], backend, name)()
+
+
+def hash_data(data: bytes, algorithm: str = 'sha256', backend: Optional[str] = None) -> bytes:
 
-    hash_obj = create_hash(algorithm)
+    hash_obj = create_hash(algorithm, backend)
     hash_obj.update(data)
     return hash_obj.digest()
 
 
-def hash_data_hex(data: bytes, algorithm: str = 'sha256') -> str:
+def hash_data_hex(data: bytes, algorithm: str = 'sha256', backend: Optional[str] = None) -> str:
 
-    return hash_data(data, algorithm).hex()
+    return hash_data(data, algorithm, backend).hex()
 
 
-def hash_file(filepath: str, algorithm: str = 'sha256', chunk_size: int = 8192) -> str:
+def hash_file(filepath: str, algorithm: str = 'sha256', chunk_size: int = 8192,
+              backend: Optional[str] = None) -> str:
 
-    hash_obj = create_hash(algorithm)
+    hash_obj = create_hash(algorithm, backend)
 
     with open(filepath, 'rb') as f:
         while chunk := f.read(chunk_size):
@@ -1,28 +1,127 @@
 import struct
-from typing import List
-from .utils import rotate_right, shift_right
+from typing import List, Sequence
+
+
+# Initial hash values (first 32 bits of fractional parts of square roots of first 8 primes)
+_H0 = (
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
+    0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+)
+
+# Round constants (first 32 bits of fractional parts of cube roots of first 64 primes)
+_K = (
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+)
+
+# Whole block as 16 big-endian words in one call
+_SCHEDULE = struct.Struct('>16I')
+_DIGEST = struct.Struct('>8I')
+
+
+def compress(state: Sequence[int], w: List[int]) -> List[int]:
+
+    # One compression of a block given as 16 words; w is extended in place
+    # to the 64-word schedule. Returns the new state.
+    #
+    # The helper functions are inlined and eight rounds are unrolled per
+    # loop iteration with the working variables renamed instead of shifted.
+    # Rotations are not masked: bits above 32 never carry downwards in
+    # addition, so one mask per assignment is enough.
+    k = _K
+
+    # Extend to 64 words
+    for i in range(16, 64):
+        x = w[i - 15]
+        y = w[i - 2]
+        w.append((w[i - 16] + w[i - 7]
+                  + ((x >> 7 | x << 25) ^ (x >> 18 | x << 14) ^ (x >> 3))
+                  + ((y >> 17 | y << 15) ^ (y >> 19 | y << 13) ^ (y >> 10))) & 0xFFFFFFFF)
+
+    kw = [k[i] + w[i] for i in range(64)]
+    a, b, c, d, e, f, g, h = state
+
+    for i in range(0, 64, 8):
+        h = (h + ((e >> 6 | e << 26) ^ (e >> 11 | e << 21) ^ (e >> 25 | e << 7))
+             + (g ^ (e & (f ^ g))) + kw[i]) & 0xFFFFFFFF
+        d = (d + h) & 0xFFFFFFFF
+        h = (h + ((a >> 2 | a << 30) ^ (a >> 13 | a << 19) ^ (a >> 22 | a << 10))
+             + ((a & b) | (c & (a | b)))) & 0xFFFFFFFF
+
+        g = (g + ((d >> 6 | d << 26) ^ (d >> 11 | d << 21) ^ (d >> 25 | d << 7))
+             + (f ^ (d & (e ^ f))) + kw[i + 1]) & 0xFFFFFFFF
+        c = (c + g) & 0xFFFFFFFF
+        g = (g + ((h >> 2 | h << 30) ^ (h >> 13 | h << 19) ^ (h >> 22 | h << 10))
+             + ((h & a) | (b & (h | a)))) & 0xFFFFFFFF
+
+        f = (f + ((c >> 6 | c << 26) ^ (c >> 11 | c << 21) ^ (c >> 25 | c << 7))
+             + (e ^ (c & (d ^ e))) + kw[i + 2]) & 0xFFFFFFFF
+        b = (b + f) & 0xFFFFFFFF
+        f = (f + ((g >> 2 | g << 30) ^ (g >> 13 | g << 19) ^ (g >> 22 | g << 10))
+             + ((g & h) | (a & (g | h)))) & 0xFFFFFFFF
+
+        e = (e + ((b >> 6 | b << 26) ^ (b >> 11 | b << 21) ^ (b >> 25 | b << 7))
+             + (d ^ (b & (c ^ d))) + kw[i + 3]) & 0xFFFFFFFF
+        a = (a + e) & 0xFFFFFFFF
+        e = (e + ((f >> 2 | f << 30) ^ (f >> 13 | f << 19) ^ (f >> 22 | f << 10))
+             + ((f & g) | (h & (f | g)))) & 0xFFFFFFFF
+
+        d = (d + ((a >> 6 | a << 26) ^ (a >> 11 | a << 21) ^ (a >> 25 | a << 7))
+             + (c ^ (a & (b ^ c))) + kw[i + 4]) & 0xFFFFFFFF
+        h = (h + d) & 0xFFFFFFFF
+        d = (d + ((e >> 2 | e << 30) ^ (e >> 13 | e << 19) ^ (e >> 22 | e << 10))
+             + ((e & f) | (g & (e | f)))) & 0xFFFFFFFF
+
+        c = (c + ((h >> 6 | h << 26) ^ (h >> 11 | h << 21) ^ (h >> 25 | h << 7))
+             + (b ^ (h & (a ^ b))) + kw[i + 5]) & 0xFFFFFFFF
+        g = (g + c) & 0xFFFFFFFF
+        c = (c + ((d >> 2 | d << 30) ^ (d >> 13 | d << 19) ^ (d >> 22 | d << 10))
+             + ((d & e) | (f & (d | e)))) & 0xFFFFFFFF
+
+        b = (b + ((g >> 6 | g << 26) ^ (g >> 11 | g << 21) ^ (g >> 25 | g << 7))
+             + (a ^ (g & (h ^ a))) + kw[i + 6]) & 0xFFFFFFFF
+        f = (f + b) & 0xFFFFFFFF
+        b = (b + ((c >> 2 | c << 30) ^ (c >> 13 | c << 19) ^ (c >> 22 | c << 10))
+             + ((c & d) | (e & (c | d)))) & 0xFFFFFFFF
+
+        a = (a + ((f >> 6 | f << 26) ^ (f >> 11 | f << 21) ^ (f >> 25 | f << 7))
+             + (h ^ (f & (g ^ h))) + kw[i + 7]) & 0xFFFFFFFF
+        e = (e + a) & 0xFFFFFFFF
+        a = (a + ((b >> 2 | b << 30) ^ (b >> 13 | b << 19) ^ (b >> 22 | b << 10))
+             + ((b & c) | (d & (b | c)))) & 0xFFFFFFFF
+
+    h0, h1, h2, h3, h4, h5, h6, h7 = state
+
+    return [(h0 + a) & 0xFFFFFFFF, (h1 + b) & 0xFFFFFFFF, (h2 + c) & 0xFFFFFFFF, (h3 + d) & 0xFFFFFFFF,
+            (h4 + e) & 0xFFFFFFFF, (h5 + f) & 0xFFFFFFFF, (h6 + g) & 0xFFFFFFFF, (h7 + h) & 0xFFFFFFFF]
+
+
+def compress_blocks(state: Sequence[int], data) -> List[int]:
+
+    # Runs the compression function over every 64-byte block of data
+    # (len(data) must be a multiple of 64) and returns the new state
+    if len(data) % 64:
+        raise ValueError(f"Data length must be a multiple of 64, got {len(data)}")
+
+    unpack_from = _SCHEDULE.unpack_from
+    for offset in range(0, len(data), 64):
+        state = compress(state, list(unpack_from(data, offset)))
+
+    return list(state)
 
 
 class SHA256:
 
 
-    # Initial hash values (first 32 bits of fractional parts of square roots of first 8 primes)
-    _H0 = [
-        0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a,
-        0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
-    ]
-
-    # Round constants (first 32 bits of fractional parts of cube roots of first 64 primes)
-    _K = [
-        0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
-        0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
-        0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
-        0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
-        0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
-        0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
-        0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
-        0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
-    ]
+    name = 'sha256'
+    block_size = 64
+    digest_size = 32
 
     def __init__(self):
 
@@ -30,88 +129,16 @@ class SHA256:
 
     def reset(self):
 
-        self._hash = self._H0[:]
+        self._hash = list(_H0)
         self._message_length = 0
         self._buffer = bytearray()
 
-    @staticmethod
-    def _sigma0(x: int) -> int:
-
-        return rotate_right(x, 7) ^ rotate_right(x, 18) ^ shift_right(x, 3)
-
-    @staticmethod
-    def _sigma1(x: int) -> int:
-
-        return rotate_right(x, 17) ^ rotate_right(x, 19) ^ shift_right(x, 10)
-
-    @staticmethod
-    def _Sigma0(x: int) -> int:
-
-        return rotate_right(x, 2) ^ rotate_right(x, 13) ^ rotate_right(x, 22)
-
-    @staticmethod
-    def _Sigma1(x: int) -> int:
-
-        return rotate_right(x, 6) ^ rotate_right(x, 11) ^ rotate_right(x, 25)
-
-    @staticmethod
-    def _Ch(x: int, y: int, z: int) -> int:
-
-        return (x & y) ^ (~x & z)
-
-    @staticmethod
-    def _Maj(x: int, y: int, z: int) -> int:
-
-        return (x & y) ^ (x & z) ^ (y & z)
-
     def _process_block(self, block: bytes):
 
         if len(block) != 64:
             raise ValueError(f"Block must be 64 bytes, got {len(block)}")
 
-        # Prepare message schedule
-        w = [0] * 64
-
-        # First 16 words are the block itself
-        for i in range(16):
-            w[i] = struct.unpack('>I', block[i * 4:(i + 1) * 4])[0]
-
-        # Extend to 64 words
-        for i in range(16, 64):
-            s0 = self._sigma0(w[i - 15])
-            s1 = self._sigma1(w[i - 2])
-            w[i] = (w[i - 16] + s0 + w[i - 7] + s1) & 0xFFFFFFFF
-
-        # Initialize working variables
-        a, b, c, d, e, f, g, h = self._hash
-
-        # Compression function main loop
-        for i in range(64):
-            S1 = self._Sigma1(e)
-            ch = self._Ch(e, f, g)
-            temp1 = (h + S1 + ch + self._K[i] + w[i]) & 0xFFFFFFFF
-            S0 = self._Sigma0(a)
-            maj = self._Maj(a, b, c)
-            temp2 = (S0 + maj) & 0xFFFFFFFF
-
-            h = g
-            g = f
-            f = e
-            e = (d + temp1) & 0xFFFFFFFF
-            d = c
-            c = b
-            b = a
-            a = (temp1 + temp2) & 0xFFFFFFFF
-
-        # Update hash values
-        self._hash[0] = (self._hash[0] + a) & 0xFFFFFFFF
-        self._hash[1] = (self._hash[1] + b) & 0xFFFFFFFF
-        self._hash[2] = (self._hash[2] + c) & 0xFFFFFFFF
-        self._hash[3] = (self._hash[3] + d) & 0xFFFFFFFF
-        self._hash[4] = (self._hash[4] + e) & 0xFFFFFFFF
-        self._hash[5] = (self._hash[5] + f) & 0xFFFFFFFF
-        self._hash[6] = (self._hash[6] + g) & 0xFFFFFFFF
-        self._hash[7] = (self._hash[7] + h) & 0xFFFFFFFF
+        self._hash = compress_blocks(self._hash, block)
 
     def update(self, data: bytes):
 
@@ -119,61 +146,48 @@ class SHA256:
             return
 
         self._message_length += len(data)
-        self._buffer.extend(data)
+        view = memoryview(data)
 
-        # Process complete blocks
-        while len(self._buffer) >= 64:
-            block = bytes(self._buffer[:64])
-            self._process_block(block)
-            self._buffer = self._buffer[64:]
+        # Top up a partial block left over from the previous call
+        if self._buffer:
+            fill = 64 - len(self._buffer)
+            self._buffer += view[:fill]
+            if len(self._buffer) < 64:
+                return
+            self._hash = compress_blocks(self._hash, self._buffer)
+            self._buffer.clear()
+            view = view[fill:]
 
-    def _pad(self):
+        # Full blocks are compressed straight from the caller's buffer
+        full = len(view) - len(view) % 64
+        if full:
+            self._hash = compress_blocks(self._hash, view[:full])
 
-        # Start with the buffer
-        message = bytes(self._buffer)
+        self._buffer += view[full:]
 
-        # Add bit '1'
-        message += b'\x80'
+    def _pad(self) -> bytes:
 
-        # Calculate padding length
-        # Total length after padding must be 64 bytes (512 bits) * n
-        # The last 8 bytes (64 bits) store the original message length in bits
+        # Bit '1', zeros up to 56 mod 64, then the message length in bits
+        # as a 64-bit big-endian integer
         message_length_bits = self._message_length * 8
+        zeros = (55 - self._message_length) % 64
 
-        # Add zeros
-        while (len(message) % 64) != 56:
-            message += b'\x00'
+        return bytes(self._buffer) + b'\x80' + bytes(zeros) + struct.pack('>Q', message_length_bits)
 
-        # Add message length (big-endian, 64 bits)
-        message += struct.pack('>Q', message_length_bits)
+    def copy(self) -> 'SHA256':
 
-        return message
+        # Snapshot of the midstate: 8 words plus less than one buffered block
+        clone = self.__class__.__new__(self.__class__)
+        clone._hash = self._hash[:]
+        clone._message_length = self._message_length
+        clone._buffer = bytearray(self._buffer)
+        return clone
 
     def digest(self) -> bytes:
 
-        # Apply padding
-        padded_message = self._pad()
-
-        # Process any remaining blocks
-        temp_hash = self._hash[:]
-
-        # Process padded message
-        for i in range(0, len(padded_message), 64):
-            # Temporarily set hash to initial for block processing
-            self._hash = self._H0[:]
-            self._process_block(padded_message[i:i + 64])
-            # Update temp hash
-            for j in range(8):
-                temp_hash[j] = (temp_hash[j] + self._hash[j]) & 0xFFFFFFFF
-            self._hash = temp_hash[:]
-
-        # Convert hash to bytes
-        digest_bytes = b''.join(struct.pack('>I', h) for h in self._hash)
-
-        # Reset for potential reuse
-        self.reset()
-
-        return digest_bytes
+        # The padded tail continues the chain from a copy of the current
+        # state, so the object can keep absorbing data afterwards
+        return _DIGEST.pack(*compress_blocks(self._hash, self._pad()))
 
     def hexdigest(self) -> str:
 
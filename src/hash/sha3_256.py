@@ -2,38 +2,97 @@ import struct
 from typing import List
 
 
+# Keccak constants
+_RC = (
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A,
+    0x8000000080008000, 0x000000000000808B, 0x0000000080000001,
+    0x8000000080008081, 0x8000000000008009, 0x000000000000008A,
+    0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089,
+    0x8000000000008003, 0x8000000000008002, 0x8000000000000080,
+    0x000000000000800A, 0x800000008000000A, 0x8000000080008081,
+    0x8000000000008080, 0x0000000080000001, 0x8000000080008008
+)
+
+# Rotation offsets, indexed [x][y]
+_RHO = (
+    (0, 36, 3, 41, 18),
+    (1, 44, 10, 45, 2),
+    (62, 6, 43, 15, 61),
+    (28, 55, 25, 21, 56),
+    (27, 20, 39, 8, 14)
+)
+
+_MASK = (1 << 64) - 1
+
+
+def _rho_pi_table():
+
+    # The state is a flat list of 25 lanes, lane (x, y) at index x + 5 * y.
+    # For every source lane: (source index, column x, destination index
+    # after π, left rotation, right rotation)
+    table = []
+    for y in range(5):
+        for x in range(5):
+            rotation = _RHO[x][y]
+            destination = y + 5 * ((2 * x + 3 * y) % 5)
+            table.append((x + 5 * y, x, destination, rotation, (64 - rotation) % 64))
+    return tuple(table)
+
+
+_RHO_PI = _rho_pi_table()
+
+
+def keccak_f(A: List[int]):
+
+    # Keccak-f[1600] permutation over a flat 25-lane state, in place
+    B = [0] * 25
+    rho_pi = _RHO_PI
+
+    for rc in _RC:
+        # θ step
+        c0 = A[0] ^ A[5] ^ A[10] ^ A[15] ^ A[20]
+        c1 = A[1] ^ A[6] ^ A[11] ^ A[16] ^ A[21]
+        c2 = A[2] ^ A[7] ^ A[12] ^ A[17] ^ A[22]
+        c3 = A[3] ^ A[8] ^ A[13] ^ A[18] ^ A[23]
+        c4 = A[4] ^ A[9] ^ A[14] ^ A[19] ^ A[24]
+
+        D = (c4 ^ ((c1 << 1 | c1 >> 63) & _MASK),
+             c0 ^ ((c2 << 1 | c2 >> 63) & _MASK),
+             c1 ^ ((c3 << 1 | c3 >> 63) & _MASK),
+             c2 ^ ((c4 << 1 | c4 >> 63) & _MASK),
+             c3 ^ ((c0 << 1 | c0 >> 63) & _MASK))
+
+        # θ applied together with ρ and π
+        for source, x, destination, left, right in rho_pi:
+            lane = A[source] ^ D[x]
+            B[destination] = (lane << left | lane >> right) & _MASK
+
+        # χ step, one row at a time
+        for y in (0, 5, 10, 15, 20):
+            b0, b1, b2, b3, b4 = B[y:y + 5]
+            A[y] = b0 ^ (~b1 & b2)
+            A[y + 1] = b1 ^ (~b2 & b3)
+            A[y + 2] = b2 ^ (~b3 & b4)
+            A[y + 3] = b3 ^ (~b4 & b0)
+            A[y + 4] = b4 ^ (~b0 & b1)
+
+        # ι step
+        A[0] ^= rc
+
+
 class SHA3_256:
 
 
-    # Keccak constants
-    _RC = [
-        0x0000000000000001, 0x0000000000008082, 0x800000000000808A,
-        0x8000000080008000, 0x000000000000808B, 0x0000000080000001,
-        0x8000000080008081, 0x8000000000008009, 0x000000000000008A,
-        0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
-        0x000000008000808B, 0x800000000000008B, 0x8000000000008089,
-        0x8000000000008003, 0x8000000000008002, 0x8000000000000080,
-        0x000000000000800A, 0x800000008000000A, 0x8000000080008081,
-        0x8000000000008080, 0x0000000080000001, 0x8000000080008008
-    ]
-
-    # Rotation offsets
-    _RHO = [
-        [0, 36, 3, 41, 18],
-        [1, 44, 10, 45, 2],
-        [62, 6, 43, 15, 61],
-        [28, 55, 25, 21, 56],
-        [27, 20, 39, 8, 14]
-    ]
-
-    # Pi permutation
-    _PI = [
-        [0, 3, 1, 4, 2],
-        [1, 4, 2, 0, 3],
-        [2, 0, 3, 1, 4],
-        [3, 1, 4, 2, 0],
-        [4, 2, 0, 3, 1]
-    ]
+    # SHA3-256 parameters
+    name = 'sha3_256'
+    rate = 1088 // 8  # 136 bytes (1088 bits)
+    block_size = rate
+    digest_size = 256 // 8  # 32 bytes
+
+    # A whole rate block as little-endian lanes in one call
+    _BLOCK = struct.Struct('<17Q')
+    _DIGEST = struct.Struct('<4Q')
 
     def __init__(self):
 
@@ -41,104 +100,32 @@ class SHA3_256:
 
     def reset(self):
 
-        # State is 5x5 matrix of 64-bit words
-        self._state = [[0] * 5 for _ in range(5)]
+        # Flat state of 25 64-bit lanes
+        self._state = [0] * 25
         self._buffer = bytearray()
         self._total_length = 0
 
-        # SHA3-256 parameters
-        self._rate = 1088 // 8  # 136 bytes (1088 bits)
-        self._capacity = 512  # bits
-        self._output_length = 256 // 8  # 32 bytes
-
-    @staticmethod
-    def _rotate_left_64(x: int, n: int) -> int:
-
-        n %= 64
-        return ((x << n) | (x >> (64 - n))) & ((1 << 64) - 1)
-
-    def _keccak_f(self):
-
-        for round_ in range(24):
-            # θ step
-            C = [0] * 5
-            D = [0] * 5
-
-            for x in range(5):
-                C[x] = (self._state[x][0] ^ self._state[x][1] ^
-                        self._state[x][2] ^ self._state[x][3] ^
-                        self._state[x][4])
-
-            for x in range(5):
-                D[x] = C[(x - 1) % 5] ^ self._rotate_left_64(C[(x + 1) % 5], 1)
-
-            for x in range(5):
-                for y in range(5):
-                    self._state[x][y] ^= D[x]
-
-            # ρ and π steps
-            B = [[0] * 5 for _ in range(5)]
-            for x in range(5):
-                for y in range(5):
-                    B[y][(2 * x + 3 * y) % 5] = self._rotate_left_64(
-                        self._state[x][y], self._RHO[x][y]
-                    )
-
-            # χ step
-            for x in range(5):
-                for y in range(5):
-                    self._state[x][y] = B[x][y] ^ ((~B[(x + 1) % 5][y]) & B[(x + 2) % 5][y])
-
-            # ι step
-            self._state[0][0] ^= self._RC[round_]
-
-    def _absorb(self):
-
-        # Pad buffer to rate if needed
-        while len(self._buffer) < self._rate:
-            self._buffer.append(0)
-
-        # XOR buffer into state
-        block = bytes(self._buffer[:self._rate])
-        self._buffer = self._buffer[self._rate:]
-
-        # Convert block to state
-        for i in range(self._rate // 8):
-            x = i % 5
-            y = i // 5
-            word = struct.unpack('<Q', block[i * 8:(i + 1) * 8])[0]
-            self._state[x][y] ^= word
-
-    def _pad(self, suffix: int) -> bytes:
-
-        # SHA3 uses padding: 0x06 = 0110 (suffix 01 + 10*1)
-        # But we implement general padding
-
-        P = self._buffer
-
-        # Add suffix bits
-        # For SHA3-256: suffix bits are 0x06 (0110 in binary)
-        # 01 for SHA3 domain separation + 10*1 pad pattern
-        if suffix & 1:
-            P[-1] ^= 0x80  # Last byte, most significant bit
-
-        # Add pad10*1 pattern
-        # Find first zero byte from the end
-        pad_pos = self._rate - len(P)
-        if pad_pos == 1:
-            # Special case: need to add a whole new block
-            P.append(0x86)  # 10000110
-            while len(P) < self._rate:
-                P.append(0x00)
-            P[-1] ^= 0x01  # Last bit of pad10*1
-        else:
-            # Normal padding
-            P.append(0x06)  # 00000110
-            while len(P) < self._rate - 1:
-                P.append(0x00)
-            P.append(0x80)  # 10000000
-
-        return bytes(P)
+    def _absorb_blocks(self, data):
+
+        # XOR every full rate block of data into the state and permute
+        state = self._state
+        unpack_from = self._BLOCK.unpack_from
+
+        for offset in range(0, len(data), self.rate):
+            state[:17] = [lane ^ word for lane, word in zip(state, unpack_from(data, offset))]
+            keccak_f(state)
+
+    def _pad(self) -> bytes:
+
+        # SHA3 domain suffix 01 followed by pad10*1. The buffer always
+        # holds less than a full block, so padding never adds a second one;
+        # with a single free byte both parts share it (0x86).
+        padded = bytearray(self._buffer)
+        padded.append(0x06)
+        padded.extend(bytes(self.rate - len(padded)))
+        padded[-1] |= 0x80
+
+        return bytes(padded)
 
     def update(self, data: bytes):
 
@@ -146,41 +133,43 @@ class SHA3_256:
             return
 
         self._total_length += len(data)
-        self._buffer.extend(data)
-
-        # Process complete blocks
-        while len(self._buffer) >= self._rate:
-            self._absorb()
-            self._keccak_f()
+        view = memoryview(data)
+        rate = self.rate
+
+        # Top up a partial block left over from the previous call
+        if self._buffer:
+            fill = rate - len(self._buffer)
+            self._buffer += view[:fill]
+            if len(self._buffer) < rate:
+                return
+            self._absorb_blocks(self._buffer)
+            self._buffer.clear()
+            view = view[fill:]
+
+        # Full blocks are absorbed straight from the caller's buffer
+        full = len(view) - len(view) % rate
+        if full:
+            self._absorb_blocks(view[:full])
+
+        self._buffer += view[full:]
+
+    def copy(self) -> 'SHA3_256':
+
+        # Snapshot of the sponge: 25 lanes plus less than one buffered block
+        clone = self.__class__.__new__(self.__class__)
+        clone._state = self._state[:]
+        clone._buffer = bytearray(self._buffer)
+        clone._total_length = self._total_length
+        return clone
 
     def digest(self) -> bytes:
 
-        # Apply SHA3 padding (0x06 suffix)
-        padded = self._pad(0x06)
-
-        # Absorb padded message
-        self._buffer = bytearray(padded)
-        self._absorb()
-        self._keccak_f()
-
-        # Squeeze output
-        output = bytearray()
-        while len(output) < self._output_length:
-            # Extract from state
-            for i in range(self._rate // 8):
-                if len(output) >= self._output_length:
-                    break
-                x = i % 5
-                y = i // 5
-                output.extend(struct.pack('<Q', self._state[x][y]))
-
-            if len(output) < self._output_length:
-                self._keccak_f()
-
-        # Reset for potential reuse
-        self.reset()
+        # Padding is absorbed into a copy, the object itself stays usable
+        final = self.copy()
+        final._absorb_blocks(final._pad())
 
-        return bytes(output[:self._output_length])
+        # The 32-byte output fits in the first rate block, no extra squeezing
+        return self._DIGEST.pack(*final._state[:4])
 
     def hexdigest(self) -> str:
 
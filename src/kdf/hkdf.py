@@ -1,11 +1,12 @@
-from typing import Union
+from typing import Optional, Union
 from ..mac import HMAC
 
 
 def derive_key(
         master_key: bytes,
         context: Union[str, bytes],
-        length: int = 32
+        length: int = 32,
+        backend: Optional[str] = None
 ) -> bytes:
 
     if length <= 0:
@@ -14,11 +15,13 @@ def derive_key(
     if isinstance(context, str):
         context = context.encode('utf-8')
 
+    # One keyed HMAC for all counter blocks
+    hmac = HMAC(master_key, 'sha256', backend)
+
     derived = b''
     counter = 1
 
     while len(derived) < length:
-        hmac = HMAC(master_key, 'sha256')
         block = hmac.compute(context + counter.to_bytes(4, 'big'))
         derived += block
         counter += 1
@@ -1,14 +1,64 @@
 import sys
 import os
-from typing import Union
+import hashlib
+import struct
+from typing import List, Optional, Tuple, Union
+from src.backend import is_native
+from src.hash import HASH_BACKENDS
+from src.hash.sha256 import compress, compress_blocks, _H0
+from src.modes.parallel import SegmentPool
 from ..mac import HMAC
 
 
+# SHA-256 padding words for a 32-byte message that follows one 64-byte
+# block: 0x80 marker, zeros, total length 96 bytes = 768 bits
+_DIGEST_PADDING = [0x80000000, 0, 0, 0, 0, 0, 0, 768]
+
+_DIGEST = struct.Struct('>8I')
+
+# Below this iteration count a process pool costs more than it saves
+PARALLEL_MIN_ITERATIONS = 5000
+
+
+def _hmac_midstates(key: bytes) -> Tuple[List[int], List[int]]:
+
+    # SHA-256 states after absorbing K ⊕ ipad and K ⊕ opad; computed once
+    # and reused by every HMAC evaluation with this key
+    inner = compress_blocks(_H0, bytes(b ^ HMAC.IPAD for b in key))
+    outer = compress_blocks(_H0, bytes(b ^ HMAC.OPAD for b in key))
+    return inner, outer
+
+
+def _finish(state: List[int], message: bytes) -> List[int]:
+
+    # Completes SHA-256 of (one 64-byte block already in state) || message
+    bit_length = (64 + len(message)) * 8
+    padded = message + b'\x80' + bytes((55 - len(message)) % 64) + bit_length.to_bytes(8, 'big')
+    return compress_blocks(state, padded)
+
+
+def _pbkdf2_block(inner: List[int], outer: List[int], salt: bytes, index: int, iterations: int) -> bytes:
+
+    # U1 = HMAC(password, salt || INT_32_BE(index))
+    u = compress(outer, _finish(inner, salt + index.to_bytes(4, 'big')) + _DIGEST_PADDING)
+    block = u
+
+    # U2..Uc: the message is always the previous 32-byte U, so each HMAC
+    # is exactly two compressions with fixed padding, on 32-bit words
+    for _ in range(iterations - 1):
+        u = compress(outer, compress(inner, u + _DIGEST_PADDING) + _DIGEST_PADDING)
+        block = [x ^ y for x, y in zip(block, u)]
+
+    return _DIGEST.pack(*block)
+
+
 def pbkdf2_hmac_sha256(
         password: Union[str, bytes],
         salt: Union[str, bytes],
         iterations: int,
-        dklen: int
+        dklen: int,
+        backend: Optional[str] = None,
+        workers: int = 1
 ) -> bytes:
 
     if iterations <= 0:
@@ -17,6 +67,9 @@ def pbkdf2_hmac_sha256(
     if dklen <= 0:
         raise ValueError("Key length must be positive")
 
+    if workers <= 0:
+        raise ValueError("Number of workers must be positive")
+
     # Convert inputs to bytes
     if isinstance(password, str):
         password = password.encode('utf-8')
@@ -33,27 +86,28 @@ def pbkdf2_hmac_sha256(
         except ValueError:
             salt = salt.encode('utf-8')
 
+    if is_native(HASH_BACKENDS['sha256'], backend):
+        return hashlib.pbkdf2_hmac('sha256', password, salt, iterations, dklen)
+
+    # Key padded (or hashed) to the block size as in RFC 2104
+    inner, outer = _hmac_midstates(HMAC(password, 'sha256', backend).key)
+
     # Calculate number of blocks needed
     h_len = 32  # SHA-256 output is 32 bytes
     blocks_needed = (dklen + h_len - 1) // h_len
 
-    derived_key = b''
-
-    for i in range(1, blocks_needed + 1):
-        # U1 = HMAC(password, salt || INT_32_BE(i))
-        hmac = HMAC(password, 'sha256')
-        block = hmac.compute(salt + i.to_bytes(4, 'big'))
-        u_prev = block
+    indices = range(1, blocks_needed + 1)
 
-        # XOR with remaining iterations
-        for _ in range(2, iterations + 1):
-            hmac = HMAC(password, 'sha256')
-            u_curr = hmac.compute(u_prev)
-            # XOR u_curr into block
-            block = bytes(a ^ b for a, b in zip(block, u_curr))
-            u_prev = u_curr
+    # Blocks T_i are independent: spread them over processes when there
+    # is more than one and enough work per block
+    if workers > 1 and blocks_needed > 1 and iterations >= PARALLEL_MIN_ITERATIONS:
+        with SegmentPool(min(workers, blocks_needed)) as pool:
+            blocks = pool.map(_pbkdf2_block, [inner] * blocks_needed, [outer] * blocks_needed,
+                              [salt] * blocks_needed, indices, [iterations] * blocks_needed)
+    else:
+        blocks = [_pbkdf2_block(inner, outer, salt, i, iterations) for i in indices]
 
-        derived_key += block
+    derived_key = b''.join(blocks)
 
     # Return exactly dklen bytes
     return derived_key[:dklen]
\ No newline at end of file
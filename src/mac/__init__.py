@@ -1,5 +1,15 @@
+import hmac as _native_hmac
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Union
 from .hmac import HMAC, HMACStream
-from .cmac import AESCMAC
+from .cmac import AESCMAC, CMACStream
+
+
+# Messages handed to a pool worker per task
+DEFAULT_BATCH_SIZE = 256
+
+# MAC object of a process pool worker, keyed once per process by _init_worker
+_worker_mac = None
 
 
 def create_mac(algorithm: str, key: bytes):
@@ -31,6 +41,64 @@ def verify_mac(data: bytes, algorithm: str, key: bytes, mac: bytes) -> bool:
     return mac_obj.verify(data, mac)
 
 
+def _init_worker(algorithm: str, key: bytes):
+
+    global _worker_mac
+    _worker_mac = create_mac(algorithm, key)
+
+
+def _compute_batch_in_worker(messages: List[bytes]) -> List[bytes]:
+
+    return [_worker_mac.compute(message) for message in messages]
+
+
+def compute_many(messages: Iterable[bytes], algorithm: str, key: bytes,
+                 workers: int = 1, executor: str = 'thread',
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> List[bytes]:
+
+    # Tags for every message, in order. The key schedule is done once (once
+    # per worker process for executor='process'); with workers > 1 messages
+    # are processed in batches of batch_size.
+    if workers <= 0:
+        raise ValueError(f"Number of workers must be positive, got {workers}")
+    if batch_size <= 0:
+        raise ValueError(f"Batch size must be positive, got {batch_size}")
+    if executor not in ['thread', 'process']:
+        raise ValueError(f"Unsupported executor '{executor}'. Valid: thread, process")
+
+    if workers == 1:
+        mac = create_mac(algorithm, key)
+        return [mac.compute(message) for message in messages]
+
+    messages = list(messages)
+    batches = [messages[i:i + batch_size] for i in range(0, len(messages), batch_size)]
+
+    if executor == 'process':
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(algorithm, key)) as pool:
+            results = pool.map(_compute_batch_in_worker, batches)
+            return [tag for batch in results for tag in batch]
+
+    # MAC objects are not modified by compute(), threads can share one
+    mac = create_mac(algorithm, key)
+    with ThreadPoolExecutor(workers) as pool:
+        results = pool.map(lambda batch: [mac.compute(message) for message in batch], batches)
+        return [tag for batch in results for tag in batch]
+
+
+def verify_many(messages: Iterable[bytes], macs: Iterable[Union[bytes, str]], algorithm: str,
+                key: bytes, workers: int = 1, executor: str = 'thread',
+                batch_size: int = DEFAULT_BATCH_SIZE) -> List[bool]:
+
+    # One result per (message, mac) pair; macs may be bytes or hex strings
+    expected = [bytes.fromhex(mac) if isinstance(mac, str) else mac for mac in macs]
+    computed = compute_many(messages, algorithm, key, workers, executor, batch_size)
+
+    if len(expected) != len(computed):
+        raise ValueError(f"Got {len(computed)} messages but {len(expected)} MACs")
+
+    return [_native_hmac.compare_digest(tag, mac) for tag, mac in zip(computed, expected)]
+
+
 def parse_hmac_file(filepath: str):
 
     try:
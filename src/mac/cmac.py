@@ -1,5 +1,6 @@
+import hmac as _native_hmac
 from typing import Union
-from src.modes import AES_ECB
+from Crypto.Cipher import AES
 from .utils import xor_bytes
 
 
@@ -8,6 +9,9 @@ class AESCMAC:
 
     BLOCK_SIZE = 16  # 128 bits for AES
 
+    # Максимальный объём тела сообщения на один вызов AES-CBC
+    CHAIN_SEGMENT_SIZE = 64 * 1024
+
     def __init__(self, key: Union[bytes, str]):
 
         if isinstance(key, str):
@@ -17,7 +21,8 @@ class AESCMAC:
             raise ValueError(f"AES-CMAC requires 16-byte key, got {len(key)} bytes")
 
         self.key = key
-        self.aes = AES_ECB(key)
+        # Блочный шифр без дополнения: CMAC шифрует ровно по одному блоку
+        self.aes = AES.new(key, AES.MODE_ECB)
 
         # Генерируем подключи
         self.subkey1, self.subkey2 = self._generate_subkeys()
@@ -53,37 +58,44 @@ class AESCMAC:
 
         return bytes(result)
 
-    def compute(self, message: bytes) -> bytes:
+    def _chain(self, state: bytes, data) -> bytes:
 
-        # Разбиваем сообщение на блоки
-        blocks = []
-        for i in range(0, len(message), self.BLOCK_SIZE):
-            blocks.append(message[i:i + self.BLOCK_SIZE])
+        # CBC-MAC по полным блокам data (длина кратна 16) начиная с state.
+        # Это CBC-шифрование с IV = state, от которого нужен только последний
+        # блок: тело целиком уходит в нативный AES-CBC, вывод пишется в один
+        # переиспользуемый буфер размером не больше CHAIN_SEGMENT_SIZE
+        if not len(data):
+            return state
 
-        # Обрабатываем последний блок
-        if not blocks:
-            # Пустое сообщение
-            last_block = bytes([0] * self.BLOCK_SIZE)
-            last_block = xor_bytes(last_block, self.subkey2)
-            blocks = [last_block]
-        elif len(blocks[-1]) == self.BLOCK_SIZE:
-            # Полный последний блок
-            blocks[-1] = xor_bytes(blocks[-1], self.subkey1)
+        cbc = AES.new(self.key, AES.MODE_CBC, iv=state)
+        scratch = memoryview(bytearray(min(len(data), self.CHAIN_SEGMENT_SIZE)))
+
+        for i in range(0, len(data), self.CHAIN_SEGMENT_SIZE):
+            segment = data[i:i + self.CHAIN_SEGMENT_SIZE]
+            output = scratch[:len(segment)]
+            cbc.encrypt(segment, output=output)
+
+        return bytes(output[-self.BLOCK_SIZE:])
+
+    def _finish(self, state: bytes, last_block: bytes) -> bytes:
+
+        # Последний блок (0..16 байт): полный XOR с K1, иначе padding и XOR с K2
+        if len(last_block) == self.BLOCK_SIZE:
+            last_block = xor_bytes(last_block, self.subkey1)
         else:
-            # Неполный последний блок - добавляем padding
-            last_block = blocks[-1]
             padding_needed = self.BLOCK_SIZE - len(last_block)
             last_block = last_block + bytes([0x80] + [0] * (padding_needed - 1))
-            blocks[-1] = xor_bytes(last_block, self.subkey2)
+            last_block = xor_bytes(last_block, self.subkey2)
+
+        return self.aes.encrypt(xor_bytes(state, last_block))
 
-        # CBC-MAC вычисление
-        ciphertext = bytes([0] * self.BLOCK_SIZE)  # IV = 0
+    def compute(self, message: bytes) -> bytes:
 
-        for block in blocks:
-            ciphertext = xor_bytes(ciphertext, block)
-            ciphertext = self.aes.encrypt(ciphertext)
+        # Все блоки кроме последнего (он может быть неполным или пустым)
+        body_length = max(len(message) - 1, 0) // self.BLOCK_SIZE * self.BLOCK_SIZE
 
-        return ciphertext
+        state = self._chain(bytes(self.BLOCK_SIZE), memoryview(message)[:body_length])
+        return self._finish(state, bytes(message[body_length:]))
 
     def compute_hex(self, message: bytes) -> str:
 
@@ -104,11 +116,49 @@ class AESCMAC:
     @staticmethod
     def _constant_time_compare(a: bytes, b: bytes) -> bool:
         """Сравнение в константном времени."""
-        if len(a) != len(b):
-            return False
+        return _native_hmac.compare_digest(a, b)
+
+
+class CMACStream:
+
+
+    # Инкрементальный AES-CMAC: последний блок (даже полный) задерживается
+    # до finalize(), так как только тогда известно, какой подключ применять
+
+    def __init__(self, key: Union[bytes, str]):
+
+        self.cmac = AESCMAC(key)
+        self._state = bytes(AESCMAC.BLOCK_SIZE)
+        self._buffer = bytearray()
+
+    def update(self, data: bytes):
+
+        block_size = AESCMAC.BLOCK_SIZE
+
+        if len(self._buffer) + len(data) <= block_size:
+            self._buffer += data
+            return
+
+        view = memoryview(data)
+
+        # За буфером есть ещё данные, значит он не последний блок
+        if self._buffer:
+            fill = block_size - len(self._buffer)
+            self._buffer += view[:fill]
+            self._state = self.cmac._chain(self._state, self._buffer)
+            self._buffer = bytearray()
+            view = view[fill:]
+
+        # Полные блоки обрабатываются прямо из входа, последний задерживается
+        held_back = len(view) % block_size or block_size
+        body_length = len(view) - held_back
+        self._state = self.cmac._chain(self._state, view[:body_length])
+        self._buffer = bytearray(view[body_length:])
+
+    def finalize(self) -> bytes:
+
+        return self.cmac._finish(self._state, bytes(self._buffer))
 
-        result = 0
-        for x, y in zip(a, b):
-            result |= x ^ y
+    def finalize_hex(self) -> str:
 
-        return result == 0
\ No newline at end of file
+        return self.finalize().hex()
\ No newline at end of file
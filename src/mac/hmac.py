@@ -1,5 +1,6 @@
-from typing import Union
-from src.hash import SHA256
+import hmac as _native_hmac
+from typing import Optional, Union
+from src.hash import create_hash
 from .utils import xor_bytes
 
 
@@ -10,7 +11,8 @@ class HMAC:
     IPAD = 0x36  # inner pad value
     OPAD = 0x5C  # outer pad value
 
-    def __init__(self, key: Union[bytes, str], hash_algorithm: str = 'sha256'):
+    def __init__(self, key: Union[bytes, str], hash_algorithm: str = 'sha256',
+                 backend: Optional[str] = None):
 
         if isinstance(key, str):
             # Преобразуем hex строку в байты
@@ -23,16 +25,23 @@ class HMAC:
 
         # Определяем размер блока и хеш-функцию
         self.block_size = 64  # 64 bytes for SHA-256
-        self.hash_func = SHA256
+        self.backend = backend
 
         # Обрабатываем ключ согласно RFC 2104
         self.key = self._process_key(key)
 
+        # Хеш-состояния после блоков K ⊕ ipad и K ⊕ opad вычисляются один раз;
+        # каждый вызов начинает с их копий вместо повторного сжатия ключа
+        self._inner = create_hash(self.hash_algorithm, backend)
+        self._inner.update(xor_bytes(self.key, bytes([self.IPAD] * self.block_size)))
+        self._outer = create_hash(self.hash_algorithm, backend)
+        self._outer.update(xor_bytes(self.key, bytes([self.OPAD] * self.block_size)))
+
     def _process_key(self, key: bytes) -> bytes:
 
         if len(key) > self.block_size:
             # Хешируем ключ если он длиннее блока
-            key = self.hash_func().hash(key)
+            key = self._hash(key)
 
         if len(key) < self.block_size:
             # Дополняем нулями если ключ короче блока
@@ -40,19 +49,23 @@ class HMAC:
 
         return key
 
-    def compute(self, message: bytes) -> bytes:
+    def _hash(self, data: bytes) -> bytes:
 
-        # Создаем inner и outer pad
-        ipad = xor_bytes(self.key, bytes([self.IPAD] * self.block_size))
-        opad = xor_bytes(self.key, bytes([self.OPAD] * self.block_size))
+        hash_obj = create_hash(self.hash_algorithm, self.backend)
+        hash_obj.update(data)
+        return hash_obj.digest()
 
-        # Внутренний хеш: H((K ⊕ ipad) || message)
-        inner_hash = self.hash_func().hash(ipad + message)
+    def compute(self, message: bytes) -> bytes:
+
+        # Внутренний хеш: H((K ⊕ ipad) || message), без конкатенации буферов
+        inner_hash = self._inner.copy()
+        inner_hash.update(message)
 
         # Внешний хеш: H((K ⊕ opad) || inner_hash)
-        outer_hash = self.hash_func().hash(opad + inner_hash)
+        outer_hash = self._outer.copy()
+        outer_hash.update(inner_hash.digest())
 
-        return outer_hash
+        return outer_hash.digest()
 
     def compute_hex(self, message: bytes) -> str:
 
@@ -73,14 +86,8 @@ class HMAC:
     @staticmethod
     def _constant_time_compare(a: bytes, b: bytes) -> bool:
 
-        if len(a) != len(b):
-            return False
-
-        result = 0
-        for x, y in zip(a, b):
-            result |= x ^ y
-
-        return result == 0
+        # C-реализация сравнения за постоянное время
+        return _native_hmac.compare_digest(a, b)
 
     @classmethod
     def hmac_sha256(cls, key: bytes, message: bytes) -> bytes:
@@ -96,22 +103,26 @@ class HMAC:
 class HMACStream:
 
 
-    def __init__(self, key: Union[bytes, str], hash_algorithm: str = 'sha256'):
+    def __init__(self, key: Union[bytes, str], hash_algorithm: str = 'sha256',
+                 backend: Optional[str] = None):
+
+        self._start(HMAC(key, hash_algorithm, backend))
 
-        self.hmac = HMAC(key, hash_algorithm)
+    def _start(self, hmac: HMAC):
 
-        # Инициализируем внутренний и внешний хеш контексты
-        self.inner_hash = SHA256()
-        self.outer_hash = SHA256()
+        self.hmac = hmac
 
-        # Подготавливаем ключи
-        ipad = xor_bytes(self.hmac.key, bytes([HMAC.IPAD] * self.hmac.block_size))
-        opad = xor_bytes(self.hmac.key, bytes([HMAC.OPAD] * self.hmac.block_size))
+        # Внутренний и внешний контексты начинают с уже обработанных ipad/opad
+        self.inner_hash = self.hmac._inner.copy()
+        self.outer_hash = self.hmac._outer.copy()
+
+    @classmethod
+    def from_hmac(cls, hmac: HMAC) -> 'HMACStream':
 
-        # Инициализируем inner hash с ipad
-        self.inner_hash.update(ipad)
-        # Инициализируем outer hash с opad
-        self.outer_hash.update(opad)
+        # Поток поверх уже подготовленного HMAC: ключ повторно не обрабатывается
+        stream = cls.__new__(cls)
+        stream._start(hmac)
+        return stream
 
     def update(self, data: bytes):
 
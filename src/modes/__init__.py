@@ -1,28 +1,33 @@
 from .ecb import AES_ECB
 from .cbc import CBCMode
-from .cfb import CFBMode
+from .cfb import CFBMode, MODE_SEGMENT_SIZES as CFB_SEGMENT_SIZES
 from .ofb import OFBMode
 from .ctr import CTRMode
-from .gcm import GCM
+from .gcm import GCM, GCMKey
 from .encrypt_then_mac import EncryptThenMAC
+from .stream import stream_encrypt, stream_decrypt, DEFAULT_CHUNK_SIZE
+from .parallel import SegmentPool
+from .cipher_cache import CipherCache
+from .base import CIPHER_CACHE
 
 
 # Factory function for creating mode instances
-def create_mode(mode_name: str, key: bytes, iv: bytes = None):
+def create_mode(mode_name: str, key: bytes, iv: bytes = None, pool: SegmentPool = None,
+                backend: str = None, prefetch: bool = False):
     mode_name = mode_name.upper()
 
     if mode_name == 'ECB':
         return AES_ECB(key)
     elif mode_name == 'CBC':
-        return CBCMode(key, iv)
-    elif mode_name == 'CFB':
-        return CFBMode(key, iv)
+        return CBCMode(key, iv, pool=pool, backend=backend)
+    elif mode_name in CFB_SEGMENT_SIZES:
+        return CFBMode(key, iv, CFB_SEGMENT_SIZES[mode_name], pool=pool, backend=backend)
     elif mode_name == 'OFB':
-        return OFBMode(key, iv)
+        return OFBMode(key, iv, backend=backend, prefetch=prefetch)
     elif mode_name == 'CTR':
-        return CTRMode(key, iv)
+        return CTRMode(key, iv, pool=pool)
     elif mode_name == 'GCM':
-        return GCM(key, iv)
+        return GCM(key, iv, pool=pool)
     elif mode_name in ['ETM', 'ENCRYPT_THEN_MAC']:
         # Default to CBC for Encrypt-then-MAC
         return EncryptThenMAC('CBC', key, iv)
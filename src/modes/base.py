@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
 from Crypto.Cipher import AES
-from typing import Optional
+from Crypto.Util.Padding import pad, unpad
+from typing import Optional, Tuple, Any
 import sys
+from .cipher_cache import CipherCache
 
 # Правильный импорт CSPRNG функций
 try:
@@ -45,13 +47,104 @@ except ImportError:
             return False
 
 
+# Expanded AES objects shared by all modes, keyed by key fingerprint
+CIPHER_CACHE = CipherCache(weak_check=is_key_weak)
+
+
+# Incremental encryption/decryption context returned by encryptor()/decryptor().
+# Partial blocks are buffered between update() calls; padding is applied
+# (or checked and removed) in finalize().
+class CipherContext:
+
+    def __init__(self, cipher, decrypting: bool = False):
+        self._cipher = cipher
+        self._decrypting = decrypting
+        self._state = cipher._initial_state()
+        self._buffer = bytearray()
+        self._finalized = False
+
+    def _usable_length(self, length: int) -> int:
+
+        block_size = self._cipher.block_size
+        remainder = length % block_size
+
+        # When decrypting a padded mode the last full block is held back,
+        # because only finalize() knows it carries the padding
+        if self._decrypting and self._cipher.requires_padding and remainder == 0 and length:
+            remainder = block_size
+
+        return length - remainder
+
+    def _process(self, data: bytes) -> bytes:
+
+        if self._decrypting:
+            output, self._state = self._cipher._decrypt_chunk(data, self._state)
+        else:
+            output, self._state = self._cipher._encrypt_chunk(data, self._state)
+        return output
+
+    def update(self, data: bytes) -> bytes:
+
+        if self._finalized:
+            raise ValueError("Cipher context already finalized")
+
+        # Any bytes-like input is sliced through a view; only a pending
+        # partial block forces one concatenation
+        if self._buffer:
+            data = self._buffer + data
+            self._buffer = bytearray()
+        data = memoryview(data)
+
+        usable = self._usable_length(len(data))
+        self._buffer.extend(data[usable:])
+
+        if not usable:
+            return b''
+        return self._process(data[:usable])
+
+    def finalize(self) -> bytes:
+
+        if self._finalized:
+            raise ValueError("Cipher context already finalized")
+        self._finalized = True
+
+        try:
+            return self._finalize()
+        finally:
+            self._cipher._release_state(self._state)
+
+    def _finalize(self) -> bytes:
+
+        data = bytes(self._buffer)
+        self._buffer.clear()
+
+        if not self._decrypting:
+            if self._cipher.requires_padding:
+                data = self._cipher._pad(data)
+            return self._process(data)
+
+        if self._cipher.requires_padding and len(data) % self._cipher.block_size != 0:
+            raise ValueError("Ciphertext length must be multiple of block size")
+
+        output = self._process(data)
+        if self._cipher.requires_padding:
+            output = self._cipher._unpad(output)
+        return output
+
+
 class CipherMode(ABC):
+    # Whether encryptor()/decryptor() can drive the mode chunk by chunk
+    supports_streaming = True
+
     def __init__(self, key: bytes, iv: Optional[bytes] = None, mode_name: str = ""):
         self.key = key
         self.mode_name = mode_name
 
-        # Warn about weak keys
-        if is_key_weak(key):
+        # Расширенный ключ и результат проверки на слабость берутся из кэша
+        aes, weak, created = CIPHER_CACHE.get(key)
+
+        # Warn about weak keys (once, when the key enters the cache)
+        if weak and created:
             print(f"[WARNING] Using a potentially weak key!", file=sys.stderr)
 
         if iv is None:
@@ -60,7 +153,14 @@ class CipherMode(ABC):
             self.iv = iv
 
         # Базовый AES объект для примитивных операций
-        self._aes = AES.new(self.key, AES.MODE_ECB)
+        self._aes = aes
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.supports_streaming:
+            for hook in ('_encrypt_chunk', '_decrypt_chunk'):
+                if getattr(cls, hook) is getattr(CipherMode, hook):
+                    raise TypeError(f"{cls.__name__} supports streaming but does not define {hook}")
 
     @abstractmethod
     def encrypt(self, plaintext: bytes) -> bytes:
@@ -70,10 +170,50 @@ class CipherMode(ABC):
     def decrypt(self, ciphertext: bytes) -> bytes:
         pass
 
+    def encryptor(self) -> CipherContext:
+        self._check_streaming()
+        return CipherContext(self, decrypting=False)
+
+    def decryptor(self) -> CipherContext:
+        self._check_streaming()
+        return CipherContext(self, decrypting=True)
+
+    def _check_streaming(self):
+        if not self.supports_streaming:
+            raise ValueError(f"{self.mode_name} does not support chunked processing")
+
+    # Chunked processing: state (chaining block, counter, feedback register)
+    # is carried from one chunk to the next by the caller. Every chunk except
+    # the last one must be a multiple of block_size.
+    def _initial_state(self) -> Any:
+        return self.iv
+
+    # Called once a context is finalized, for states that hold resources
+    def _release_state(self, state: Any):
+        pass
+
+    # Streaming modes must override both hooks (checked in __init_subclass__);
+    # modes with supports_streaming = False simply inherit these
+    def _encrypt_chunk(self, data: bytes, state: Any) -> Tuple[bytes, Any]:
+        raise ValueError(f"{self.mode_name} does not support chunked processing")
+
+    def _decrypt_chunk(self, data: bytes, state: Any) -> Tuple[bytes, Any]:
+        raise ValueError(f"{self.mode_name} does not support chunked processing")
+
+    def _pad(self, data: bytes) -> bytes:
+        return pad(data, AES.block_size)
+
+    def _unpad(self, data: bytes) -> bytes:
+        return unpad(data, AES.block_size)
+
     @property
     def requires_padding(self) -> bool:
         return True
 
+    @property
+    def block_size(self) -> int:
+        return AES.block_size
+
     @property
     def iv_size(self) -> int:
         return 16
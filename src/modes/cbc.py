@@ -1,12 +1,42 @@
 from .base import CipherMode
+from .parallel import SegmentPool
+from .utils import cbc_encrypt, cbc_decrypt
+from src.backend import is_native
 from Crypto.Util.Padding import pad, unpad
 from Crypto.Cipher import AES
 
+
+def _cbc_decrypt_segment(key: bytes, previous_block: bytes, data: bytes) -> bytes:
+
+    # Worker for SegmentPool: must be a top-level function to be picklable
+    return cbc_decrypt(AES.new(key, AES.MODE_ECB), data, previous_block)
+
+
+def _native_cbc_encrypt(key: bytes, data: bytes, previous_block: bytes) -> bytes:
+
+    # Chaining done inside pycryptodome's CBC mode in a single call
+    return AES.new(key, AES.MODE_CBC, iv=bytes(previous_block)).encrypt(data)
+
+
+# 'pure' chains the blocks here on top of single-block AES
+ENCRYPT_BACKENDS = {
+    'pure': cbc_encrypt,
+    'native': _native_cbc_encrypt,
+}
+
+
 class CBCMode(CipherMode):
     
 
-    def __init__(self, key: bytes, iv: bytes = None):
+    # Количество блоков, расшифровываемых за один вызов AES
+    BATCH_BLOCKS = 4096
+
+    def __init__(self, key: bytes, iv: bytes = None, pool: SegmentPool = None, backend: str = None):
         super().__init__(key, iv, "CBC")
+        # Необязательный пул для параллельной расшифровки больших чанков
+        self.pool = pool
+        # Шифрование последовательно: либо нативный CBC, либо цикл по блокам
+        self.native = is_native(ENCRYPT_BACKENDS, backend)
 
     @property
     def requires_padding(self) -> bool:
@@ -14,46 +44,56 @@ class CBCMode(CipherMode):
 
     def encrypt(self, plaintext: bytes) -> bytes:
 
-        # Добавляем паддинг
-        padded_data = pad(plaintext, AES.block_size)
+        # Полные блоки шифруются прямо из входа, паддинг добавляется только
+        # к неполному хвосту - копия всего открытого текста не создается
+        plaintext = memoryview(plaintext)
+        body_length = len(plaintext) - len(plaintext) % AES.block_size
 
-        # Разбиваем на блоки
-        blocks = [padded_data[i:i + 16] for i in range(0, len(padded_data), 16)]
+        ciphertext, previous_block = self._encrypt_chunk(plaintext[:body_length], self.iv)
+        last_block, _ = self._encrypt_chunk(pad(bytes(plaintext[body_length:]), AES.block_size), previous_block)
+        return b''.join((ciphertext, last_block))
 
-        ciphertext = b''
-        previous_block = self.iv
+    def decrypt(self, ciphertext: bytes) -> bytes:
 
-        for block in blocks:
-            # XOR с предыдущим зашифрованным блоком (или IV для первого)
-            xor_block = bytes(a ^ b for a, b in zip(block, previous_block))
+        if len(ciphertext) % 16 != 0:
+            raise ValueError("Ciphertext length must be multiple of block size")
 
-            # Шифруем блок
-            encrypted_block = self._aes.encrypt(xor_block)
-            ciphertext += encrypted_block
-            previous_block = encrypted_block
+        plaintext, _ = self._decrypt_chunk(ciphertext, self.iv)
 
-        return ciphertext
+        # Убираем паддинг
+        return unpad(plaintext, AES.block_size)
 
-    def decrypt(self, ciphertext: bytes) -> bytes:
+    def _encrypt_chunk(self, data: bytes, previous_block: bytes):
 
-        if len(ciphertext) % 16 != 0:
-            raise ValueError("Ciphertext length must be multiple of block size")
+        if not data:
+            return b'', previous_block
 
-        # Разбиваем на блоки
-        blocks = [ciphertext[i:i + 16] for i in range(0, len(ciphertext), 16)]
+        if self.native:
+            ciphertext = _native_cbc_encrypt(self.key, data, previous_block)
+        else:
+            ciphertext = cbc_encrypt(self._aes, data, previous_block)
 
-        plaintext = b''
-        previous_block = self.iv
+        # Последний блок шифротекста - IV для следующего чанка
+        return ciphertext, ciphertext[-16:]
 
-        for block in blocks:
-            # Расшифровываем блок
-            decrypted_block = self._aes.decrypt(block)
+    def _decrypt_chunk(self, data: bytes, previous_block: bytes):
 
-            # XOR с предыдущим зашифрованным блоком
-            plain_block = bytes(a ^ b for a, b in zip(decrypted_block, previous_block))
-            plaintext += plain_block
+        if len(data) % 16 != 0:
+            raise ValueError("Ciphertext length must be multiple of block size")
 
-            previous_block = block
+        if not data:
+            return b'', previous_block
 
-        # Убираем паддинг
-        return unpad(plaintext, AES.block_size)
\ No newline at end of file
+        data = memoryview(data)
+        last_block = bytes(data[-16:])
+
+        if self.pool is not None and self.pool.worth_splitting(len(data)):
+            # Каждому сегменту нужен только последний блок шифротекста перед ним
+            bounds = self.pool.split(len(data))
+            chains = [previous_block] + [bytes(data[start - 16:start]) for start, _ in bounds[1:]]
+            segments = [bytes(data[start:end]) for start, end in bounds]
+            outputs = self.pool.map(_cbc_decrypt_segment, [self.key] * len(bounds), chains, segments)
+            return b''.join(outputs), last_block
+
+        plaintext = cbc_decrypt(self._aes, data, previous_block, self.BATCH_BLOCKS)
+        return plaintext, last_block
\ No newline at end of file
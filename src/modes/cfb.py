@@ -1,49 +1,103 @@
 from .base import CipherMode
+from .parallel import SegmentPool
+from .utils import cfb_encrypt, cfb_decrypt, shift_register
+from src.backend import is_native
+from Crypto.Cipher import AES
+
+
+# Размер сегмента обратной связи в битах для каждого имени режима;
+# 'CFB' остаётся CFB-8 для совместимости
+MODE_SEGMENT_SIZES = {
+    'CFB': 8,
+    'CFB8': 8,
+    'CFB64': 64,
+    'CFB128': 128,
+}
+
+
+def _cfb_decrypt_segment(key: bytes, feedback: bytes, data: bytes, segment_bytes: int) -> bytes:
+
+    # Worker for SegmentPool: must be a top-level function to be picklable
+    plaintext, _ = cfb_decrypt(AES.new(key, AES.MODE_ECB), data, feedback, segment_bytes)
+    return plaintext
+
+
+def _native_cfb_encrypt(key: bytes, data: bytes, feedback: bytes, segment_bytes: int):
+
+    # Chaining done inside pycryptodome's CFB mode in a single call
+    cipher = AES.new(key, AES.MODE_CFB, iv=bytes(feedback), segment_size=8 * segment_bytes)
+    # pycryptodome accepts memoryview but not every buffer type (e.g. mmap)
+    ciphertext = cipher.encrypt(memoryview(data))
+    return ciphertext, shift_register(feedback, ciphertext)
+
+
+# 'pure' chains the segments here on top of single-block AES
+ENCRYPT_BACKENDS = {
+    'pure': cfb_encrypt,
+    'native': _native_cfb_encrypt,
+}
 
 
 class CFBMode(CipherMode):
    
 
-    def __init__(self, key: bytes, iv: bytes = None):
-        super().__init__(key, iv, "CFB")
+    # Количество регистров, шифруемых за один вызов AES при расшифровке
+    BATCH_BLOCKS = 4096
+
+    def __init__(self, key: bytes, iv: bytes = None, segment_size: int = 8,
+                 pool: SegmentPool = None, backend: str = None):
+
+        if segment_size not in MODE_SEGMENT_SIZES.values():
+            raise ValueError(f"Unsupported CFB segment size: {segment_size} bits. Valid: 8, 64, 128")
+
+        super().__init__(key, iv, "CFB" if segment_size == 8 else f"CFB{segment_size}")
+        self.segment_size = segment_size
+        # Необязательный пул для параллельной расшифровки больших чанков
+        self.pool = pool
+        # Шифрование последовательно: либо нативный CFB, либо цикл по сегментам
+        self.native = is_native(ENCRYPT_BACKENDS, backend)
 
     @property
     def requires_padding(self) -> bool:
         return False
 
-    def encrypt(self, plaintext: bytes) -> bytes:
+    @property
+    def block_size(self) -> int:
+        # The feedback unit: 1 byte for CFB-8, 8 for CFB-64, 16 for CFB-128
+        return self.segment_size // 8
 
-        ciphertext = b''
-        feedback = self.iv
+    def encrypt(self, plaintext: bytes) -> bytes:
 
-        # Обрабатываем данные побайтово (как потоковый шифр)
-        for i in range(0, len(plaintext)):
-            # Шифруем feedback регистр
-            encrypted_feedback = self._aes.encrypt(feedback)
+        ciphertext, _ = self._encrypt_chunk(plaintext, self.iv)
+        return ciphertext
 
-            # XOR первого байта с открытым текстом
-            cipher_byte = encrypted_feedback[0] ^ plaintext[i]
-            ciphertext += bytes([cipher_byte])
+    def decrypt(self, ciphertext: bytes) -> bytes:
 
-            # Обновляем feedback регистр: сдвигаем и добавляем зашифрованный байт
-            feedback = feedback[1:] + bytes([cipher_byte])
+        plaintext, _ = self._decrypt_chunk(ciphertext, self.iv)
+        return plaintext
 
-        return ciphertext
+    def _encrypt_chunk(self, data: bytes, feedback: bytes):
 
-    def decrypt(self, ciphertext: bytes) -> bytes:
+        if not data:
+            return b'', feedback
 
-        plaintext = b''
-        feedback = self.iv
+        if self.native:
+            return _native_cfb_encrypt(self.key, data, feedback, self.block_size)
+        return cfb_encrypt(self._aes, data, feedback, self.block_size)
 
-        for i in range(0, len(ciphertext)):
-            # Шифруем feedback регистр
-            encrypted_feedback = self._aes.encrypt(feedback)
+    def _decrypt_chunk(self, data: bytes, feedback: bytes):
 
-            # XOR первого байта с шифротекстом
-            plain_byte = encrypted_feedback[0] ^ ciphertext[i]
-            plaintext += bytes([plain_byte])
+        if not data:
+            return b'', feedback
 
-            # Обновляем feedback регистр: сдвигаем и добавляем байт шифротекста
-            feedback = feedback[1:] + bytes([ciphertext[i]])
+        if self.pool is not None and self.pool.worth_splitting(len(data)):
+            # Регистр сегмента - последние 16 байт шифротекста перед ним
+            data = memoryview(data)
+            bounds = self.pool.split(len(data))
+            registers = [shift_register(feedback, data[:start]) for start, _ in bounds]
+            segments = [bytes(data[start:end]) for start, end in bounds]
+            outputs = self.pool.map(_cfb_decrypt_segment, [self.key] * len(bounds), registers,
+                                    segments, [self.block_size] * len(bounds))
+            return b''.join(outputs), shift_register(feedback, data)
 
-        return plaintext
\ No newline at end of file
+        return cfb_decrypt(self._aes, data, feedback, self.block_size, self.BATCH_BLOCKS)
\ No newline at end of file
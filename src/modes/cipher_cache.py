@@ -0,0 +1,134 @@
+import hashlib
+import hmac
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from Crypto.Cipher import AES
+
+
+# Number of distinct keys kept expanded at the same time
+DEFAULT_CAPACITY = 64
+
+
+class CachedCipher:
+
+
+    # Expanded AES-ECB object for one key together with the result of the
+    # weak-key check, so both are computed once per key
+
+    __slots__ = ('key', 'aes', 'weak')
+
+    def __init__(self, key: bytes, weak: bool = False):
+
+        # Mutable copy, so that it can be overwritten on eviction
+        self.key = bytearray(key)
+        self.aes = AES.new(bytes(key), AES.MODE_ECB)
+        self.weak = weak
+
+    def zeroize(self):
+
+        # The expanded schedule lives inside PyCryptodome and is released
+        # with the cipher object; the key copy held here is wiped in place
+        self.key[:] = bytes(len(self.key))
+        self.aes = None
+
+
+class CipherCache:
+
+
+    # Bounded LRU cache of expanded AES objects. Entries are looked up by a
+    # keyed BLAKE2b fingerprint (with a per-process random salt), so raw keys
+    # are never used as dictionary keys; the stored key copy is compared in
+    # constant time and zeroized when the entry is evicted.
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY,
+                 weak_check: Optional[Callable[[bytes], bool]] = None):
+
+        if capacity < 1:
+            raise ValueError(f"Cache capacity must be positive, got {capacity}")
+
+        self.capacity = capacity
+        self._weak_check = weak_check
+        self._salt = os.urandom(16)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, key: bytes) -> bytes:
+
+        return hashlib.blake2b(key, key=self._salt, digest_size=16).digest()
+
+    def get(self, key: bytes) -> Tuple[object, bool, bool]:
+
+        # Returns (aes, weak, created); created is True when the key was not
+        # cached. The AES object stays valid for the caller after eviction.
+        fingerprint = self._fingerprint(key)
+
+        with self._lock:
+            cached = self._lookup(fingerprint, key)
+            if cached is not None:
+                return cached.aes, cached.weak, False
+
+        # Key expansion and the weak-key check run outside the lock
+        weak = bool(self._weak_check(key)) if self._weak_check else False
+        entry = CachedCipher(key, weak)
+
+        with self._lock:
+            # Another thread may have cached the same key in the meantime
+            cached = self._lookup(fingerprint, key)
+            if cached is not None:
+                entry.zeroize()
+                return cached.aes, cached.weak, False
+
+            self._entries[fingerprint] = entry
+            while len(self._entries) > self.capacity:
+                _, evicted = self._entries.popitem(last=False)
+                evicted.zeroize()
+
+            return entry.aes, entry.weak, True
+
+    def _lookup(self, fingerprint: bytes, key: bytes) -> Optional[CachedCipher]:
+
+        # Must be called with the lock held
+        entry = self._entries.get(fingerprint)
+        if entry is None:
+            return None
+
+        if not hmac.compare_digest(entry.key, key):
+            # Fingerprint collision: drop the stale entry
+            del self._entries[fingerprint]
+            entry.zeroize()
+            return None
+
+        self._entries.move_to_end(fingerprint)
+        return entry
+
+    def evict(self, key: bytes) -> bool:
+
+        with self._lock:
+            entry = self._entries.pop(self._fingerprint(key), None)
+
+        if entry is None:
+            return False
+
+        entry.zeroize()
+        return True
+
+    def clear(self):
+
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+
+        for entry in entries:
+            entry.zeroize()
+
+    def __contains__(self, key: bytes) -> bool:
+
+        with self._lock:
+            return self._fingerprint(key) in self._entries
+
+    def __len__(self) -> int:
+
+        return len(self._entries)
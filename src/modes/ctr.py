@@ -1,16 +1,29 @@
+from Crypto.Cipher import AES
 from .base import CipherMode
+from .parallel import SegmentPool
+from .utils import ctr_xor
+
+
+def _ctr_segment(key: bytes, counter: int, data: bytes) -> bytes:
+
+    # Worker for SegmentPool: must be a top-level function to be picklable
+    output, _ = ctr_xor(AES.new(key, AES.MODE_ECB), data, counter)
+    return output
 
 
 class CTRMode(CipherMode):
-    
 
-    def __init__(self, key: bytes, iv: bytes = None):
+
+    # Количество блоков счетчика, шифруемых за один вызов AES
+    BATCH_BLOCKS = 4096
+
+    def __init__(self, key: bytes, iv: bytes = None, pool: SegmentPool = None):
         super().__init__(key, iv, "CTR")
+        # Необязательный пул для параллельной обработки больших чанков
+        self.pool = pool
         # В CTR IV используется как начальное значение счетчика
-        if iv:
-            self.counter = int.from_bytes(iv, 'big')
-        else:
-            self.counter = int.from_bytes(os.urandom(16), 'big')
+        # (self.iv уже сгенерирован базовым классом, если не был передан)
+        self.counter = int.from_bytes(self.iv, 'big')
 
     @property
     def requires_padding(self) -> bool:
@@ -23,29 +36,33 @@ class CTRMode(CipherMode):
 
     def encrypt(self, plaintext: bytes) -> bytes:
 
-        ciphertext = b''
-        current_counter = self.counter
+        ciphertext, _ = self._encrypt_chunk(plaintext, self.counter)
+        return ciphertext
 
-        for i in range(0, len(plaintext), 16):
-            # Преобразуем счетчик в байты
-            counter_bytes = current_counter.to_bytes(16, 'big')
+    def decrypt(self, ciphertext: bytes) -> bytes:
 
-            # Шифруем счетчик
-            keystream_block = self._aes.encrypt(counter_bytes)
+        return self.encrypt(ciphertext)  # CTR симметричен
 
-            # Берем нужное количество байт из keystream
-            chunk_size = min(16, len(plaintext) - i)
-            chunk = plaintext[i:i + chunk_size]
+    def _initial_state(self) -> int:
 
-            # XOR с keystream
-            encrypted_chunk = bytes(a ^ b for a, b in zip(chunk, keystream_block[:chunk_size]))
-            ciphertext += encrypted_chunk
+        return self.counter
 
-            # Инкрементируем счетчик
-            current_counter = (current_counter + 1) % (2 ** 128)
+    def _encrypt_chunk(self, data: bytes, current_counter: int):
 
-        return ciphertext
+        blocks = (len(data) + 15) // 16
+        next_counter = (current_counter + blocks) % (2 ** 128)
 
-    def decrypt(self, ciphertext: bytes) -> bytes:
+        if self.pool is not None and self.pool.worth_splitting(len(data)):
+            # Сегменты независимы: начальный счетчик каждого известен заранее
+            bounds = self.pool.split(len(data))
+            counters = [(current_counter + start // 16) % (2 ** 128) for start, _ in bounds]
+            segments = [bytes(data[start:end]) for start, end in bounds]
+            outputs = self.pool.map(_ctr_segment, [self.key] * len(bounds), counters, segments)
+            return b''.join(outputs), next_counter
+
+        output, _ = ctr_xor(self._aes, data, current_counter, batch_blocks=self.BATCH_BLOCKS)
+        return output, next_counter
+
+    def _decrypt_chunk(self, data: bytes, current_counter: int):
 
-        return self.encrypt(ciphertext)  # CTR симметричен
\ No newline at end of file
+        return self._encrypt_chunk(data, current_counter)  # CTR симметричен
\ No newline at end of file
@@ -1,5 +1,6 @@
 from Crypto.Cipher import AES
 from typing import Union
+from .base import CipherContext, CIPHER_CACHE
 
 
 class PKCS7Padding:
@@ -34,30 +35,67 @@ class AES_ECB:
         if len(key) != 16:
             raise ValueError(f"AES-128 requires 16-byte key, got {len(key)} bytes")
         self.key = key
+        self._aes, _, _ = CIPHER_CACHE.get(key)
 
-    def encrypt(self, plaintext: bytes) -> bytes:
+    @property
+    def requires_padding(self) -> bool:
+        return True
+
+    @property
+    def block_size(self) -> int:
+        return AES.block_size
+
+    def encryptor(self) -> CipherContext:
+        return CipherContext(self, decrypting=False)
+
+    def decryptor(self) -> CipherContext:
+        return CipherContext(self, decrypting=True)
 
-        # Pad the plaintext
-        padded_plaintext = PKCS7Padding.pad(plaintext, AES.block_size)
+    def encrypt(self, plaintext: bytes) -> bytes:
 
-        # Create cipher object
-        cipher = AES.new(self.key, AES.MODE_ECB)
+        # Full blocks are encrypted straight from the input; only the partial
+        # tail is padded, so the plaintext itself is never copied
+        plaintext = memoryview(plaintext)
+        body_length = len(plaintext) - len(plaintext) % AES.block_size
 
-        # Encrypt block by block
-        ciphertext = cipher.encrypt(padded_plaintext)
-        return ciphertext
+        ciphertext, _ = self._encrypt_chunk(plaintext[:body_length], None)
+        last_block, _ = self._encrypt_chunk(PKCS7Padding.pad(bytes(plaintext[body_length:]), AES.block_size), None)
+        return b''.join((ciphertext, last_block))
 
     def decrypt(self, ciphertext: bytes) -> bytes:
 
         if len(ciphertext) % AES.block_size != 0:
             raise ValueError("Ciphertext length must be multiple of block size")
 
-        # Create cipher object
-        cipher = AES.new(self.key, AES.MODE_ECB)
-
         # Decrypt
-        padded_plaintext = cipher.decrypt(ciphertext)
+        padded_plaintext, _ = self._decrypt_chunk(ciphertext, None)
 
         # Remove padding
         plaintext = PKCS7Padding.unpad(padded_plaintext)
-        return plaintext
\ No newline at end of file
+        return plaintext
+
+    # ECB has no chaining state, but exposes the same chunk interface as
+    # CipherMode so that it can be driven by the streaming engine.
+    def _initial_state(self) -> None:
+        return None
+
+    def _release_state(self, state: None):
+        pass
+
+    def _encrypt_chunk(self, data: bytes, state: None):
+
+        # pycryptodome accepts memoryview but not every buffer type (e.g. mmap)
+        return self._aes.encrypt(memoryview(data)), state
+
+    def _decrypt_chunk(self, data: bytes, state: None):
+
+        if len(data) % AES.block_size != 0:
+            raise ValueError("Ciphertext length must be multiple of block size")
+
+        return self._aes.decrypt(memoryview(data)), state
+
+    def _pad(self, data: bytes) -> bytes:
+        return PKCS7Padding.pad(data, AES.block_size)
+
+    def _unpad(self, data: bytes) -> bytes:
+        return PKCS7Padding.unpad(data)
\ No newline at end of file
@@ -1,6 +1,4 @@
-from ..mac import HMAC
-from .base import CipherMode
-from abc import ABC, abstractmethod
+from ..mac import HMAC, HMACStream
 
 class AuthenticationError(Exception):
 
@@ -28,53 +26,40 @@ class EncryptThenMAC:
         h.update(key + b"MAC")
         return h.digest()[:16]
 
+    def _compute_tag(self, ciphertext: bytes, aad: bytes) -> bytes:
+
+        # HMAC(ciphertext || aad) with the two parts absorbed separately
+        stream = HMACStream.from_hmac(self.hmac)
+        stream.update(ciphertext)
+        stream.update(aad)
+        return stream.finalize()
+
     def encrypt(self, plaintext: bytes, aad: bytes = b"") -> bytes:
 
         # Encrypt
         ciphertext = self.cipher.encrypt(plaintext)
 
-        # Compute MAC over ciphertext + AAD
-        mac_data = ciphertext + aad
-        tag = self.hmac.compute(mac_data)
+        # MAC over ciphertext || AAD, fed piece by piece without joining them
+        tag = self._compute_tag(ciphertext, aad)
 
         # Return: ciphertext + tag
-        return ciphertext + tag
+        return b''.join((ciphertext, tag))
 
     def decrypt(self, data: bytes, aad: bytes = b"") -> bytes:
 
         if len(data) < 32:  # Minimum: 0 ciphertext + 32 byte HMAC
             raise ValueError("Data too short")
 
-        # Split ciphertext and tag
+        # Split ciphertext and tag (views, the payload is not copied)
+        data = memoryview(data)
         ciphertext = data[:-32]
         tag = data[-32:]
 
         # Verify MAC
-        mac_data = ciphertext + aad
-        if not self.hmac.verify(mac_data, tag):
+        if not self.hmac._constant_time_compare(self._compute_tag(ciphertext, aad), tag):
             raise AuthenticationError("Encrypt-then-MAC authentication failed")
 
         # Decrypt
         plaintext = self.cipher.decrypt(ciphertext)
 
-        return plaintext
-
-
-class AEADMode(CipherMode):
-
-
-    def __init__(self, key: bytes, iv: bytes = None, mode_name: str = ""):
-        super().__init__(key, iv, mode_name)
-        self._aad = b""
-
-    def set_aad(self, aad: bytes):
-
-        self._aad = aad
-
-    @abstractmethod
-    def encrypt(self, plaintext: bytes, aad: bytes = b"") -> bytes:
-        pass
-
-    @abstractmethod
-    def decrypt(self, data: bytes, aad: bytes = b"") -> bytes:
-        pass
\ No newline at end of file
+        return plaintext
\ No newline at end of file
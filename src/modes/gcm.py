@@ -1,7 +1,10 @@
+import hmac as _native_hmac
 import struct
 from typing import Optional
 from Crypto.Cipher import AES
 from src.csprng import generate_random_bytes
+from .parallel import SegmentPool
+from .utils import xor_bytes, counter_blocks, advance_counter, ctr_xor
 
 
 class AuthenticationError(Exception):
@@ -9,194 +12,395 @@ class AuthenticationError(Exception):
     pass
 
 
-class GCM:
+class GCMKey:
 
 
+    # Key-level GCM: the AES schedule, H and the GHASH tables are computed
+    # once per key. seal()/open() take the nonce per call and keep all
+    # per-message state in a fresh GCMContext, so one GCMKey can serve any
+    # number of messages, including from several threads at once.
+
     # Irreducible polynomial for GF(2^128): x^128 + x^7 + x^2 + x + 1
     R = 0xE1000000000000000000000000000000
     BLOCK_SIZE = 16  # 128 bits
+    TAG_SIZE = 16
 
-    def __init__(self, key: bytes, nonce: Optional[bytes] = None):
+    def __init__(self, key: bytes, pool: SegmentPool = None):
         if len(key) not in [16, 24, 32]:
             raise ValueError(f"Key must be 16, 24, or 32 bytes, got {len(key)}")
 
         self.key = key
         self.aes = AES.new(key, AES.MODE_ECB)
 
-        # Generate random 12-byte nonce if not provided
-        if nonce:
-            self.nonce = nonce
-        else:
-            self.nonce = generate_random_bytes(12)
-
         # Precompute H = AES_K(0^128)
         self.H = self.aes.encrypt(b'\x00' * self.BLOCK_SIZE)
         self.H_int = int.from_bytes(self.H, 'big')
 
-        # Precompute multiplication table for GHASH
+        # Precompute multiplication tables for GHASH
         self.mul_table = self._precompute_mul_table()
+        self._mult_h = _multiplier(self._position_tables())
 
-    def _precompute_mul_table(self):
-
-        table = {}
+        # Optional pool for processing large updates in parallel segments
+        self.pool = pool
+        self._h_powers = {}
 
-        # Precompute powers of H
-        h = self.H_int
-        for i in range(128):
-            table[1 << i] = h
-            # Multiply by x (left shift)
-            if h & 1:
-                h = (h >> 1) ^ self.R
-            else:
-                h = h >> 1
+    @classmethod
+    def _mult_x(cls, v: int) -> int:
 
-        return table
+        # Multiply by x in GCM bit order (bit 127 of the int is x^0)
+        if v & 1:
+            return (v >> 1) ^ cls.R
+        return v >> 1
 
-    def _mult_gf(self, x: int, y: int) -> int:
+    @classmethod
+    def _mult_gf(cls, x: int, y: int) -> int:
 
+        # Reference bit-by-bit multiplication in GF(2^128), NIST SP 800-38D alg. 1
         z = 0
-        for i in range(128):
+        v = y
+        for i in range(127, -1, -1):
             if (x >> i) & 1:
-                z ^= self.mul_table.get(1 << i, 0)
+                z ^= v
+            v = cls._mult_x(v)
         return z
 
-    def _ghash(self, aad: bytes, ciphertext: bytes) -> int:
-
-        # Prepare blocks
-        y = 0
-
-        # Process AAD
-        aad_len = len(aad)
-        for i in range(0, aad_len, self.BLOCK_SIZE):
-            block = aad[i:i + self.BLOCK_SIZE]
-            if len(block) < self.BLOCK_SIZE:
-                block = block.ljust(self.BLOCK_SIZE, b'\x00')
-            block_int = int.from_bytes(block, 'big')
-            y = self._mult_gf(y ^ block_int, self.H_int)
-
-        # Process ciphertext
-        ciphertext_len = len(ciphertext)
-        for i in range(0, ciphertext_len, self.BLOCK_SIZE):
-            block = ciphertext[i:i + self.BLOCK_SIZE]
-            if len(block) < self.BLOCK_SIZE:
-                block = block.ljust(self.BLOCK_SIZE, b'\x00')
-            block_int = int.from_bytes(block, 'big')
-            y = self._mult_gf(y ^ block_int, self.H_int)
-
-        # Process lengths (64 bits each)
-        len_block = struct.pack('>QQ', aad_len * 8, ciphertext_len * 8)
-        len_int = int.from_bytes(len_block, 'big')
-        y = self._mult_gf(y ^ len_int, self.H_int)
-
-        return y
-
-    def _inc_counter(self, counter: bytes) -> bytes:
-
-        if len(counter) != 16:
-            raise ValueError("Counter must be 16 bytes")
-
-        counter_int = int.from_bytes(counter, 'big')
-        counter_low = counter_int & 0xFFFFFFFF
-        counter_high = counter_int >> 32
+    @classmethod
+    def _byte_table(cls, top: int) -> list:
+
+        # table[n] = (n placed in the top byte) * top-value, built by linearity
+        # from the eight single-bit entries
+        table = [0] * 256
+        v = top
+        for bit in range(7, -1, -1):
+            table[1 << bit] = v
+            v = cls._mult_x(v)
+        for n in range(1, 256):
+            low_bit = n & -n
+            if n != low_bit:
+                table[n] = table[n ^ low_bit] ^ table[low_bit]
+        return table
 
-        counter_low = (counter_low + 1) & 0xFFFFFFFF
+    def _precompute_mul_table(self):
 
-        new_counter = (counter_high << 32) | counter_low
-        return new_counter.to_bytes(16, 'big')
+        # Shoup's 8-bit table: mul_table[n] = (n << 120) * H
+        return self._byte_table(self.H_int)
+
+    def _position_tables(self) -> list:
+
+        # tables[i][n] = (n placed in byte i of X, counting from the lowest
+        # byte) * H. Byte i of Shoup's method is multiplied by x^8 once per
+        # later byte, so each table is the next one shifted by x^8; with all
+        # sixteen tables X * H needs no per-step reduction at all.
+        tables = [self.mul_table]
+        for _ in range(15):
+            tables.append([(z >> 8) ^ _REDUCTION_TABLE[z & 0xFF] for z in tables[-1]])
+        return tables[::-1]
+
+    def _h_power(self, n: int) -> int:
+
+        # H^n, used to chain GHASH values computed independently per segment:
+        # GHASH from state y over n blocks = y * H^n + GHASH from 0
+        if n not in self._h_powers:
+            result = 1 << 127  # 1 in GCM bit order
+            base = self.H_int
+            exponent = n
+            while exponent:
+                if exponent & 1:
+                    result = self._mult_gf(result, base)
+                base = self._mult_gf(base, base)
+                exponent >>= 1
+            self._h_powers[n] = result
+        return self._h_powers[n]
+
+    def _ghash_blocks(self, y: int, data: bytes) -> int:
+
+        # Absorb whole 16-byte blocks into the GHASH state y
+        data = memoryview(data)
+        mult_h = self._mult_h
+        for i in range(0, len(data), self.BLOCK_SIZE):
+            y = mult_h(y ^ int.from_bytes(data[i:i + self.BLOCK_SIZE], 'big'))
+        return y
 
-    def _generate_iv(self) -> bytes:
+    @staticmethod
+    def _initial_counter(nonce: bytes) -> bytes:
 
-        if len(self.nonce) == 12:
+        if len(nonce) == 12:
             # GCM default: nonce || 0x00000001
-            return self.nonce + b'\x00\x00\x00\x01'
+            return bytes(nonce) + b'\x00\x00\x00\x01'
         else:
             # GHASH for other nonce lengths
             # For simplicity, we only support 12-byte nonce
             raise ValueError("Only 12-byte nonce supported")
 
-    def encrypt(self, plaintext: bytes, aad: bytes = b"") -> bytes:
+    def _seal_parts(self, nonce: bytes, plaintext: bytes, aad: bytes) -> list:
+
+        # [ciphertext, tag], left for the caller to join exactly once
+        context = GCMContext(self, nonce, decrypting=False)
+        context.update_aad(aad)
+        ciphertext = context.update(plaintext)
+        return [ciphertext, context.finalize()]
+
+    def seal(self, nonce: bytes, plaintext: bytes, aad: bytes = b"") -> bytes:
+
+        # Returns ciphertext || tag; the nonce is not included
+        return b''.join(self._seal_parts(nonce, plaintext, aad))
 
-        # Generate J0
-        j0 = self._generate_iv()
+    def open(self, nonce: bytes, data: bytes, aad: bytes = b"") -> bytes:
 
-        # Generate initial counter for encryption
-        counter = self._inc_counter(j0)
+        # data is ciphertext || tag as returned by seal()
+        if len(data) < self.TAG_SIZE:
+            raise ValueError("Data too short for GCM tag")
 
-        # Encrypt using CTR mode
-        ciphertext = b''
-        blocks = [plaintext[i:i + self.BLOCK_SIZE]
-                 for i in range(0, len(plaintext), self.BLOCK_SIZE)]
+        data = memoryview(data)
+        context = GCMContext(self, nonce, decrypting=True)
+        context.update_aad(aad)
+        plaintext = context.update(data[:-self.TAG_SIZE])
 
-        for block in blocks:
-            # Encrypt counter to get keystream
-            keystream = self.aes.encrypt(counter)
+        # Plaintext is only returned once the tag has been verified
+        context.verify(data[-self.TAG_SIZE:])
+
+        return plaintext
+
+    @staticmethod
+    def _constant_time_compare(a: bytes, b: bytes) -> bool:
+
+        return _native_hmac.compare_digest(a, b)
 
-            # XOR with plaintext block
-            if len(block) < self.BLOCK_SIZE:
-                keystream = keystream[:len(block)]
 
-            ciphertext_block = bytes(a ^ b for a, b in zip(block, keystream))
-            ciphertext += ciphertext_block
+class GCM(GCMKey):
 
-            # Increment counter
-            counter = self._inc_counter(counter)
 
-        # Compute authentication tag
-        s = self.aes.encrypt(j0)
-        auth_tag_int = self._ghash(aad, ciphertext) ^ int.from_bytes(s, 'big')
-        auth_tag = auth_tag_int.to_bytes(16, 'big')
+    # Single-message GCM bound to one nonce; for many messages under one key
+    # use GCMKey.seal()/open() instead
+
+    def __init__(self, key: bytes, nonce: Optional[bytes] = None, pool: SegmentPool = None):
+        super().__init__(key, pool)
+
+        # Generate random 12-byte nonce if not provided
+        if nonce:
+            self.nonce = nonce
+        else:
+            self.nonce = generate_random_bytes(12)
+
+    def encryptor(self) -> 'GCMContext':
+
+        return GCMContext(self, self.nonce, decrypting=False)
+
+    def decryptor(self) -> 'GCMContext':
+
+        return GCMContext(self, self.nonce, decrypting=True)
+
+    def encrypt(self, plaintext: bytes, aad: bytes = b"") -> bytes:
 
         # Return: nonce + ciphertext + tag
-        return self.nonce + ciphertext + auth_tag
+        return b''.join([self.nonce] + self._seal_parts(self.nonce, plaintext, aad))
 
     def decrypt(self, data: bytes, aad: bytes = b"") -> bytes:
 
         if len(data) < 28:  # min: 12 nonce + 0 ciphertext + 16 tag
             raise ValueError("Data too short for GCM format")
 
-        # Extract components
-        nonce = data[:12]
-        tag = data[-16:]
-        ciphertext = data[12:-16]
+        # The nonce travels with the data; self.nonce is left untouched.
+        # Both parts are views into data, the payload is not copied
+        data = memoryview(data)
+        return self.open(data[:12], data[12:], aad)
+
+
+class GCMContext:
+
+
+    # Streaming GCM: AAD first (update_aad), then data (update). GHASH state is
+    # kept incrementally, so memory does not depend on the message size.
+    # When decrypting, update() returns plaintext that is NOT yet authenticated;
+    # the caller must hold it back until verify(tag) succeeds.
 
-        # Verify authentication tag
-        self.nonce = nonce  # Set nonce for tag calculation
-        j0 = self._generate_iv()
-        s = self.aes.encrypt(j0)
-        computed_tag_int = self._ghash(aad, ciphertext) ^ int.from_bytes(s, 'big')
-        computed_tag = computed_tag_int.to_bytes(16, 'big')
+    SEGMENT_SIZE = 64 * 1024
 
-        if not self._constant_time_compare(computed_tag, tag):
+    def __init__(self, gcm: GCMKey, nonce: bytes, decrypting: bool = False):
+        self._gcm = gcm
+        self._decrypting = decrypting
+
+        j0 = gcm._initial_counter(nonce)
+        self._tag_mask = int.from_bytes(gcm.aes.encrypt(j0), 'big')
+        self._counter = self._advance(int.from_bytes(j0, 'big'), 1)
+        self._keystream = b''
+
+        self._y = 0
+        self._hash_buffer = b''
+        self._aad_length = 0
+        self._data_length = 0
+        self._aad_done = False
+        self._finalized = False
+
+    @staticmethod
+    def _advance(counter: int, blocks: int) -> int:
+
+        # inc32: only the low 32 bits of the counter block are incremented
+        return advance_counter(counter, blocks, counter_bits=32)
+
+    def _check_active(self):
+
+        if self._finalized:
+            raise ValueError("GCM context already finalized")
+
+    def _absorb(self, data: bytes):
+
+        # Feed GHASH, keeping an incomplete trailing block for the next call
+        if self._hash_buffer:
+            needed = GCMKey.BLOCK_SIZE - len(self._hash_buffer)
+            self._hash_buffer += bytes(data[:needed])
+            data = data[needed:]
+            if len(self._hash_buffer) < GCMKey.BLOCK_SIZE:
+                return
+            self._y = self._gcm._ghash_blocks(self._y, self._hash_buffer)
+            self._hash_buffer = b''
+
+        full = len(data) - len(data) % GCMKey.BLOCK_SIZE
+        self._y = self._gcm._ghash_blocks(self._y, data[:full])
+        self._hash_buffer = bytes(data[full:])
+
+    def _flush_hash(self):
+
+        # Zero-pad the pending partial block (end of AAD or of the ciphertext)
+        if self._hash_buffer:
+            block = self._hash_buffer.ljust(GCMKey.BLOCK_SIZE, b'\x00')
+            self._y = self._gcm._ghash_blocks(self._y, block)
+            self._hash_buffer = b''
+
+    def _next_keystream(self, length: int) -> bytes:
+
+        stream = self._keystream
+        if len(stream) < length:
+            blocks = (length - len(stream) + GCMKey.BLOCK_SIZE - 1) // GCMKey.BLOCK_SIZE
+            stream += self._gcm.aes.encrypt(counter_blocks(self._counter, blocks, counter_bits=32))
+            self._counter = self._advance(self._counter, blocks)
+
+        self._keystream = stream[length:]
+        return stream[:length]
+
+    def update_aad(self, aad: bytes):
+
+        self._check_active()
+        if self._aad_done:
+            raise ValueError("AAD must be supplied before any data")
+
+        self._aad_length += len(aad)
+        self._absorb(memoryview(aad))
+
+    def update(self, data: bytes) -> bytes:
+
+        self._check_active()
+        if not self._aad_done:
+            self._flush_hash()
+            self._aad_done = True
+
+        data = memoryview(data)
+        pool = self._gcm.pool
+
+        if pool is not None and pool.worth_splitting(len(data)):
+            # Serial prefix up to the next block boundary, then whole blocks in
+            # parallel, then the trailing partial block serially again
+            head = (-self._data_length) % GCMKey.BLOCK_SIZE
+            tail = (len(data) - head) % GCMKey.BLOCK_SIZE
+            return b''.join([
+                self._update_serial(data[:head]),
+                self._update_parallel(pool, data[head:len(data) - tail]),
+                self._update_serial(data[len(data) - tail:]),
+            ])
+
+        return self._update_serial(data)
+
+    def _update_serial(self, data: memoryview) -> bytes:
+
+        pieces = []
+
+        for offset in range(0, len(data), self.SEGMENT_SIZE):
+            segment = data[offset:offset + self.SEGMENT_SIZE]
+            output = xor_bytes(segment, self._next_keystream(len(segment)))
+
+            # GHASH always runs over the ciphertext
+            self._absorb(segment if self._decrypting else output)
+            pieces.append(output)
+
+        self._data_length += len(data)
+        return b''.join(pieces)
+
+    def _update_parallel(self, pool: SegmentPool, data: memoryview) -> bytes:
+
+        # Block-aligned state: no pending keystream or GHASH bytes
+        bounds = pool.split(len(data))
+        counters = [self._advance(self._counter, start // GCMKey.BLOCK_SIZE) for start, _ in bounds]
+        segments = [bytes(data[start:end]) for start, end in bounds]
+
+        results = pool.map(_gcm_segment, [self._gcm.key] * len(bounds), counters, segments,
+                           [self._decrypting] * len(bounds))
+
+        # Chain the per-segment GHASH values: y = y * H^n ^ y_segment
+        for (start, end), (_, segment_y) in zip(bounds, results):
+            blocks = (end - start) // GCMKey.BLOCK_SIZE
+            self._y = self._gcm._mult_gf(self._y, self._gcm._h_power(blocks)) ^ segment_y
+
+        self._counter = self._advance(self._counter, len(data) // GCMKey.BLOCK_SIZE)
+        self._data_length += len(data)
+        return b''.join(output for output, _ in results)
+
+    def finalize(self) -> bytes:
+
+        self._check_active()
+        self._finalized = True
+
+        self._flush_hash()
+        len_block = struct.pack('>QQ', self._aad_length * 8, self._data_length * 8)
+        y = self._gcm._mult_h(self._y ^ int.from_bytes(len_block, 'big'))
+
+        return (y ^ self._tag_mask).to_bytes(16, 'big')
+
+    def verify(self, tag: bytes):
+
+        computed_tag = self.finalize()
+
+        if not GCMKey._constant_time_compare(computed_tag, bytes(tag)):
             raise AuthenticationError("GCM authentication failed")
 
-        # Decrypt using CTR mode
-        counter = self._inc_counter(j0)
-        plaintext = b''
 
-        blocks = [ciphertext[i:i + self.BLOCK_SIZE]
-                 for i in range(0, len(ciphertext), self.BLOCK_SIZE)]
+def _gcm_segment(key: bytes, counter: int, data: bytes, decrypting: bool):
 
-        for block in blocks:
-            keystream = self.aes.encrypt(counter)
+    # Worker for SegmentPool: CTR-encrypts one block-aligned segment and
+    # returns it with the GHASH of its ciphertext computed from a zero state
+    gcm = GCMKey(key)
+    output, _ = ctr_xor(gcm.aes, data, counter, counter_bits=32)
+    return output, gcm._ghash_blocks(0, data if decrypting else output)
 
-            if len(block) < self.BLOCK_SIZE:
-                keystream = keystream[:len(block)]
 
-            plaintext_block = bytes(a ^ b for a, b in zip(block, keystream))
-            plaintext += plaintext_block
+def _multiplier(tables: list):
 
-            counter = self._inc_counter(counter)
+    # X * H as sixteen table lookups, one per byte of X (lowest byte first).
+    # Built as a closure over the tables of one key; unrolled on purpose,
+    # this runs once per 16-byte block.
+    (t0, t1, t2, t3, t4, t5, t6, t7,
+     t8, t9, t10, t11, t12, t13, t14, t15) = tables
 
-        return plaintext
+    def mult_h(x: int) -> int:
 
-    @staticmethod
-    def _constant_time_compare(a: bytes, b: bytes) -> bool:
+        (b0, b1, b2, b3, b4, b5, b6, b7,
+         b8, b9, b10, b11, b12, b13, b14, b15) = x.to_bytes(16, 'little')
+        return (t0[b0] ^ t1[b1] ^ t2[b2] ^ t3[b3] ^ t4[b4] ^ t5[b5] ^ t6[b6] ^ t7[b7] ^
+                t8[b8] ^ t9[b9] ^ t10[b10] ^ t11[b11] ^ t12[b12] ^ t13[b13] ^ t14[b14] ^ t15[b15])
+
+    return mult_h
+
+
+def _reduction_table() -> list:
 
-        if len(a) != len(b):
-            return False
+    # _REDUCTION_TABLE[r] = r * x^8 for a value r that fits in the low byte:
+    # the reduction terms produced when Z * x^8 shifts that byte out
+    table = [0] * 256
+    for r in range(256):
+        v = r
+        for _ in range(8):
+            v = GCMKey._mult_x(v)
+        table[r] = v
+    return table
 
-        result = 0
-        for x, y in zip(a, b):
-            result |= x ^ y
 
-        return result == 0
\ No newline at end of file
+_REDUCTION_TABLE = _reduction_table()
\ No newline at end of file
@@ -1,39 +1,176 @@
+import queue
+import threading
+
 from .base import CipherMode
+from .utils import ofb_keystream, xor_bytes
+from src.backend import is_native
+from Crypto.Cipher import AES
+
+
+def _native_ofb_keystream(key: bytes, register: bytes, length: int):
+
+    # Keystream generated inside pycryptodome's OFB mode in a single call,
+    # encrypting a zeroed buffer in place (no separate input/output copies)
+    keystream = bytearray((length + 15) // 16 * 16)
+    AES.new(key, AES.MODE_OFB, iv=bytes(register)).encrypt(keystream, output=keystream)
+    return keystream, bytes(keystream[-16:])
+
+
+# 'pure' chains the blocks here on top of single-block AES
+KEYSTREAM_BACKENDS = {
+    'pure': ofb_keystream,
+    'native': _native_ofb_keystream,
+}
+
+
+def _hand_over(item, batches: queue.Queue, stop: threading.Event):
+
+    # Blocks while the queue is full, but gives up once the consumer has
+    # stopped, so the thread never outlives it
+    while not stop.is_set():
+        try:
+            batches.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
+def _produce(generate, register: bytes, batch_size: int, batches: queue.Queue, stop: threading.Event):
+
+    # Producer thread: keeps the queue filled with keystream batches until
+    # stopped. Errors are handed over to the consumer instead of being lost.
+    try:
+        while not stop.is_set():
+            keystream, register = generate(register, batch_size)
+            _hand_over(keystream, batches, stop)
+    except Exception as e:
+        _hand_over(e, batches, stop)
+
+
+class Keystream:
+
+
+    # OFB keystream depends only on key and IV, so it can be produced ahead of
+    # the data. Without prefetch every read() generates exactly the blocks it
+    # is missing; with prefetch a producer thread stays up to PREFETCH_DEPTH
+    # batches ahead, overlapping keystream generation with file I/O.
+
+    PREFETCH_DEPTH = 4
+
+    def __init__(self, generate, register: bytes, batch_size: int = 64 * 1024, prefetch: bool = False):
+
+        self._generate = generate
+        self._register = register
+        self._pending = memoryview(b'')
+        self._batches = None
+        self._stop = None
+
+        if prefetch:
+            self._batches = queue.Queue(maxsize=self.PREFETCH_DEPTH)
+            self._stop = threading.Event()
+            threading.Thread(target=_produce, args=(generate, register, batch_size, self._batches, self._stop),
+                             daemon=True).start()
+
+    def _next_batch(self, length: int):
+
+        if self._batches is None:
+            keystream, self._register = self._generate(self._register, length)
+            return keystream
+
+        keystream = self._batches.get()
+        if isinstance(keystream, Exception):
+            raise keystream
+        return keystream
+
+    def read(self, length: int):
+
+        pieces = []
+
+        while length > 0:
+            if not self._pending:
+                self._pending = memoryview(self._next_batch(length))
+
+            piece = self._pending[:length]
+            self._pending = self._pending[length:]
+            pieces.append(piece)
+            length -= len(piece)
+
+        if len(pieces) == 1:
+            return pieces[0]
+        return b''.join(pieces)
+
+    def close(self):
+
+        if self._stop is not None:
+            self._stop.set()
+
+    def __del__(self):
+
+        self.close()
 
 
 class OFBMode(CipherMode):
 
 
-    def __init__(self, key: bytes, iv: bytes = None):
+    # Размер пакета ключевого потока для фонового потока
+    KEYSTREAM_BATCH = 64 * 1024
+
+    def __init__(self, key: bytes, iv: bytes = None, backend: str = None, prefetch: bool = False):
         super().__init__(key, iv, "OFB")
+        # Генерация ключевого потока: нативный OFB или цепочка вызовов AES
+        self.native = is_native(KEYSTREAM_BACKENDS, backend)
+        # Генерировать ключевой поток заранее в отдельном потоке (для потоковой обработки)
+        self.prefetch = prefetch
 
     @property
     def requires_padding(self) -> bool:
         return False
 
-    def encrypt(self, plaintext: bytes) -> bytes:
+    def _keystream(self, prefetch: bool) -> Keystream:
 
-        ciphertext = b''
-        keystream_state = self.iv
+        key = self.key
+        # Фоновый поток получает собственный AES объект
+        aes = AES.new(key, AES.MODE_ECB) if prefetch else self._aes
 
-        # Генерируем keystream
-        for i in range(0, len(plaintext), 16):
-            # Шифруем текущее состояние для получения keystream блока
-            keystream_block = self._aes.encrypt(keystream_state)
+        if self.native:
+            def generate(register, length):
+                return _native_ofb_keystream(key, register, length)
+        else:
+            def generate(register, length):
+                return ofb_keystream(aes, register, length)
 
-            # Берем нужное количество байт из keystream
-            chunk_size = min(16, len(plaintext) - i)
-            chunk = plaintext[i:i + chunk_size]
+        return Keystream(generate, self.iv, self.KEYSTREAM_BATCH, prefetch)
 
-            # XOR с keystream
-            encrypted_chunk = bytes(a ^ b for a, b in zip(chunk, keystream_block[:chunk_size]))
-            ciphertext += encrypted_chunk
+    def _initial_state(self) -> Keystream:
+        return self._keystream(self.prefetch)
 
-            # Обновляем состояние для следующего блока
-            keystream_state = keystream_block
+    def _release_state(self, keystream: Keystream):
+        keystream.close()
 
+    def encrypt(self, plaintext: bytes) -> bytes:
+
+        ciphertext, _ = self._encrypt_chunk(plaintext, self._keystream(prefetch=False))
         return ciphertext
 
     def decrypt(self, ciphertext: bytes) -> bytes:
        
-        return self.encrypt(ciphertext)  # OFB симметричен
\ No newline at end of file
+        return self.encrypt(ciphertext)  # OFB симметричен
+
+    def _encrypt_chunk(self, data: bytes, keystream: Keystream):
+
+        if not data:
+            return b'', keystream
+
+        # Широкий XOR по сегментам размером в пакет ключевого потока: большие
+        # промежуточные целые и ключевой поток на весь чанк не создаются
+        data = memoryview(data)
+        pieces = []
+        for offset in range(0, len(data), self.KEYSTREAM_BATCH):
+            segment = data[offset:offset + self.KEYSTREAM_BATCH]
+            pieces.append(xor_bytes(segment, keystream.read(len(segment))))
+
+        return b''.join(pieces), keystream
+
+    def _decrypt_chunk(self, data: bytes, keystream: Keystream):
+
+        return self._encrypt_chunk(data, keystream)  # OFB симметричен
\ No newline at end of file
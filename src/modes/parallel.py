@@ -0,0 +1,60 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+
+# Amount of data handed to a single worker task
+SEGMENT_SIZE = 1024 * 1024
+
+EXECUTORS = {
+    'process': ProcessPoolExecutor,
+    'thread': ThreadPoolExecutor,
+}
+
+
+class SegmentPool:
+
+
+    # Splits large buffers into block-aligned segments and runs a worker
+    # function over them in a process or thread pool. Results come back in
+    # input order. The executor is only started on first use.
+
+    def __init__(self, jobs: int, executor: str = 'process', segment_size: int = SEGMENT_SIZE):
+        if jobs < 1:
+            raise ValueError(f"Number of jobs must be positive, got {jobs}")
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unsupported executor '{executor}'. Valid: {', '.join(EXECUTORS)}")
+        if segment_size <= 0 or segment_size % 16 != 0:
+            raise ValueError(f"Segment size must be a positive multiple of 16, got {segment_size}")
+
+        self.jobs = jobs
+        self.segment_size = segment_size
+        self._executor_class = EXECUTORS[executor]
+        self._executor = None
+
+    def worth_splitting(self, length: int) -> bool:
+
+        return self.jobs > 1 and length >= 2 * self.segment_size
+
+    def split(self, length: int) -> List[Tuple[int, int]]:
+
+        # (start, end) offsets; all segments except the last are whole segments
+        return [(start, min(start + self.segment_size, length))
+                for start in range(0, length, self.segment_size)]
+
+    def map(self, func: Callable, *iterables) -> list:
+
+        if self._executor is None:
+            self._executor = self._executor_class(max_workers=self.jobs)
+        return list(self._executor.map(func, *iterables))
+
+    def close(self):
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'SegmentPool':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,36 @@
+from typing import BinaryIO
+
+
+# Size of a single read from the input file
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _pump(context, source: BinaryIO, destination: BinaryIO, chunk_size: int) -> int:
+
+    if chunk_size <= 0:
+        raise ValueError(f"Chunk size must be positive, got {chunk_size}")
+
+    written = 0
+
+    while chunk := source.read(chunk_size):
+        output = context.update(chunk)
+        destination.write(output)
+        written += len(output)
+
+    output = context.finalize()
+    destination.write(output)
+    written += len(output)
+
+    return written
+
+
+def stream_encrypt(cipher, source: BinaryIO, destination: BinaryIO,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+
+    return _pump(cipher.encryptor(), source, destination, chunk_size)
+
+
+def stream_decrypt(cipher, source: BinaryIO, destination: BinaryIO,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+
+    return _pump(cipher.decryptor(), source, destination, chunk_size)
@@ -0,0 +1,211 @@
+from functools import lru_cache
+
+
+def xor_bytes(a: bytes, b: bytes) -> bytes:
+
+    if len(a) != len(b):
+        raise ValueError(f"Bytes must be same length: {len(a)} != {len(b)}")
+
+    # One wide integer XOR over the whole buffer instead of a per-byte generator
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(len(a), 'big')
+
+
+@lru_cache(maxsize=16)
+def _counter_terms(count: int):
+
+    # ones    = 0x00..01 || 0x00..01 || ... (count blocks)
+    # offsets = 0        || 1        || ... || count - 1
+    ones = int.from_bytes((b'\x00' * 15 + b'\x01') * count, 'big')
+    offsets = int.from_bytes(b''.join(i.to_bytes(16, 'big') for i in range(count)), 'big')
+    return ones, offsets
+
+
+def counter_blocks(start: int, count: int, counter_bits: int = 128) -> bytes:
+
+    # Concatenation of `count` 16-byte big-endian counter blocks starting at
+    # `start`. Only the low `counter_bits` bits are incremented (GCM uses 32).
+    if count <= 0:
+        return b''
+
+    mask = (1 << counter_bits) - 1
+
+    if (start & mask) + count - 1 <= mask:
+        # No wrap-around inside the batch, so every block is start + i and
+        # the whole buffer is a single multiply-add on big integers
+        ones, offsets = _counter_terms(count)
+        return (start * ones + offsets).to_bytes(16 * count, 'big')
+
+    high = start & ~mask
+    return b''.join((high | ((start + i) & mask)).to_bytes(16, 'big') for i in range(count))
+
+
+def advance_counter(counter: int, blocks: int, counter_bits: int = 128) -> int:
+
+    mask = (1 << counter_bits) - 1
+    return (counter & ~mask) | ((counter + blocks) & mask)
+
+
+def ctr_xor(aes, data: bytes, counter: int, counter_bits: int = 128,
+            batch_blocks: int = 4096):
+
+    # CTR keystream XOR in batches: the counter blocks of a batch are encrypted
+    # in one ECB call and XORed with the data as one wide integer.
+    # Returns (output, next counter).
+    data = memoryview(data)
+    batch_size = batch_blocks * 16
+    pieces = []
+
+    for offset in range(0, len(data), batch_size):
+        segment = data[offset:offset + batch_size]
+        blocks = (len(segment) + 15) // 16
+
+        keystream = aes.encrypt(counter_blocks(counter, blocks, counter_bits))
+        pieces.append(xor_bytes(segment, memoryview(keystream)[:len(segment)]))
+
+        counter = advance_counter(counter, blocks, counter_bits)
+
+    return b''.join(pieces), counter
+
+
+def cbc_decrypt(aes, data: bytes, previous_block: bytes, batch_blocks: int = 4096) -> bytes:
+
+    # CBC decryption in batches: P = ECB-decrypt(C) XOR (IV || C without its
+    # last block). Each batch is one ECB call and one wide integer XOR.
+    data = memoryview(data)
+    batch_size = batch_blocks * 16
+    pieces = []
+
+    for offset in range(0, len(data), batch_size):
+        segment = data[offset:offset + batch_size]
+        chain = previous_block if offset == 0 else data[offset - 16:offset]
+        shifted = bytes(chain) + segment[:-16]
+
+        pieces.append(xor_bytes(aes.decrypt(segment), shifted))
+
+    return b''.join(pieces)
+
+
+def cbc_encrypt(aes, data: bytes, previous_block: bytes) -> bytes:
+
+    # CBC encryption is sequential, so this stays a block loop, but without
+    # the per-byte work: the chaining value is kept as a 128-bit integer and
+    # ciphertext blocks are written into a preallocated buffer.
+    data = memoryview(data)
+    output = bytearray(len(data))
+    chain = int.from_bytes(previous_block, 'big')
+    from_bytes = int.from_bytes
+    encrypt = aes.encrypt
+
+    for offset in range(0, len(data), 16):
+        end = offset + 16
+        block = encrypt((from_bytes(data[offset:end], 'big') ^ chain).to_bytes(16, 'big'))
+        output[offset:end] = block
+        chain = from_bytes(block, 'big')
+
+    return bytes(output)
+
+
+# memoryview formats whose item is exactly one CFB segment
+_SEGMENT_FORMATS = {1: 'B', 8: 'Q'}
+
+
+def shift_register(register: bytes, data: bytes) -> bytes:
+
+    # Last 16 bytes of register || data
+    return (bytes(register) + bytes(data[-16:]))[-16:]
+
+
+def _feedback_registers(stream: bytes, segment_bytes: int, count: int):
+
+    # The register for segment i is stream[i * s:i * s + 16]. With s < 16
+    # these windows overlap, so they are gathered with strided copies: one
+    # per position of a segment inside the 16-byte register.
+    if segment_bytes == 16:
+        return stream[:16 * count]
+
+    fmt = _SEGMENT_FORMATS[segment_bytes]
+    per_block = 16 // segment_bytes
+    registers = bytearray(16 * count)
+    target = memoryview(registers).cast(fmt)
+    source = memoryview(stream).cast(fmt)
+
+    for position in range(per_block):
+        target[position::per_block] = source[position:position + count]
+
+    return registers
+
+
+def cfb_encrypt(aes, data: bytes, feedback: bytes, segment_bytes: int = 16):
+
+    # CFB encryption is sequential: every register depends on the previous
+    # ciphertext segment. The register is kept as a 128-bit integer and the
+    # output goes into a preallocated buffer. Returns (output, register).
+    data = memoryview(data)
+    output = bytearray(len(data))
+    register = int.from_bytes(feedback, 'big')
+    mask = (1 << 128) - 1
+    from_bytes = int.from_bytes
+    encrypt = aes.encrypt
+
+    for offset in range(0, len(data), segment_bytes):
+        segment = data[offset:offset + segment_bytes]
+        length = len(segment)
+
+        keystream = encrypt(register.to_bytes(16, 'big'))
+        value = from_bytes(segment, 'big') ^ from_bytes(keystream[:length], 'big')
+        output[offset:offset + length] = value.to_bytes(length, 'big')
+
+        register = ((register << (8 * length)) | value) & mask
+
+    return bytes(output), register.to_bytes(16, 'big')
+
+
+def cfb_decrypt(aes, data: bytes, feedback: bytes, segment_bytes: int = 16,
+                batch_blocks: int = 4096):
+
+    # Every CFB register is made of known ciphertext, so decryption is bulk:
+    # the registers of a batch are encrypted in one ECB call and the first
+    # segment_bytes of each result are XORed with the ciphertext.
+    # Returns (output, register).
+    data = memoryview(data)
+    full = len(data) - len(data) % segment_bytes
+    batch_size = batch_blocks * segment_bytes
+    register = bytes(feedback)
+    pieces = []
+
+    for offset in range(0, full, batch_size):
+        segment = data[offset:min(offset + batch_size, full)]
+        count = len(segment) // segment_bytes
+        stream = register + bytes(segment)
+
+        keystream = aes.encrypt(_feedback_registers(stream, segment_bytes, count))
+        if segment_bytes != 16:
+            # Keep only the leading segment of every encrypted register
+            keystream = memoryview(keystream).cast(_SEGMENT_FORMATS[segment_bytes])
+            keystream = keystream[::16 // segment_bytes].tobytes()
+
+        pieces.append(xor_bytes(segment, keystream))
+        register = stream[-16:]
+
+    if full < len(data):
+        # Final partial segment uses a truncated keystream
+        tail = data[full:]
+        pieces.append(xor_bytes(tail, aes.encrypt(register)[:len(tail)]))
+        register = shift_register(register, tail)
+
+    return b''.join(pieces), register
+
+
+def ofb_keystream(aes, register: bytes, length: int):
+
+    # OFB keystream is a chain of single-block encryptions of the register,
+    # written into a preallocated buffer. `length` is rounded up to whole
+    # blocks. Returns (keystream, register).
+    keystream = bytearray((length + 15) // 16 * 16)
+    encrypt = aes.encrypt
+
+    for offset in range(0, len(keystream), 16):
+        register = encrypt(register)
+        keystream[offset:offset + 16] = register
+
+    return keystream, register
@@ -0,0 +1,156 @@
+import unittest
+import os
+import json
+import hashlib
+import tempfile
+import subprocess
+import sys
+from unittest import mock
+from src.backend import get_backend, BACKEND_ENV_VAR
+from src.hash import SHA256, SHA3_256, create_hash, hash_data
+from src.mac import HMAC, HMACStream
+from src.kdf import pbkdf2_hmac_sha256
+
+
+VECTORS_DIR = os.path.join(os.path.dirname(__file__), 'vectors')
+
+
+def load_vectors(filename):
+
+    with open(os.path.join(VECTORS_DIR, filename), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestBackendSelection(unittest.TestCase):
+
+
+    def test_explicit_backend_wins_over_environment(self):
+
+        with mock.patch.dict(os.environ, {BACKEND_ENV_VAR: 'pure'}):
+            self.assertEqual(get_backend('native'), 'native')
+            self.assertEqual(get_backend(), 'pure')
+
+    def test_default_is_auto(self):
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(get_backend(), 'auto')
+
+    def test_invalid_backend(self):
+
+        with self.assertRaises(ValueError):
+            get_backend('gpu')
+
+        with mock.patch.dict(os.environ, {BACKEND_ENV_VAR: 'gpu'}):
+            with self.assertRaises(ValueError):
+                create_hash('sha256')
+
+    def test_create_hash_implementations(self):
+
+        self.assertIsInstance(create_hash('sha256', 'pure'), SHA256)
+        self.assertIsInstance(create_hash('sha3-256', 'pure'), SHA3_256)
+        self.assertEqual(create_hash('sha256', 'native').name, 'sha256')
+        self.assertEqual(create_hash('sha3-256', 'auto').name, 'sha3_256')
+
+    def test_hmac_backend_selection(self):
+
+        # Keyed inner/outer states come from the selected hash implementation
+        self.assertEqual('sha256', HMAC(b"key", 'sha256', 'native')._inner.name)
+        self.assertIsInstance(HMAC(b"key", 'sha256', 'pure')._inner, SHA256)
+
+
+class TestBackendVectors(unittest.TestCase):
+
+
+    # Оба бэкенда должны давать одинаковый результат на эталонных векторах
+    BACKENDS = ['pure', 'native']
+
+    def test_sha256_vectors(self):
+
+        for vector in load_vectors('nist_sha256.json'):
+            for backend in self.BACKENDS:
+                with self.subTest(vector=vector['description'], backend=backend):
+                    message = bytes.fromhex(vector['message'])
+                    self.assertEqual(vector['hash'], hash_data(message, 'sha256', backend).hex())
+
+    def test_sha3_256_vectors(self):
+
+        for vector in load_vectors('nist_sha3_256.json'):
+            for backend in self.BACKENDS:
+                with self.subTest(vector=vector['description'], backend=backend):
+                    message = bytes.fromhex(vector['message'])
+                    self.assertEqual(vector['hash'], hash_data(message, 'sha3-256', backend).hex())
+
+    def test_hmac_vectors(self):
+
+        for vector in load_vectors('rfc_4231_hmac.json'):
+            key = bytes.fromhex(vector['key'])
+            message = bytes.fromhex(vector['message'])
+
+            for backend in self.BACKENDS:
+                with self.subTest(vector=vector['description'], backend=backend):
+                    self.assertEqual(vector['hmac'], HMAC(key, 'sha256', backend).compute_hex(message))
+
+                    stream = HMACStream(key, 'sha256', backend)
+                    stream.update(message[:3])
+                    stream.update(message[3:])
+                    self.assertEqual(vector['hmac'], stream.finalize_hex())
+
+    def test_hmac_long_key(self):
+
+        # Ключ длиннее блока хешируется выбранным бэкендом
+        key = os.urandom(100)
+        message = os.urandom(500)
+
+        pure = HMAC(key, 'sha256', 'pure').compute(message)
+        native = HMAC(key, 'sha256', 'native').compute(message)
+
+        self.assertEqual(pure, native)
+
+    def test_pbkdf2_backends_agree(self):
+
+        expected = hashlib.pbkdf2_hmac('sha256', b"password", b"salt", 3, 40)
+
+        for backend in self.BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(expected, pbkdf2_hmac_sha256(b"password", b"salt", 3, 40, backend))
+
+
+class TestCLIBackend(unittest.TestCase):
+
+
+    def test_cli_backends_produce_same_output(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            test_file = os.path.join(tmpdir, 'data.bin')
+            with open(test_file, 'wb') as f:
+                f.write(os.urandom(5000))
+
+            outputs = []
+            for backend in ['pure', 'native']:
+                for algorithm in ['sha256', 'sha3-256']:
+                    result = subprocess.run([
+                        sys.executable, "-m", "src.cryptocore", "dgst",
+                        "--algorithm", algorithm,
+                        "--backend", backend,
+                        "--input", test_file
+                    ], capture_output=True, text=True, check=True)
+                    outputs.append(result.stdout)
+
+            self.assertEqual(outputs[:2], outputs[2:])
+
+    def test_cli_invalid_environment_backend(self):
+
+        env = dict(os.environ, **{BACKEND_ENV_VAR: 'gpu'})
+        result = subprocess.run([
+            sys.executable, "-m", "src.cryptocore", "dgst",
+            "--algorithm", "sha256",
+            "--input", __file__
+        ], capture_output=True, text=True, env=env)
+
+        self.assertEqual(result.returncode, 1)
+        self.assertIn(BACKEND_ENV_VAR, result.stderr)
+
+
+if __name__ == '__main__':
+
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 import os
 import tempfile
+import json
+import sys
 from src.modes.ecb import AES_ECB, PKCS7Padding
 import subprocess
 
@@ -85,6 +87,111 @@ class TestCLI(unittest.TestCase):
                     os.remove(f)
 
 
+class TestBatchCLI(unittest.TestCase):
+    def setUp(self):
+        self.key = "000102030405060708090a0b0c0d0e0f"
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+        # Small files in a nested tree, including an empty one
+        self.input_dir = os.path.join(self.tmpdir.name, 'plain')
+        self.files = {'a.txt': os.urandom(100), 'empty': b'', os.path.join('sub', 'b.bin'): os.urandom(5000)}
+        for name, content in self.files.items():
+            path = os.path.join(self.input_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(content)
+
+    def _run(self, mode, operation, *extra):
+
+        return subprocess.run([
+            sys.executable, "-m", "src.cryptocore", "enc",
+            "--algorithm", "aes",
+            "--mode", mode,
+            operation,
+            "--key", self.key,
+            *extra
+        ], capture_output=True, text=True)
+
+    def _read(self, directory, name):
+
+        with open(os.path.join(directory, name), 'rb') as f:
+            return f.read()
+
+    def test_directory_roundtrip(self):
+
+        for mode, workers, executor in [('cbc', '1', 'thread'), ('ctr', '2', 'thread'),
+                                        ('gcm', '2', 'process'), ('etm', '2', 'thread')]:
+            with self.subTest(mode=mode, executor=executor):
+                encrypted_dir = os.path.join(self.tmpdir.name, mode + '.enc')
+                decrypted_dir = os.path.join(self.tmpdir.name, mode + '.dec')
+
+                result = self._run(mode, "--encrypt", "--input-dir", self.input_dir,
+                                   "--output-dir", encrypted_dir, "--workers", workers, "--executor", executor)
+                self.assertEqual(0, result.returncode, result.stderr)
+                self.assertIn("3 of 3 files, 0 failed", result.stdout)
+
+                # Every file gets its own IV/nonce
+                iv_size = 12 if mode == 'gcm' else 16
+                ivs = {self._read(encrypted_dir, name)[:iv_size] for name in self.files}
+                self.assertEqual(len(self.files), len(ivs))
+
+                result = self._run(mode, "--decrypt", "--input-dir", encrypted_dir,
+                                   "--output-dir", decrypted_dir, "--workers", workers, "--executor", executor)
+                self.assertEqual(0, result.returncode, result.stderr)
+                for name, content in self.files.items():
+                    self.assertEqual(content, self._read(decrypted_dir, name))
+
+    def test_manifest_and_failure_report(self):
+
+        encrypted_dir = os.path.join(self.tmpdir.name, 'enc')
+        self._run('gcm', "--encrypt", "--input-dir", self.input_dir, "--output-dir", encrypted_dir)
+
+        # Tamper with one file; the others must still be decrypted
+        tampered = os.path.join(encrypted_dir, 'a.txt')
+        with open(tampered, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 1]))
+
+        manifest = os.path.join(self.tmpdir.name, 'files.txt')
+        with open(manifest, 'w') as f:
+            f.write("# nightly batch\n")
+            f.write(f"enc/a.txt\tout/a.txt\n")
+            f.write(f"enc/{os.path.join('sub', 'b.bin')}\tout/b.bin\n")
+            f.write(f"enc/missing\n")
+
+        report = os.path.join(self.tmpdir.name, 'report.json')
+        result = self._run('gcm', "--decrypt", "--manifest", manifest, "--report", report)
+
+        self.assertEqual(1, result.returncode)
+        self.assertIn("1 of 3 files, 2 failed", result.stdout)
+        self.assertIn("authentication failed", result.stderr)
+
+        output_dir = os.path.join(self.tmpdir.name, 'out')
+        self.assertEqual(self.files[os.path.join('sub', 'b.bin')], self._read(output_dir, 'b.bin'))
+        self.assertFalse(os.path.exists(os.path.join(output_dir, 'a.txt')))
+
+        with open(report) as f:
+            summary = json.load(f)
+        self.assertEqual((3, 1, 2), (summary['total'], summary['succeeded'], summary['failed']))
+        self.assertEqual([tampered, os.path.join(encrypted_dir, 'missing')],
+                         [failure['input'] for failure in summary['failures']])
+        # The report carries the actual cause of each failure
+        self.assertIn("authentication failed", summary['failures'][0]['error'])
+        self.assertIn("No such file or directory", summary['failures'][1]['error'])
+
+    def test_invalid_batch_arguments(self):
+
+        for extra in [("--iv", "00" * 16), ("--output", "out.bin"), ("--jobs", "2"), ("--workers", "0"),
+                      ("--output-dir", os.path.join(self.input_dir, 'nested'))]:
+            with self.subTest(extra=extra):
+                result = self._run('ctr', "--encrypt", "--input-dir", self.input_dir, *extra)
+                self.assertNotEqual(0, result.returncode)
+                self.assertIn("Error:", result.stderr)
+
+
 if __name__ == '__main__':
 
     unittest.main()
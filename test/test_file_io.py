@@ -0,0 +1,250 @@
+import unittest
+import os
+import tempfile
+import subprocess
+import stat
+import sys
+from src.file_io import MappedInput, PreallocatedOutput, AtomicOutputFile, read_gcm_file, read_etm_file, write_etm_file
+from src.modes.encrypt_then_mac import EncryptThenMAC
+
+
+class TestMappedInput(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'data.bin')
+        self.content = os.urandom(1000)
+        with open(self.path, 'wb') as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_views(self):
+
+        with MappedInput(self.path, 16, 32) as source:
+            self.assertIsInstance(source.body, memoryview)
+            self.assertEqual(self.content[:16], source.header)
+            self.assertEqual(self.content[16:-32], source.body)
+            self.assertEqual(self.content[-32:], source.trailer)
+
+    def test_too_short(self):
+
+        with self.assertRaises(ValueError):
+            MappedInput(self.path, 600, 600)
+
+    def test_empty_file(self):
+
+        with open(self.path, 'wb'):
+            pass
+
+        with MappedInput(self.path) as source:
+            self.assertEqual(b'', source.body)
+
+    def test_close_with_outstanding_slice(self):
+
+        # Срез, переживший close(), остаётся читаемым
+        source = MappedInput(self.path)
+        piece = source.body[10:20]
+        source.close()
+        self.assertEqual(self.content[10:20], piece)
+
+    def test_read_helpers(self):
+
+        self.assertEqual((self.content[:12], self.content[12:-16], self.content[-16:]),
+                         read_gcm_file(self.path))
+        self.assertEqual((self.content[:16], self.content[16:-32], self.content[-32:]),
+                         read_etm_file(self.path))
+        self.assertEqual((None, self.content[:-32], self.content[-32:]),
+                         read_etm_file(self.path, has_iv=False))
+
+
+class TestPreallocatedOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'out', 'data.bin')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_write_in_place_and_trim(self):
+
+        with PreallocatedOutput(self.path, 100) as destination:
+            self.assertEqual(100, os.path.getsize(self.path))
+            destination.write_at(10, b'world')
+            destination.write_at(0, b'hello')
+            destination.write(b'HELLO')
+
+        # Файл обрезается до последнего записанного байта
+        with open(self.path, 'rb') as f:
+            self.assertEqual(b'HELLO' + bytes(5) + b'world', f.read())
+
+    def test_write_past_size(self):
+
+        with PreallocatedOutput(self.path, 8) as destination:
+            with self.assertRaises(ValueError):
+                destination.write_at(4, b'too long')
+
+    def test_empty_output(self):
+
+        with PreallocatedOutput(self.path, 0) as destination:
+            destination.write(b'')
+
+        self.assertEqual(0, os.path.getsize(self.path))
+
+
+@unittest.skipUnless(os.name == 'posix', "POSIX permissions")
+class TestAtomicOutputFile(unittest.TestCase):
+    def _commit(self, path):
+
+        with AtomicOutputFile(path) as destination:
+            destination.write(b"data")
+            destination.commit()
+
+        return stat.S_IMODE(os.stat(path).st_mode)
+
+    def test_new_file_follows_umask(self):
+
+        old_umask = os.umask(0o027)
+        self.addCleanup(os.umask, old_umask)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Как у open(): 0666 без битов umask, а не 0600 от mkstemp
+            self.assertEqual(0o640, self._commit(os.path.join(tmpdir, 'new.bin')))
+
+    def test_replaced_file_keeps_mode(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'existing.bin')
+            with open(path, 'wb') as f:
+                f.write(b"old")
+            os.chmod(path, 0o604)
+
+            self.assertEqual(0o604, self._commit(path))
+            with open(path, 'rb') as f:
+                self.assertEqual(b"data", f.read())
+
+
+class TestETMFiles(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(32)
+        self.aad = b"Associated data"
+
+    def _run(self, operation, source, target, aad):
+
+        return subprocess.run([
+            sys.executable, "-m", "src.cryptocore", "enc",
+            "--algorithm", "aes",
+            "--mode", "etm",
+            operation,
+            "--key", self.key.hex(),
+            "--aad", aad.hex(),
+            "--input", source,
+            "--output", target
+        ], capture_output=True, text=True)
+
+    def test_cli_roundtrip(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original_file = os.path.join(tmpdir, 'plain.bin')
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            for length in [0, 100, 3 * 64 * 1024 + 5]:
+                with self.subTest(length=length):
+                    original_content = os.urandom(length)
+                    with open(original_file, 'wb') as f:
+                        f.write(original_content)
+
+                    result = self._run("--encrypt", original_file, encrypted_file, self.aad)
+                    self.assertEqual(0, result.returncode, result.stderr)
+
+                    # Формат файла: IV || шифротекст || тег, совместим с EncryptThenMAC
+                    with open(encrypted_file, 'rb') as f:
+                        data = f.read()
+                    self.assertEqual(16 + (length // 16 + 1) * 16 + 32, len(data))
+                    etm = EncryptThenMAC('cbc', self.key, data[:16])
+                    self.assertEqual(original_content, etm.decrypt(data[16:], self.aad))
+
+                    result = self._run("--decrypt", encrypted_file, decrypted_file, self.aad)
+                    self.assertEqual(0, result.returncode, result.stderr)
+                    with open(decrypted_file, 'rb') as f:
+                        self.assertEqual(original_content, f.read())
+
+    def test_write_etm_file_from_views(self):
+
+        iv = os.urandom(16)
+        data = EncryptThenMAC('cbc', self.key, iv).encrypt(os.urandom(1000), self.aad)
+        view = memoryview(data)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'message.etm')
+            # Шифротекст и тег пишутся по отдельности, без склейки в памяти
+            write_etm_file(path, iv, view[:-32], view[-32:])
+
+            self.assertEqual((iv, data[:-32], data[-32:]), read_etm_file(path))
+
+    @unittest.skipUnless(os.path.exists('/dev/stdin'), "requires /dev/stdin")
+    def test_cli_pipe_roundtrip(self):
+
+        original_content = os.urandom(200 * 1024 + 7)
+
+        def run(operation, payload, target):
+            return subprocess.run([
+                sys.executable, "-m", "src.cryptocore", "enc",
+                "--algorithm", "aes",
+                "--mode", "etm",
+                operation,
+                "--key", self.key.hex(),
+                "--aad", self.aad.hex(),
+                "--input", "/dev/stdin",
+                "--output", target
+            ], input=payload, capture_output=True)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            # Размер канала неизвестен: вход читается последовательно, а не через mmap
+            result = run("--encrypt", original_content, encrypted_file)
+            self.assertEqual(0, result.returncode, result.stderr)
+            with open(encrypted_file, 'rb') as f:
+                data = f.read()
+            etm = EncryptThenMAC('cbc', self.key, data[:16])
+            self.assertEqual(original_content, etm.decrypt(data[16:], self.aad))
+
+            result = run("--decrypt", data, decrypted_file)
+            self.assertEqual(0, result.returncode, result.stderr)
+            with open(decrypted_file, 'rb') as f:
+                self.assertEqual(original_content, f.read())
+
+            # При неверном MAC расшифрованный текст не появляется
+            os.remove(decrypted_file)
+            result = run("--decrypt", data[:-1] + bytes([data[-1] ^ 1]), decrypted_file)
+            self.assertNotEqual(0, result.returncode)
+            self.assertIn(b"authentication failed", result.stderr)
+            self.assertFalse(os.path.exists(decrypted_file))
+
+            result = run("--decrypt", data[:40], decrypted_file)
+            self.assertNotEqual(0, result.returncode)
+            self.assertIn(b"too short", result.stderr)
+
+    def test_cli_wrong_aad(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original_file = os.path.join(tmpdir, 'plain.bin')
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            with open(original_file, 'wb') as f:
+                f.write(os.urandom(1000))
+
+            self._run("--encrypt", original_file, encrypted_file, self.aad)
+            result = self._run("--decrypt", encrypted_file, decrypted_file, b"other")
+
+            self.assertNotEqual(0, result.returncode)
+            self.assertIn("authentication failed", result.stderr)
+            self.assertFalse(os.path.exists(decrypted_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
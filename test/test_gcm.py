@@ -3,7 +3,11 @@ import os
 import tempfile
 import subprocess
 import sys
-from src.modes.gcm import GCM, AuthenticationError
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from Crypto.Cipher import AES
+from src.modes.gcm import GCM, GCMKey, AuthenticationError
+from src.modes.parallel import SegmentPool
 
 
 class TestGCM(unittest.TestCase):
@@ -168,6 +172,159 @@ class TestGCM(unittest.TestCase):
                     os.remove(f)
 
 
+    def test_cli_failed_decrypt_keeps_existing_output(self):
+
+        nonce = os.urandom(12)
+        data = nonce + GCMKey(self.key).seal(nonce, os.urandom(1000), self.aad)
+        existing = os.urandom(300)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            encrypted_file = os.path.join(tmpdir, 'data.enc')
+            decrypted_file = os.path.join(tmpdir, 'data.dec')
+            with open(decrypted_file, 'wb') as f:
+                f.write(existing)
+
+            # Усеченный файл и неверный тег: целевой файл остается как был
+            for payload in [data[:20], data[:-1] + bytes([data[-1] ^ 1])]:
+                with open(encrypted_file, 'wb') as f:
+                    f.write(payload)
+
+                result = subprocess.run([
+                    sys.executable, "-m", "src.cryptocore", "enc",
+                    "--algorithm", "aes",
+                    "--mode", "gcm",
+                    "--decrypt",
+                    "--key", self.key.hex(),
+                    "--input", encrypted_file,
+                    "--output", decrypted_file,
+                    "--aad", self.aad.hex()
+                ], capture_output=True, text=True)
+
+                self.assertNotEqual(0, result.returncode)
+                with open(decrypted_file, 'rb') as f:
+                    self.assertEqual(existing, f.read())
+                self.assertEqual([], [name for name in os.listdir(tmpdir) if name.endswith('.tmp')])
+
+    @unittest.skipUnless(os.path.exists('/dev/stdin'), "requires /dev/stdin")
+    def test_cli_gcm_decrypt_from_pipe(self):
+
+        # Размер канала неизвестен: тег - последние 16 байт, прочитанных до EOF
+        nonce = os.urandom(12)
+        plaintext = os.urandom(200 * 1024 + 7)
+        data = nonce + GCMKey(self.key).seal(nonce, plaintext, self.aad)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            def decrypt(payload):
+                return subprocess.run([
+                    sys.executable, "-m", "src.cryptocore", "enc",
+                    "--algorithm", "aes",
+                    "--mode", "gcm",
+                    "--decrypt",
+                    "--key", self.key.hex(),
+                    "--input", "/dev/stdin",
+                    "--output", decrypted_file,
+                    "--aad", self.aad.hex()
+                ], input=payload, capture_output=True)
+
+            result = decrypt(data)
+            self.assertEqual(0, result.returncode, result.stderr)
+            with open(decrypted_file, 'rb') as f:
+                self.assertEqual(plaintext, f.read())
+
+            os.remove(decrypted_file)
+            result = decrypt(data[:-1] + bytes([data[-1] ^ 1]))
+            self.assertNotEqual(0, result.returncode)
+            self.assertFalse(os.path.exists(decrypted_file))
+
+            result = decrypt(data[:20])
+            self.assertNotEqual(0, result.returncode)
+            self.assertIn(b"too short", result.stderr)
+
+class TestGCMStreaming(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        self.nonce = os.urandom(12)
+        self.plaintext = os.urandom(1000)
+        self.aad = b"Associated authentication data"
+
+    def test_incremental_matches_one_shot(self):
+
+        expected = GCM(self.key, self.nonce).encrypt(self.plaintext, self.aad)
+
+        encryptor = GCM(self.key, self.nonce).encryptor()
+        encryptor.update_aad(self.aad[:5])
+        encryptor.update_aad(self.aad[5:])
+        ciphertext = b''.join(encryptor.update(self.plaintext[i:i + 7])
+                              for i in range(0, len(self.plaintext), 7))
+        tag = encryptor.finalize()
+
+        self.assertEqual(expected, self.nonce + ciphertext + tag)
+
+        decryptor = GCM(self.key, self.nonce).decryptor()
+        decryptor.update_aad(self.aad)
+        plaintext = b''.join(decryptor.update(ciphertext[i:i + 13])
+                             for i in range(0, len(ciphertext), 13))
+        decryptor.verify(tag)
+
+        self.assertEqual(self.plaintext, plaintext)
+
+    def test_verify_detects_tamper(self):
+
+        encryptor = GCM(self.key, self.nonce).encryptor()
+        ciphertext = encryptor.update(self.plaintext)
+        tag = encryptor.finalize()
+
+        decryptor = GCM(self.key, self.nonce).decryptor()
+        decryptor.update(ciphertext[:-1] + bytes([ciphertext[-1] ^ 1]))
+
+        with self.assertRaises(AuthenticationError):
+            decryptor.verify(tag)
+
+    def test_aad_after_data_rejected(self):
+
+        encryptor = GCM(self.key, self.nonce).encryptor()
+        encryptor.update(b"data")
+
+        with self.assertRaises(ValueError):
+            encryptor.update_aad(b"late aad")
+
+    def test_cli_tampered_file_leaves_no_output(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            input_file = os.path.join(tmpdir, 'plain.bin')
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            with open(input_file, 'wb') as f:
+                f.write(os.urandom(100 * 1024))
+
+            result = subprocess.run([
+                sys.executable, "-m", "src.cryptocore", "enc",
+                "--algorithm", "aes", "--mode", "gcm", "--encrypt",
+                "--key", self.key.hex(),
+                "--input", input_file, "--output", encrypted_file
+            ], capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+            with open(encrypted_file, 'r+b') as f:
+                f.seek(50)
+                byte = f.read(1)
+                f.seek(50)
+                f.write(bytes([byte[0] ^ 0x01]))
+
+            result = subprocess.run([
+                sys.executable, "-m", "src.cryptocore", "enc",
+                "--algorithm", "aes", "--mode", "gcm", "--decrypt",
+                "--key", self.key.hex(),
+                "--input", encrypted_file, "--output", decrypted_file
+            ], capture_output=True, text=True)
+
+            self.assertNotEqual(result.returncode, 0)
+            self.assertEqual(sorted(os.listdir(tmpdir)), ['plain.bin', 'plain.enc'])
+
+
 class TestGCMNISTVectors(unittest.TestCase):
 
 
@@ -192,6 +349,203 @@ class TestGCMNISTVectors(unittest.TestCase):
         decrypted = gcm.decrypt(ciphertext, aad)
         self.assertEqual(plaintext, decrypted)
 
+    def test_nist_vectors_2_to_4(self):
+
+        # Test cases 2-4 from the GCM specification (McGrew & Viega)
+        k3 = "feffe9928665731c6d6a8f9467308308"
+        p3 = ("d9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a72"
+              "1c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b391aafd255")
+        c3 = ("42831ec2217774244b7221b784d0d49ce3aa212f2c02a4e035c17e2329aca12e"
+              "21d514b25466931c7d8f6a5aac84aa051ba30b396a0aac973d58e091473f5985")
+        vectors = [
+            ("00000000000000000000000000000000", "000000000000000000000000",
+             "00000000000000000000000000000000", "",
+             "0388dace60b6a392f328c2b971b2fe78", "ab6e47d42cec13bdf53a67b21257bddf"),
+            (k3, "cafebabefacedbaddecaf888", p3, "",
+             c3, "4d5c2af327cd64a62cf35abd2ba6fab4"),
+            (k3, "cafebabefacedbaddecaf888", p3[:120], "feedfacedeadbeeffeedfacedeadbeefabaddad2",
+             c3[:120], "5bc94fbc3221a5db94fae95ae7121a47"),
+        ]
+
+        for key, nonce, plaintext, aad, ciphertext, tag in vectors:
+            with self.subTest(tag=tag):
+                gcm = GCM(bytes.fromhex(key), bytes.fromhex(nonce))
+                result = gcm.encrypt(bytes.fromhex(plaintext), bytes.fromhex(aad))
+
+                self.assertEqual(bytes.fromhex(nonce + ciphertext + tag), result)
+                self.assertEqual(bytes.fromhex(plaintext),
+                                 gcm.decrypt(result, bytes.fromhex(aad)))
+
+    def test_empty_vector_tag(self):
+
+        gcm = GCM(bytes(16), bytes(12))
+        ciphertext = gcm.encrypt(b"", b"")
+
+        self.assertEqual(bytes.fromhex("58e2fccefa7e3061367f1d57a4e7455a"), ciphertext[12:])
+
+    def test_table_multiplication_matches_reference(self):
+
+        gcm = GCM(os.urandom(16))
+
+        for _ in range(50):
+            x = int.from_bytes(os.urandom(16), 'big')
+            self.assertEqual(gcm._mult_gf(x, gcm.H_int), gcm._mult_h(x))
+
+
+class TestGCMParallel(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        self.nonce = os.urandom(12)
+        self.plaintext = os.urandom(10 * 1024 + 9)
+        self.aad = b"Associated authentication data"
+
+    def test_parallel_matches_serial(self):
+
+        expected = GCM(self.key, self.nonce).encrypt(self.plaintext, self.aad)
+
+        with SegmentPool(3, executor='thread', segment_size=1024) as pool:
+            encryptor = GCM(self.key, self.nonce, pool=pool).encryptor()
+            encryptor.update_aad(self.aad)
+            # Невыровненное начало проверяет последовательную "голову"
+            ciphertext = encryptor.update(self.plaintext[:5]) + encryptor.update(self.plaintext[5:])
+            tag = encryptor.finalize()
+            self.assertEqual(expected, self.nonce + ciphertext + tag)
+
+            decrypted = GCM(self.key, pool=pool).decrypt(expected, self.aad)
+            self.assertEqual(self.plaintext, decrypted)
+
+    def test_cli_jobs_roundtrip(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original_file = os.path.join(tmpdir, 'plain.bin')
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            original_content = os.urandom(2 * 1024 * 1024 + 100)
+            with open(original_file, 'wb') as f:
+                f.write(original_content)
+
+            subprocess.run([
+                sys.executable, "-m", "src.cryptocore", "enc",
+                "--algorithm", "aes",
+                "--mode", "gcm",
+                "--encrypt",
+                "--jobs", "2",
+                "--key", self.key.hex(),
+                "--aad", self.aad.hex(),
+                "--input", original_file,
+                "--output", encrypted_file
+            ], check=True, capture_output=True)
+
+            with open(encrypted_file, 'rb') as f:
+                encrypted = f.read()
+            self.assertEqual(original_content, GCM(self.key).decrypt(encrypted, self.aad))
+
+            subprocess.run([
+                sys.executable, "-m", "src.cryptocore", "enc",
+                "--algorithm", "aes",
+                "--mode", "gcm",
+                "--decrypt",
+                "--jobs", "2",
+                "--key", self.key.hex(),
+                "--aad", self.aad.hex(),
+                "--input", encrypted_file,
+                "--output", decrypted_file
+            ], check=True, capture_output=True)
+
+            with open(decrypted_file, 'rb') as f:
+                self.assertEqual(original_content, f.read())
+
+
+class TestGCMKey(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        self.aad = b"Associated authentication data"
+
+    def test_seal_open_matches_reference(self):
+
+        gcm_key = GCMKey(self.key)
+
+        # Один объект обслуживает сообщения с разными nonce
+        for length in [0, 1, 16, 200, 4099]:
+            nonce = os.urandom(12)
+            plaintext = os.urandom(length)
+
+            cipher = AES.new(self.key, AES.MODE_GCM, nonce=nonce)
+            cipher.update(self.aad)
+            ciphertext, tag = cipher.encrypt_and_digest(plaintext)
+
+            with self.subTest(length=length):
+                sealed = gcm_key.seal(nonce, plaintext, self.aad)
+                self.assertEqual(ciphertext + tag, sealed)
+                self.assertEqual(plaintext, gcm_key.open(nonce, sealed, self.aad))
+
+    def test_open_rejects_tampering(self):
+
+        gcm_key = GCMKey(self.key)
+        nonce = os.urandom(12)
+        sealed = bytearray(gcm_key.seal(nonce, b"record", self.aad))
+
+        with self.assertRaises(AuthenticationError):
+            gcm_key.open(nonce, sealed, b"other aad")
+        with self.assertRaises(AuthenticationError):
+            gcm_key.open(os.urandom(12), sealed, self.aad)
+
+        sealed[0] ^= 1
+        with self.assertRaises(AuthenticationError):
+            gcm_key.open(nonce, sealed, self.aad)
+
+        with self.assertRaises(ValueError):
+            gcm_key.open(nonce, b"short", self.aad)
+
+    def test_concurrent_use(self):
+
+        gcm_key = GCMKey(self.key)
+        records = [(os.urandom(12), os.urandom(100 + i)) for i in range(200)]
+
+        def roundtrip(record):
+            nonce, plaintext = record
+            sealed = gcm_key.seal(nonce, plaintext, self.aad)
+            return sealed, gcm_key.open(nonce, sealed, self.aad)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(roundtrip, records))
+
+        for (nonce, plaintext), (sealed, opened) in zip(records, results):
+            self.assertEqual(plaintext, opened)
+            self.assertEqual(GCM(self.key, nonce).encrypt(plaintext, self.aad), nonce + sealed)
+
+    def test_decrypt_keeps_nonce(self):
+
+        gcm = GCM(self.key)
+        nonce = gcm.nonce
+        other = GCM(self.key).encrypt(b"other message", self.aad)
+
+        self.assertEqual(b"other message", gcm.decrypt(other, self.aad))
+        self.assertEqual(nonce, gcm.nonce)
+
+
+    def test_buffer_inputs_without_copies(self):
+
+        gcm_key = GCMKey(self.key)
+        nonce = os.urandom(12)
+        plaintext = os.urandom(1024 * 1024 + 3)
+        sealed = gcm_key.seal(nonce, memoryview(plaintext), self.aad)
+        data = nonce + sealed
+
+        self.assertEqual(sealed, gcm_key.seal(nonce, bytearray(plaintext), self.aad))
+        self.assertEqual(plaintext, gcm_key.open(nonce, bytearray(sealed), self.aad))
+
+        # Разбор nonce || шифротекст || тег идёт через срезы memoryview
+        tracemalloc.start()
+        try:
+            self.assertEqual(plaintext, GCM(self.key).decrypt(data, self.aad))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, 2.5 * len(plaintext))
+
 
 if __name__ == '__main__':
 
@@ -3,6 +3,7 @@ import tempfile
 import os
 import subprocess
 import sys
+import hashlib
 from src.hash import SHA256, SHA3_256, hash_data_hex, hash_file
 
 
@@ -95,6 +96,53 @@ class TestSHA256(unittest.TestCase):
 
         print(f"✓ Large data hash: {hash_value[:16]}...")
 
+    def test_matches_hashlib_around_block_boundaries(self):
+
+        # Длины вокруг границ блока и паддинга (55/56/64 байта)
+        for length in list(range(0, 130)) + [1000, 4096 + 3]:
+            data = os.urandom(length)
+            with self.subTest(length=length):
+                self.assertEqual(hashlib.sha256(data).digest(), SHA256.hash(data))
+
+    def test_unaligned_updates(self):
+
+        data = os.urandom(10000)
+        expected = hashlib.sha256(data).digest()
+
+        for chunk_size in [1, 7, 63, 64, 65, 1000]:
+            with self.subTest(chunk_size=chunk_size):
+                hasher = SHA256()
+                for offset in range(0, len(data), chunk_size):
+                    hasher.update(data[offset:offset + chunk_size])
+                self.assertEqual(expected, hasher.digest())
+
+    def test_update_accepts_memoryview_and_bytearray(self):
+
+        data = os.urandom(300)
+
+        hasher = SHA256()
+        hasher.update(bytearray(data[:100]))
+        hasher.update(memoryview(data)[100:])
+
+        self.assertEqual(hashlib.sha256(data).digest(), hasher.digest())
+
+    def test_rolling_digest_and_copy(self):
+
+        data = os.urandom(1000)
+        hasher = SHA256()
+
+        # digest() не сбрасывает состояние: дайджест каждого префикса
+        for offset in range(0, len(data), 150):
+            hasher.update(data[offset:offset + 150])
+            prefix = data[:offset + 150]
+            self.assertEqual(hashlib.sha256(prefix).digest(), hasher.digest())
+
+        clone = hasher.copy()
+        clone.update(b"tail")
+
+        self.assertEqual(hashlib.sha256(data).digest(), hasher.digest())
+        self.assertEqual(hashlib.sha256(data + b"tail").digest(), clone.digest())
+
 
 class TestSHA3_256(unittest.TestCase):
 
@@ -128,6 +176,42 @@ class TestSHA3_256(unittest.TestCase):
 
         self.assertEqual(incremental_hash, full_hash, "SHA3-256 incremental hashing failed")
 
+    def test_matches_hashlib_around_rate_boundaries(self):
+
+        # 135 байт: суффикс и конец паддинга в одном байте (0x86)
+        for length in list(range(128, 145)) + list(range(265, 275)) + [0, 1, 1000]:
+            data = os.urandom(length)
+            with self.subTest(length=length):
+                self.assertEqual(hashlib.sha3_256(data).digest(), SHA3_256.hash(data))
+
+    def test_unaligned_updates(self):
+
+        data = os.urandom(5000)
+        expected = hashlib.sha3_256(data).digest()
+
+        for chunk_size in [1, 135, 136, 137, 1000]:
+            with self.subTest(chunk_size=chunk_size):
+                hasher = SHA3_256()
+                for offset in range(0, len(data), chunk_size):
+                    hasher.update(data[offset:offset + chunk_size])
+                self.assertEqual(expected, hasher.digest())
+
+    def test_rolling_digest_and_copy(self):
+
+        data = os.urandom(1000)
+        hasher = SHA3_256()
+
+        for offset in range(0, len(data), 150):
+            hasher.update(data[offset:offset + 150])
+            prefix = data[:offset + 150]
+            self.assertEqual(hashlib.sha3_256(prefix).digest(), hasher.digest())
+
+        clone = hasher.copy()
+        clone.update(b"tail")
+
+        self.assertEqual(hashlib.sha3_256(data).digest(), hasher.digest())
+        self.assertEqual(hashlib.sha3_256(data + b"tail").digest(), clone.digest())
+
 
 class TestHashModule(unittest.TestCase):
 
@@ -3,7 +3,10 @@ import tempfile
 import os
 import subprocess
 import sys
-from src.mac import HMAC, HMACStream, AESCMAC
+import hmac as std_hmac
+from src.mac import HMAC, HMACStream, AESCMAC, CMACStream, compute_many, verify_many
+from Crypto.Cipher import AES
+from Crypto.Hash import CMAC
 
 
 class TestHMAC(unittest.TestCase):
@@ -27,7 +30,7 @@ class TestHMAC(unittest.TestCase):
 
         hmac = HMAC(key, 'sha256')
         result = hmac.compute_hex(message)
-        expected = "5bdcc146bf05454e6a042426089575c75a003f089d2739839dec58b964ec3843"
+        expected = "5bdcc146bf60754e6a042426089575c75a003f089d2739839dec58b964ec3843"
 
         self.assertEqual(result, expected, "RFC 4231 Test Case 2 failed")
 
@@ -146,6 +149,24 @@ class TestHMAC(unittest.TestCase):
 
         self.assertNotEqual(result1, result2, "Different keys should produce different HMACs")
 
+    def test_reused_object_many_messages(self):
+
+        # Один объект HMAC на много сообщений: кешированные состояния не портятся
+        key = os.urandom(32)
+
+        for backend in ['pure', 'native']:
+            hmac = HMAC(key, 'sha256', backend)
+            for length in [0, 1, 55, 64, 200]:
+                message = os.urandom(length)
+                with self.subTest(backend=backend, length=length):
+                    expected = std_hmac.digest(key, message, 'sha256')
+                    self.assertEqual(expected, hmac.compute(message))
+                    self.assertTrue(hmac.verify(message, expected))
+
+            stream = HMACStream(key, 'sha256', backend)
+            stream.update(b"streamed")
+            self.assertEqual(std_hmac.digest(key, b"streamed", 'sha256'), stream.finalize())
+
 
 class TestAESCMAC(unittest.TestCase):
 
@@ -191,6 +212,112 @@ class TestAESCMAC(unittest.TestCase):
         wrong_cmac = AESCMAC(bytes.fromhex("000102030405060708090a0b0c0d0e0f"))
         self.assertFalse(wrong_cmac.verify(message, mac_value))
 
+    def test_sp800_38b_vectors(self):
+
+        key = bytes.fromhex("2b7e151628aed2a6abf7158809cf4f3c")
+        message = bytes.fromhex(
+            "6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51"
+            "30c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710")
+
+        vectors = [
+            (0, "bb1d6929e95937287fa37d129b756746"),
+            (16, "070a16b46b4d4144f79bdd9dd04a287c"),
+            (40, "dfa66747de9ae63030ca32611497c827"),
+            (64, "51f0bebf7e3b9d92fc49741779363cfe"),
+        ]
+
+        for length, expected in vectors:
+            with self.subTest(length=length):
+                self.assertEqual(expected, AESCMAC(key).compute_hex(message[:length]))
+
+    def test_stream_matches_one_shot(self):
+
+        key = os.urandom(16)
+
+        # Длины на границах блока, разные размеры порций
+        for length in [0, 1, 15, 16, 17, 32, 33, 1000]:
+            message = os.urandom(length)
+            expected = CMAC.new(key, message, ciphermod=AES).digest()
+
+            for chunk_size in [1, 7, 16, 50]:
+                with self.subTest(length=length, chunk_size=chunk_size):
+                    stream = CMACStream(key)
+                    for offset in range(0, length, chunk_size):
+                        stream.update(message[offset:offset + chunk_size])
+                    self.assertEqual(expected, stream.finalize())
+
+    def test_long_message_spans_cbc_segments(self):
+
+        key = os.urandom(16)
+        # Тело длиннее одного сегмента CBC-вызова, последний блок неполный
+        message = os.urandom(3 * AESCMAC.CHAIN_SEGMENT_SIZE + 7)
+
+        expected = CMAC.new(key, message, ciphermod=AES).digest()
+        self.assertEqual(expected, AESCMAC(key).compute(message))
+
+    def test_cli_cmac_streaming(self):
+
+        key = os.urandom(16)
+        # Несколько чанков чтения, последний блок неполный
+        content = os.urandom(3 * 8192 + 5)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            test_file = os.path.join(tmpdir, 'data.bin')
+            with open(test_file, 'wb') as f:
+                f.write(content)
+
+            result = subprocess.run([
+                sys.executable, "-m", "src.cryptocore", "dgst",
+                "--algorithm", "sha256",
+                "--cmac",
+                "--key", key.hex(),
+                "--input", test_file
+            ], capture_output=True, text=True)
+
+            self.assertEqual(result.returncode, 0, result.stderr)
+            expected = CMAC.new(key, content, ciphermod=AES).hexdigest()
+            self.assertEqual(expected, result.stdout.split()[0])
+
+
+class TestBatchMAC(unittest.TestCase):
+
+
+    def setUp(self):
+        self.key = os.urandom(32)
+        self.messages = [os.urandom(length % 97) for length in range(300)]
+        self.expected = [std_hmac.digest(self.key, message, 'sha256') for message in self.messages]
+
+    def test_compute_many_serial_and_pools(self):
+
+        for workers, executor in [(1, 'thread'), (3, 'thread'), (2, 'process')]:
+            with self.subTest(workers=workers, executor=executor):
+                tags = compute_many(self.messages, 'hmac', self.key, workers, executor, batch_size=50)
+                self.assertEqual(self.expected, tags)
+
+    def test_compute_many_accepts_generator(self):
+
+        tags = compute_many((message for message in self.messages), 'hmac', self.key, workers=2)
+        self.assertEqual(self.expected, tags)
+
+    def test_verify_many(self):
+
+        macs = [tag.hex() for tag in self.expected]
+        macs[5] = bytes(32)
+
+        results = verify_many(self.messages, macs, 'hmac', self.key, workers=2)
+
+        self.assertFalse(results[5])
+        self.assertTrue(all(results[:5] + results[6:]))
+
+    def test_invalid_arguments(self):
+
+        with self.assertRaises(ValueError):
+            compute_many(self.messages, 'hmac', self.key, workers=0)
+        with self.assertRaises(ValueError):
+            compute_many(self.messages, 'hmac', self.key, workers=2, executor='gpu')
+        with self.assertRaises(ValueError):
+            verify_many(self.messages, self.expected[:-1], 'hmac', self.key)
+
 
 class TestCLIHMAC(unittest.TestCase):
 
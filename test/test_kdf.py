@@ -4,6 +4,9 @@ import tempfile
 import subprocess
 import sys
 import time
+import hashlib
+from unittest import mock
+from src.kdf import pbkdf2
 from src.kdf.pbkdf2 import pbkdf2_hmac_sha256
 from src.kdf import derive_key
 
@@ -184,6 +187,38 @@ class TestPBKDF2(unittest.TestCase):
 
         print("✓ Performance test passed")
 
+    def test_pure_backend_matches_hashlib(self):
+
+        # Длинный пароль хешируется, длины ключа вокруг границы блока
+        for password in [b'password', b'', os.urandom(100)]:
+            for dklen in [1, 20, 32, 33, 64, 100]:
+                with self.subTest(password_length=len(password), dklen=dklen):
+                    expected = hashlib.pbkdf2_hmac('sha256', password, b'NaCl', 7, dklen)
+                    self.assertEqual(expected, pbkdf2_hmac_sha256(password, b'NaCl', 7, dklen, 'pure'))
+
+    def test_pure_backend_long_salt(self):
+
+        # Соль длиннее блока SHA-256: U1 занимает несколько блоков
+        salt = os.urandom(150)
+        expected = hashlib.pbkdf2_hmac('sha256', b'password', salt, 3, 32)
+
+        self.assertEqual(expected, pbkdf2_hmac_sha256(b'password', salt, 3, 32, 'pure'))
+
+    def test_parallel_blocks_match_serial(self):
+
+        expected = hashlib.pbkdf2_hmac('sha256', b'password', b'salt', 50, 100)
+
+        # Порог снижен, чтобы пул процессов реально использовался
+        with mock.patch.object(pbkdf2, 'PARALLEL_MIN_ITERATIONS', 1):
+            result = pbkdf2_hmac_sha256(b'password', b'salt', 50, 100, 'pure', workers=3)
+
+        self.assertEqual(expected, result)
+
+    def test_invalid_workers(self):
+
+        with self.assertRaises(ValueError):
+            pbkdf2_hmac_sha256(b'password', b'salt', 1, 32, workers=0)
+
 
 class TestHKDF(unittest.TestCase):
     def test_deterministic(self):
@@ -406,6 +441,23 @@ class TestCLIDerive(unittest.TestCase):
 
         print("✓ CLI derive warnings test passed")
 
+    def test_cli_derive_jobs(self):
+
+        result = subprocess.run([
+            sys.executable, "-m", "src.cryptocore", "derive",
+            "--password", "password",
+            "--salt", "73616c74",
+            "--iterations", "5000",
+            "--length", "96",
+            "--backend", "pure",
+            "--jobs", "3"
+        ], capture_output=True, text=True, encoding='utf-8')
+
+        self.assertEqual(result.returncode, 0, f"CLI derive failed: {result.stderr}")
+
+        expected = hashlib.pbkdf2_hmac('sha256', b'password', b'salt', 5000, 96)
+        self.assertIn(f"{expected.hex()} 73616c74", result.stdout)
+
 
 class TestInteroperability(unittest.TestCase):
     def test_openssl_interoperability(self):
@@ -2,7 +2,18 @@ import unittest
 import os
 import tempfile
 import subprocess
-from src.modes import create_mode
+import io
+import queue
+import threading
+import mmap
+import tracemalloc
+from src.modes import create_mode, stream_encrypt, stream_decrypt, SegmentPool, CFBMode, CipherCache
+from src.modes.utils import counter_blocks
+from src.modes.base import CipherMode
+from src.modes.ofb import Keystream, _produce
+from src.modes.encrypt_then_mac import EncryptThenMAC, AuthenticationError
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad
 
 
 class TestNewModes(unittest.TestCase):
@@ -64,6 +75,27 @@ class TestNewModes(unittest.TestCase):
         self.assertEqual(self.test_data, plaintext)
         self.assertEqual(len(ciphertext), len(self.test_data))
 
+    def test_ctr_matches_reference(self):
+
+        # Несколько пачек счетчика и переполнение 128-битного счетчика
+        for iv in [self.iv, b"\xff" * 16, b"\xff" * 15 + b"\xf0"]:
+            with self.subTest(iv=iv.hex()):
+                data = os.urandom(3 * 16 * 4096 + 5)
+                cipher = create_mode('CTR', self.key, iv)
+                reference = AES.new(self.key, AES.MODE_CTR, nonce=b"", initial_value=iv)
+                self.assertEqual(reference.encrypt(data), cipher.encrypt(data))
+
+    def test_counter_blocks(self):
+
+        start = (1 << 128) - 2
+        expected = b''.join(((start + i) % (1 << 128)).to_bytes(16, 'big') for i in range(4))
+        self.assertEqual(expected, counter_blocks(start, 4))
+
+        # Инкремент только младших 32 бит (как в GCM)
+        start = (7 << 32) | 0xFFFFFFFF
+        expected = (start.to_bytes(16, 'big') + (7 << 32).to_bytes(16, 'big'))
+        self.assertEqual(expected, counter_blocks(start, 2, counter_bits=32))
+
     def test_interoperability_openssl(self):
 
         test_modes = ['cbc', 'cfb', 'ofb', 'ctr']
@@ -140,6 +172,630 @@ class TestNewModes(unittest.TestCase):
                             os.remove(f)
 
 
+class TestStreaming(unittest.TestCase):
+    def setUp(self):
+        self.key = b"0123456789abcdef"
+        self.iv = b"1234567890abcdef"
+
+    def test_stream_matches_one_shot(self):
+
+        for mode in ['ecb', 'cbc', 'cfb', 'ofb', 'ctr']:
+            for length in [0, 1, 15, 16, 17, 64, 100]:
+                with self.subTest(mode=mode, length=length):
+                    data = os.urandom(length)
+                    expected = create_mode(mode, self.key, self.iv).encrypt(data)
+
+                    # Маленький размер чанка, чтобы состояние переносилось между чанками
+                    encrypted = io.BytesIO()
+                    stream_encrypt(create_mode(mode, self.key, self.iv),
+                                   io.BytesIO(data), encrypted, chunk_size=32)
+                    self.assertEqual(expected, encrypted.getvalue())
+
+                    decrypted = io.BytesIO()
+                    stream_decrypt(create_mode(mode, self.key, self.iv),
+                                   io.BytesIO(expected), decrypted, chunk_size=16)
+                    self.assertEqual(data, decrypted.getvalue())
+
+    def test_stream_invalid_ciphertext_length(self):
+
+        cipher = create_mode('cbc', self.key, self.iv)
+
+        with self.assertRaises(ValueError):
+            stream_decrypt(cipher, io.BytesIO(b"A" * 33), io.BytesIO(), chunk_size=16)
+
+    def test_context_arbitrary_update_sizes(self):
+
+        data = os.urandom(257)
+
+        for mode in ['ecb', 'cbc', 'cfb', 'ofb', 'ctr']:
+            with self.subTest(mode=mode):
+                expected = create_mode(mode, self.key, self.iv).encrypt(data)
+
+                encryptor = create_mode(mode, self.key, self.iv).encryptor()
+                pieces = [data[:1], data[1:20], data[20:20], data[20:131], data[131:]]
+                ciphertext = b''.join(encryptor.update(p) for p in pieces) + encryptor.finalize()
+                self.assertEqual(expected, ciphertext)
+
+                decryptor = create_mode(mode, self.key, self.iv).decryptor()
+                plaintext = b''.join(decryptor.update(ciphertext[i:i + 7])
+                                     for i in range(0, len(ciphertext), 7))
+                plaintext += decryptor.finalize()
+                self.assertEqual(data, plaintext)
+
+    def test_context_holds_back_padding_block(self):
+
+        cipher = create_mode('cbc', self.key, self.iv)
+        ciphertext = cipher.encrypt(b"B" * 32)
+
+        decryptor = create_mode('cbc', self.key, self.iv).decryptor()
+
+        # Последний полный блок удерживается до finalize(), так как содержит паддинг
+        self.assertEqual(b"B" * 16, decryptor.update(ciphertext[:32]))
+        self.assertEqual(b"B" * 16, decryptor.update(ciphertext[32:]))
+        self.assertEqual(b"", decryptor.finalize())
+
+    def test_context_finalize_twice(self):
+
+        encryptor = create_mode('ctr', self.key, self.iv).encryptor()
+        encryptor.update(b"data")
+        encryptor.finalize()
+
+        with self.assertRaises(ValueError):
+            encryptor.update(b"more")
+        with self.assertRaises(ValueError):
+            encryptor.finalize()
+
+    def test_context_rejects_non_streaming_mode(self):
+
+        class WholeMessageMode(CipherMode):
+            supports_streaming = False
+
+            def encrypt(self, plaintext):
+                return plaintext
+
+            def decrypt(self, data):
+                return data
+
+        cipher = WholeMessageMode(self.key, self.iv, "WHOLE")
+        self.assertFalse(cipher.supports_streaming)
+        self.assertTrue(create_mode('cbc', self.key, self.iv).supports_streaming)
+
+        # Ошибка возникает при создании контекста, а не при первом update()
+        with self.assertRaisesRegex(ValueError, "does not support chunked processing"):
+            cipher.encryptor()
+        with self.assertRaisesRegex(ValueError, "does not support chunked processing"):
+            cipher.decryptor()
+
+    def test_streaming_mode_must_define_chunk_hooks(self):
+
+        # Потоковый режим без собственных хуков отклоняется при объявлении класса
+        with self.assertRaisesRegex(TypeError, "_encrypt_chunk"):
+            class IncompleteMode(CipherMode):
+                def encrypt(self, plaintext):
+                    return plaintext
+
+                def decrypt(self, data):
+                    return data
+
+    def test_cli_stream_roundtrip(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original_file = os.path.join(tmpdir, 'plain.bin')
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            # Больше одного чанка чтения
+            original_content = os.urandom(200 * 1024 + 5)
+            with open(original_file, 'wb') as f:
+                f.write(original_content)
+
+            for mode in ['ecb', 'cbc', 'ofb', 'ctr']:
+                with self.subTest(mode=mode):
+                    subprocess.run([
+                        "python", "-m", "src.cryptocore", "enc",
+                        "--algorithm", "aes",
+                        "--mode", mode,
+                        "--encrypt",
+                        "--key", self.key.hex(),
+                        "--input", original_file,
+                        "--output", encrypted_file
+                    ], check=True, capture_output=True)
+
+                    subprocess.run([
+                        "python", "-m", "src.cryptocore", "enc",
+                        "--algorithm", "aes",
+                        "--mode", mode,
+                        "--decrypt",
+                        "--key", self.key.hex(),
+                        "--input", encrypted_file,
+                        "--output", decrypted_file
+                    ], check=True, capture_output=True)
+
+                    with open(decrypted_file, 'rb') as f:
+                        self.assertEqual(original_content, f.read())
+
+
+class TestParallelCTR(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        # Счётчик близко к переполнению 128 бит
+        self.iv = b"\xff" * 15 + b"\xf0"
+        self.data = os.urandom(10 * 1024 + 7)
+
+    def test_parallel_matches_serial(self):
+
+        expected = create_mode('CTR', self.key, self.iv).encrypt(self.data)
+
+        with SegmentPool(3, executor='thread', segment_size=1024) as pool:
+            cipher = create_mode('CTR', self.key, self.iv, pool=pool)
+            self.assertEqual(expected, cipher.encrypt(self.data))
+
+            encryptor = create_mode('CTR', self.key, self.iv, pool=pool).encryptor()
+            result = encryptor.update(self.data[:3000]) + encryptor.update(self.data[3000:])
+            self.assertEqual(expected, result + encryptor.finalize())
+
+    def test_invalid_pool_arguments(self):
+
+        with self.assertRaises(ValueError):
+            SegmentPool(0)
+        with self.assertRaises(ValueError):
+            SegmentPool(2, segment_size=1000)
+        with self.assertRaises(ValueError):
+            SegmentPool(2, executor='gpu')
+
+    def test_cli_jobs_roundtrip(self):
+
+        key = os.urandom(16)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original_file = os.path.join(tmpdir, 'plain.bin')
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            # Больше двух сегментов, чтобы работа действительно делилась
+            original_content = os.urandom(2 * 1024 * 1024 + 100)
+            with open(original_file, 'wb') as f:
+                f.write(original_content)
+
+            subprocess.run([
+                "python", "-m", "src.cryptocore", "enc",
+                "--algorithm", "aes",
+                "--mode", "ctr",
+                "--encrypt",
+                "--jobs", "2",
+                "--key", key.hex(),
+                "--input", original_file,
+                "--output", encrypted_file
+            ], check=True, capture_output=True)
+
+            with open(encrypted_file, 'rb') as f:
+                iv = f.read(16)
+                ciphertext = f.read()
+            self.assertEqual(create_mode('CTR', key, iv).encrypt(original_content), ciphertext)
+
+            subprocess.run([
+                "python", "-m", "src.cryptocore", "enc",
+                "--algorithm", "aes",
+                "--mode", "ctr",
+                "--decrypt",
+                "--jobs", "2",
+                "--key", key.hex(),
+                "--input", encrypted_file,
+                "--output", decrypted_file
+            ], check=True, capture_output=True)
+
+            with open(decrypted_file, 'rb') as f:
+                self.assertEqual(original_content, f.read())
+
+
+class TestCBCBulkDecrypt(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        self.iv = os.urandom(16)
+
+    def test_matches_reference_across_batches(self):
+
+        # Длины на границах пакета из BATCH_BLOCKS блоков
+        for length in [0, 15, 16, 4096 * 16 - 1, 4096 * 16, 4096 * 16 + 33]:
+            plaintext = os.urandom(length)
+            ciphertext = AES.new(self.key, AES.MODE_CBC, iv=self.iv).encrypt(
+                plaintext + bytes([16 - length % 16]) * (16 - length % 16))
+
+            with self.subTest(length=length):
+                self.assertEqual(plaintext, create_mode('CBC', self.key, self.iv).decrypt(ciphertext))
+
+    def test_parallel_matches_serial(self):
+
+        plaintext = os.urandom(10 * 1024 + 5)
+        ciphertext = create_mode('CBC', self.key, self.iv).encrypt(plaintext)
+
+        with SegmentPool(3, executor='thread', segment_size=1024) as pool:
+            cipher = create_mode('CBC', self.key, self.iv, pool=pool)
+            self.assertEqual(plaintext, cipher.decrypt(ciphertext))
+
+            decryptor = create_mode('CBC', self.key, self.iv, pool=pool).decryptor()
+            result = decryptor.update(ciphertext[:3000]) + decryptor.update(ciphertext[3000:])
+            self.assertEqual(plaintext, result + decryptor.finalize())
+
+    def test_cli_jobs_decrypt(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original_file = os.path.join(tmpdir, 'plain.bin')
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            original_content = os.urandom(2 * 1024 * 1024 + 100)
+            with open(original_file, 'wb') as f:
+                f.write(original_content)
+
+            for operation, source, target in [("--encrypt", original_file, encrypted_file),
+                                              ("--decrypt", encrypted_file, decrypted_file)]:
+                result = subprocess.run([
+                    "python", "-m", "src.cryptocore", "enc",
+                    "--algorithm", "aes",
+                    "--mode", "cbc",
+                    operation,
+                    "--jobs", "2",
+                    "--key", self.key.hex(),
+                    "--input", source,
+                    "--output", target
+                ], check=True, capture_output=True, text=True)
+
+            # Параллельна только расшифровка, для шифрования --jobs игнорируется
+            self.assertNotIn("ignored", result.stderr)
+
+            with open(decrypted_file, 'rb') as f:
+                self.assertEqual(original_content, f.read())
+
+
+class TestCBCEncryptBackends(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        self.iv = os.urandom(16)
+
+    def test_backends_match_reference(self):
+
+        for length in [0, 1, 16, 1000, 64 * 1024 + 7]:
+            plaintext = os.urandom(length)
+            expected = AES.new(self.key, AES.MODE_CBC, iv=self.iv).encrypt(
+                plaintext + bytes([16 - length % 16]) * (16 - length % 16))
+
+            for backend in ['pure', 'native']:
+                with self.subTest(length=length, backend=backend):
+                    cipher = create_mode('CBC', self.key, self.iv, backend=backend)
+                    self.assertEqual(backend == 'native', cipher.native)
+                    self.assertEqual(expected, cipher.encrypt(plaintext))
+
+    def test_incremental_chaining(self):
+
+        # Цепочка должна переходить между вызовами update()
+        plaintext = os.urandom(5000)
+        expected = create_mode('CBC', self.key, self.iv, backend='native').encrypt(plaintext)
+
+        encryptor = create_mode('CBC', self.key, self.iv, backend='pure').encryptor()
+        result = encryptor.update(plaintext[:1000]) + encryptor.update(plaintext[1000:])
+        self.assertEqual(expected, result + encryptor.finalize())
+
+    def test_cli_backend(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original_file = os.path.join(tmpdir, 'plain.bin')
+            original_content = os.urandom(3000)
+            with open(original_file, 'wb') as f:
+                f.write(original_content)
+
+            outputs = {}
+            for backend in ['pure', 'native']:
+                outputs[backend] = os.path.join(tmpdir, f'{backend}.enc')
+                subprocess.run([
+                    "python", "-m", "src.cryptocore", "enc",
+                    "--algorithm", "aes",
+                    "--mode", "cbc",
+                    "--encrypt",
+                    "--backend", backend,
+                    "--key", self.key.hex(),
+                    "--iv", self.iv.hex(),
+                    "--input", original_file,
+                    "--output", outputs[backend]
+                ], check=True, capture_output=True, text=True)
+
+            with open(outputs['pure'], 'rb') as f:
+                pure = f.read()
+            with open(outputs['native'], 'rb') as f:
+                self.assertEqual(pure, f.read())
+
+
+class TestCFBSegmentSizes(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        self.iv = os.urandom(16)
+
+    def test_matches_reference(self):
+
+        for mode, bits in [('CFB', 8), ('CFB8', 8), ('CFB64', 64), ('CFB128', 128)]:
+            for length in [0, 1, 9, 16, 4096 * 8 + 21]:
+                plaintext = os.urandom(length)
+                expected = AES.new(self.key, AES.MODE_CFB, iv=self.iv, segment_size=bits).encrypt(plaintext)
+
+                for backend in ['pure', 'native']:
+                    with self.subTest(mode=mode, length=length, backend=backend):
+                        cipher = create_mode(mode, self.key, self.iv, backend=backend)
+                        self.assertEqual(bits // 8, cipher.block_size)
+                        self.assertEqual(expected, cipher.encrypt(plaintext))
+                        self.assertEqual(plaintext, cipher.decrypt(expected))
+
+    def test_incremental(self):
+
+        plaintext = os.urandom(5000)
+
+        for mode in ['CFB8', 'CFB64', 'CFB128']:
+            with self.subTest(mode=mode):
+                expected = create_mode(mode, self.key, self.iv).encrypt(plaintext)
+
+                encryptor = create_mode(mode, self.key, self.iv, backend='pure').encryptor()
+                result = encryptor.update(plaintext[:1001]) + encryptor.update(plaintext[1001:])
+                self.assertEqual(expected, result + encryptor.finalize())
+
+                decryptor = create_mode(mode, self.key, self.iv).decryptor()
+                result = decryptor.update(expected[:1001]) + decryptor.update(expected[1001:])
+                self.assertEqual(plaintext, result + decryptor.finalize())
+
+    def test_parallel_decrypt(self):
+
+        plaintext = os.urandom(10 * 1024 + 5)
+
+        with SegmentPool(3, executor='thread', segment_size=1024) as pool:
+            for mode in ['CFB8', 'CFB64', 'CFB128']:
+                with self.subTest(mode=mode):
+                    ciphertext = create_mode(mode, self.key, self.iv).encrypt(plaintext)
+                    cipher = create_mode(mode, self.key, self.iv, pool=pool)
+                    self.assertEqual(plaintext, cipher.decrypt(ciphertext))
+
+    def test_invalid_segment_size(self):
+
+        with self.assertRaises(ValueError):
+            CFBMode(self.key, self.iv, segment_size=32)
+
+    def test_cli_cfb128_roundtrip(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            original_file = os.path.join(tmpdir, 'plain.bin')
+            encrypted_file = os.path.join(tmpdir, 'plain.enc')
+            decrypted_file = os.path.join(tmpdir, 'plain.dec')
+
+            original_content = os.urandom(100 * 1024 + 3)
+            with open(original_file, 'wb') as f:
+                f.write(original_content)
+
+            for operation, source, target in [("--encrypt", original_file, encrypted_file),
+                                              ("--decrypt", encrypted_file, decrypted_file)]:
+                subprocess.run([
+                    "python", "-m", "src.cryptocore", "enc",
+                    "--algorithm", "aes",
+                    "--mode", "cfb128",
+                    operation,
+                    "--key", self.key.hex(),
+                    "--input", source,
+                    "--output", target
+                ], check=True, capture_output=True, text=True)
+
+            with open(encrypted_file, 'rb') as f:
+                iv = f.read(16)
+                ciphertext = f.read()
+
+            # Совместимо с CFB-128 (openssl -aes-128-cfb)
+            expected = AES.new(self.key, AES.MODE_CFB, iv=iv, segment_size=128).encrypt(original_content)
+            self.assertEqual(expected, ciphertext)
+
+            with open(decrypted_file, 'rb') as f:
+                self.assertEqual(original_content, f.read())
+
+
+class TestOFBKeystream(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        self.iv = os.urandom(16)
+
+    def test_matches_reference(self):
+
+        for length in [0, 1, 15, 16, 17, 3 * 64 * 1024 + 5]:
+            plaintext = os.urandom(length)
+            expected = AES.new(self.key, AES.MODE_OFB, iv=self.iv).encrypt(plaintext)
+
+            for backend in ['pure', 'native']:
+                for prefetch in [False, True]:
+                    with self.subTest(length=length, backend=backend, prefetch=prefetch):
+                        cipher = create_mode('OFB', self.key, self.iv, backend=backend, prefetch=prefetch)
+                        self.assertEqual(expected, cipher.encrypt(plaintext))
+
+                        # Чанки не совпадают с пакетами ключевого потока
+                        output = io.BytesIO()
+                        stream_encrypt(cipher, io.BytesIO(plaintext), output, chunk_size=1000)
+                        self.assertEqual(expected, output.getvalue())
+
+    def test_producer_stops_after_finalize(self):
+
+        cipher = create_mode('OFB', self.key, self.iv, prefetch=True)
+        encryptor = cipher.encryptor()
+        producer = encryptor._state
+
+        encryptor.update(os.urandom(100))
+        encryptor.finalize()
+
+        self.assertTrue(producer._stop.is_set())
+
+    def test_producer_error_reaches_consumer(self):
+
+        def generate(register, length):
+            raise RuntimeError("keystream failure")
+
+        keystream = Keystream(generate, self.iv, prefetch=True)
+        with self.assertRaises(RuntimeError):
+            keystream.read(16)
+
+    def test_producer_error_after_close_does_not_block(self):
+
+        # Очередь заполнена, и потребитель останавливается до того, как
+        # генерация падает: поток должен завершиться, а не ждать места в очереди
+        batches = queue.Queue(maxsize=1)
+        batches.put(b'pending')
+        stop = threading.Event()
+
+        def generate(register, length):
+            stop.set()
+            raise RuntimeError("keystream failure")
+
+        producer = threading.Thread(target=_produce, args=(generate, self.iv, 16, batches, stop), daemon=True)
+        producer.start()
+        producer.join(timeout=2)
+
+        self.assertFalse(producer.is_alive())
+
+
+class TestCipherCache(unittest.TestCase):
+    def test_lru_eviction_zeroizes_key(self):
+
+        cache = CipherCache(capacity=2)
+        keys = [os.urandom(16) for _ in range(3)]
+
+        aes, _, created = cache.get(keys[0])
+        self.assertTrue(created)
+        entry = cache._entries[cache._fingerprint(keys[0])]
+
+        cache.get(keys[1])
+        self.assertFalse(cache.get(keys[0])[2])  # keys[0] теперь самый свежий
+        cache.get(keys[2])
+
+        self.assertEqual(2, len(cache))
+        self.assertIn(keys[0], cache)
+        self.assertNotIn(keys[1], cache)
+
+        cache.evict(keys[0])
+        self.assertNotIn(keys[0], cache)
+        self.assertEqual(bytearray(16), entry.key)
+        self.assertIsNone(entry.aes)
+
+        # Объект, выданный до вытеснения, продолжает работать
+        self.assertEqual(AES.new(keys[0], AES.MODE_ECB).encrypt(bytes(16)), aes.encrypt(bytes(16)))
+
+    def test_weak_check_runs_once_per_key(self):
+
+        calls = []
+
+        def weak_check(key):
+            calls.append(key)
+            return True
+
+        cache = CipherCache(weak_check=weak_check)
+        key = os.urandom(16)
+        for _ in range(5):
+            _, weak, _ = cache.get(key)
+            self.assertTrue(weak)
+
+        self.assertEqual(1, len(calls))
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+    def test_modes_share_cached_cipher(self):
+
+        key = os.urandom(16)
+        iv = os.urandom(16)
+        plaintext = os.urandom(100)
+
+        first = create_mode('CBC', key, iv)
+        second = create_mode('CTR', key, iv)
+        self.assertIs(first._aes, second._aes)
+
+        expected = AES.new(key, AES.MODE_ECB).encrypt(pad(plaintext, 16))
+        self.assertEqual(expected, create_mode('ECB', key).encrypt(plaintext))
+
+    def test_invalid_capacity(self):
+
+        with self.assertRaises(ValueError):
+            CipherCache(capacity=0)
+
+
+class TestBufferInputs(unittest.TestCase):
+    def setUp(self):
+        self.key = os.urandom(16)
+        self.iv = os.urandom(16)
+        # Не кратно 16, чтобы задействовать паддинг и неполный хвост
+        self.data = os.urandom(1024 * 1024 + 5)
+
+    def _peak(self, operation, *args):
+
+        # Пиковый объём памяти, выделенной во время операции
+        tracemalloc.start()
+        try:
+            operation(*args)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def _buffers(self, data):
+
+        # bytes, bytearray, memoryview и mmap с одинаковым содержимым
+        mapped = mmap.mmap(-1, len(data))
+        mapped.write(data)
+        self.addCleanup(mapped.close)
+        return [data, bytearray(data), memoryview(data), mapped]
+
+    def test_modes_accept_buffers(self):
+
+        data = self.data[:1000]
+
+        for mode in ['ECB', 'CBC', 'CFB', 'CFB128', 'OFB', 'CTR']:
+            expected = create_mode(mode, self.key, self.iv).encrypt(data)
+            for buffer in self._buffers(data):
+                with self.subTest(mode=mode, buffer=type(buffer).__name__):
+                    self.assertEqual(expected, create_mode(mode, self.key, self.iv).encrypt(buffer))
+            for buffer in self._buffers(expected):
+                with self.subTest(mode=mode, buffer=type(buffer).__name__):
+                    self.assertEqual(data, create_mode(mode, self.key, self.iv).decrypt(buffer))
+
+    def test_context_update_accepts_views(self):
+
+        view = memoryview(self.data)
+        context = create_mode('CBC', self.key, self.iv).encryptor()
+
+        # Неполные блоки между вызовами собираются во внутреннем буфере
+        ciphertext = b''.join([context.update(view[:7]), context.update(view[7:100003]),
+                               context.update(view[100003:]), context.finalize()])
+
+        self.assertEqual(create_mode('CBC', self.key, self.iv).encrypt(self.data), ciphertext)
+
+    def test_encrypt_without_payload_copies(self):
+
+        # Помимо результата допускается ещё одна его сборка, но не копии входа
+        limit = 2.5 * len(self.data)
+
+        for mode in ['ECB', 'CBC', 'OFB']:
+            with self.subTest(mode=mode):
+                cipher = create_mode(mode, self.key, self.iv)
+                self.assertLess(self._peak(cipher.encrypt, memoryview(self.data)), limit)
+
+    def test_etm_buffers_without_copies(self):
+
+        key = os.urandom(32)
+        aad = b"Associated data"
+        sealed = EncryptThenMAC('cbc', key, self.iv).encrypt(self.data, aad)
+
+        for buffer in self._buffers(sealed)[1:]:
+            with self.subTest(buffer=type(buffer).__name__):
+                self.assertEqual(self.data, EncryptThenMAC('cbc', key, self.iv).decrypt(buffer, aad))
+
+        limit = 2.5 * len(self.data)
+        etm = EncryptThenMAC('cbc', key, self.iv)
+        self.assertLess(self._peak(etm.encrypt, memoryview(self.data), aad), limit)
+        self.assertLess(self._peak(etm.decrypt, memoryview(sealed), aad), limit)
+
+        tampered = bytearray(sealed)
+        tampered[-1] ^= 1
+        with self.assertRaises(AuthenticationError):
+            etm.decrypt(memoryview(tampered), aad)
+
+
 if __name__ == '__main__':
 
     unittest.main()